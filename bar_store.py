@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Binary Bar Store
+Append-only, memory-mapped OHLCV files: one per symbol and interval
+
+File layout (little-endian):
+    header  64 bytes  magic, schema version, row size, symbol, interval, row count
+    rows    48 bytes  timestamp (int64 epoch s), open, high, low, close, volume (float64)
+
+Rows are kept sorted by timestamp, so lookups are binary searches over the
+mapped file and nothing is parsed when a store is opened.
+"""
+
+import mmap
+import os
+import re
+import struct
+import sys
+from datetime import datetime
+
+from price_series import PriceSeries
+
+STORE_DIR = "data/bars"
+MAGIC = b"BITBARS\x00"
+SCHEMA_VERSION = 1
+
+HEADER = struct.Struct('<8sHH16s8sQ')
+HEADER_SIZE = 64
+ROW = struct.Struct('<qddddd')
+ROW_FIELDS = 6
+COUNT_OFFSET = HEADER.size - 8
+
+class BarStoreError(Exception):
+    """Raised for malformed or mismatched store files"""
+
+def store_path(symbol, interval, root=STORE_DIR):
+    """File holding `symbol` bars at `interval`, e.g. data/bars/BMNR_1d.bin"""
+    safe = re.sub(r'[^A-Za-z0-9.-]', '_', symbol)
+    return os.path.join(root, f"{safe}_{interval}.bin")
+
+class BarStore:
+    """
+    One symbol/interval file of fixed-width bars
+
+    `read()` maps the file and returns a PriceSeries whose columns are
+    strided views straight into the mapping: no copy, no parsing. The
+    mapping is kept and only re-made when the header's row count changes,
+    so lookups do not re-map the file. Writes go through ordinary file I/O
+    and only touch the tail of the file, which never shrinks: series from
+    earlier reads stay valid, though a merge() rewrites the bars it
+    replaces in place and those views see the new values.
+    """
+
+    def __init__(self, symbol, interval="1d", root=STORE_DIR, path=None):
+        self.symbol = symbol
+        self.interval = interval
+        self.path = path or store_path(symbol, interval, root)
+        self._mapping = None
+        self._count = None
+        self._series = None
+
+        if os.path.exists(self.path):
+            self._check_header()
+        else:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'wb') as f:
+                f.write(self._header(0))
+
+    def _header(self, count):
+        header = HEADER.pack(
+            MAGIC, SCHEMA_VERSION, ROW.size,
+            self.symbol.encode()[:16], self.interval.encode()[:8], count
+        )
+        return header.ljust(HEADER_SIZE, b'\x00')
+
+    def _check_header(self):
+        with open(self.path, 'rb') as f:
+            raw = f.read(HEADER_SIZE)
+        if len(raw) < HEADER_SIZE:
+            raise BarStoreError(f"{self.path}: truncated header")
+
+        magic, version, row_size, symbol, interval, _ = HEADER.unpack_from(raw)
+        if magic != MAGIC:
+            raise BarStoreError(f"{self.path}: not a bar store")
+        if version != SCHEMA_VERSION or row_size != ROW.size:
+            raise BarStoreError(f"{self.path}: unsupported schema v{version} ({row_size}-byte rows)")
+        stored = (symbol.rstrip(b'\x00').decode(), interval.rstrip(b'\x00').decode())
+        if stored != (self.symbol[:16], self.interval[:8]):
+            raise BarStoreError(f"{self.path}: holds {stored[0]} {stored[1]}, not {self.symbol} {self.interval}")
+
+    def __len__(self):
+        with open(self.path, 'rb') as f:
+            f.seek(COUNT_OFFSET)
+            return struct.unpack('<Q', f.read(8))[0]
+
+    def read(self):
+        """All bars as a zero-copy PriceSeries (the cached one while the row count is unchanged)"""
+        if self._mapping is not None:
+            # The shared mapping sees the header the writers update
+            count = struct.unpack_from('<Q', self._mapping, COUNT_OFFSET)[0]
+        else:
+            count = len(self)
+        if count != self._count:
+            self._map(count)
+        return self._series
+
+    def _map(self, count):
+        self._count = count
+        if count == 0:
+            self._mapping = None
+            self._series = PriceSeries.empty(self.symbol)
+            return
+
+        with open(self.path, 'rb') as f:
+            self._mapping = mmap.mmap(f.fileno(), HEADER_SIZE + count * ROW.size, access=mmap.ACCESS_READ)
+        rows = memoryview(self._mapping)[HEADER_SIZE:HEADER_SIZE + count * ROW.size]
+
+        if sys.byteorder != 'little':
+            self._series = PriceSeries.from_rows(ROW.iter_unpack(rows), self.symbol)
+            return
+
+        as_int = rows.cast('q')
+        as_float = rows.cast('d')
+        self._series = PriceSeries(
+            as_int[0::ROW_FIELDS],
+            *(as_float[i::ROW_FIELDS] for i in range(1, ROW_FIELDS)),
+            symbol=self.symbol
+        )
+
+    def index_at(self, ts):
+        """Index of the first stored bar at or after epoch second `ts`"""
+        return self.read().index_at(ts)
+
+    def lookup(self, ts):
+        """Bar at exactly epoch second `ts`, or None"""
+        series = self.read()
+        i = series.index_at(ts)
+        if i < len(series) and series.timestamp[i] == ts:
+            return series[i]
+        return None
+
+    def range(self, start_ts=None, end_ts=None):
+        """View of bars with start_ts <= timestamp < end_ts"""
+        series = self.read()
+        lo = series.index_at(start_ts) if start_ts is not None else 0
+        hi = series.index_at(end_ts) if end_ts is not None else len(series)
+        return series[lo:hi]
+
+    def _write_from(self, index, series):
+        """
+        Write `series` from row `index` on, then publish the count
+
+        Rows past the new count are left in place rather than truncated:
+        shrinking the file would fault any live mapping that still covers
+        them. The next write past the count overwrites them.
+        """
+        rows = b''.join(ROW.pack(*bar) for bar in series)
+        with open(self.path, 'r+b') as f:
+            f.seek(HEADER_SIZE + index * ROW.size)
+            f.write(rows)
+            f.flush()
+            # Row count goes last so it never covers rows not yet written
+            f.seek(COUNT_OFFSET)
+            f.write(struct.pack('<Q', index + len(series)))
+        # A copied (big-endian) series would not see rows rewritten in place
+        self._count = None
+
+    def append(self, series):
+        """Append bars strictly newer than the last stored bar"""
+        if not len(series):
+            return 0
+        count = len(self)
+        if count:
+            last = self.read().timestamp[-1]
+            if series.timestamp[0] <= last:
+                raise BarStoreError(f"append out of order: {series.timestamp[0]} <= {last}")
+        self._write_from(count, series)
+        return len(series)
+
+    def merge(self, series, from_ts=None):
+        """
+        Replace stored bars from `from_ts` onward with `series`
+
+        `from_ts` defaults to the series' first timestamp. Used with a one-bar
+        overlap so a re-fetched, still-forming bar overwrites its earlier
+        version.
+        """
+        if not len(series):
+            return 0
+        if from_ts is None:
+            from_ts = series.timestamp[0]
+        self._write_from(self.index_at(min(from_ts, series.timestamp[0])), series)
+        return len(series)
+
+    def describe(self):
+        count = len(self)
+        if not count:
+            return f"{self.symbol} {self.interval}: empty"
+        series = self.read()
+        first = datetime.fromtimestamp(series.timestamp[0])
+        last = datetime.fromtimestamp(series.timestamp[-1])
+        return f"{self.symbol} {self.interval}: {count} bars, {first} → {last}"
+
+def open_store(symbol, interval="1d", root=STORE_DIR):
+    """Open (creating if needed) the store for `symbol` at `interval`"""
+    return BarStore(symbol, interval, root)
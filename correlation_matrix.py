@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Cross-Asset Correlation Matrix
+Full-sample and rolling-window Pearson correlations for a whole watchlist
+"""
+
+import math
+import os
+import sys
+
+from eth_correlation import calculate_returns
+from watchlist import DEFAULT_WATCHLIST, align_closes, fetch_watchlist
+
+try:
+    import numpy as np
+except ImportError:  # stdlib-only fallback
+    np = None
+
+CORRELATION_FILE = "data/correlation_matrix.csv"
+ROLLING_FILE = "data/rolling_correlations.csv"
+ROLLING_WINDOWS = (20, 60, 120)
+
+def _prefix_sums(columns):
+    """
+    Running sums of x_i and x_i * x_j for every pair, one row per time step
+
+    Returns (sums, cross) where sums[t][i] and cross[t][i][j] cover the
+    first t observations. Inputs are demeaned first to keep the window
+    differences well conditioned.
+    """
+    if np is not None:
+        x = np.asarray(columns, dtype=np.float64).T
+        x = x - x.mean(axis=0)
+        zero = np.zeros((1, x.shape[1]))
+        sums = np.vstack([zero, np.cumsum(x, axis=0)])
+        cross = np.concatenate([
+            np.zeros((1, x.shape[1], x.shape[1])),
+            np.cumsum(x[:, :, None] * x[:, None, :], axis=0)
+        ])
+        return sums, cross
+
+    n = len(columns)
+    means = [sum(col) / len(col) for col in columns]
+    x = [[v - means[i] for v in col] for i, col in enumerate(columns)]
+    sums = [[0.0] * n]
+    cross = [[[0.0] * n for _ in range(n)]]
+    for t in range(len(columns[0])):
+        row = [x[i][t] for i in range(n)]
+        last_s, last_c = sums[-1], cross[-1]
+        sums.append([last_s[i] + row[i] for i in range(n)])
+        cross.append([[last_c[i][j] + row[i] * row[j] for j in range(n)] for i in range(n)])
+    return sums, cross
+
+def _window_matrix(sums, cross, start, end):
+    """Correlation matrix of observations [start, end) from prefix sums: O(N²)"""
+    m = end - start
+    if np is not None:
+        s = sums[end] - sums[start]
+        c = cross[end] - cross[start]
+        cov = c - np.outer(s, s) / m
+        sd = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = cov / np.outer(sd, sd)
+        return np.where(np.outer(sd, sd) > 0, corr, np.nan).tolist()
+
+    s_end, s_start = sums[end], sums[start]
+    c_end, c_start = cross[end], cross[start]
+    n = len(s_end)
+    s = [s_end[i] - s_start[i] for i in range(n)]
+    cov = [[c_end[i][j] - c_start[i][j] - s[i] * s[j] / m for j in range(n)] for i in range(n)]
+    sd = [math.sqrt(max(cov[i][i], 0.0)) for i in range(n)]
+    return [
+        [cov[i][j] / (sd[i] * sd[j]) if sd[i] > 0 and sd[j] > 0 else float('nan') for j in range(n)]
+        for i in range(n)
+    ]
+
+def correlation_matrix(returns):
+    """
+    Full-sample N×N correlation matrix
+
+    `returns` maps symbol → equal-length list of aligned returns. Returns
+    (symbols, matrix).
+    """
+    symbols = list(returns)
+    sums, cross = _prefix_sums([returns[s] for s in symbols])
+    return symbols, _window_matrix(sums, cross, 0, len(returns[symbols[0]]))
+
+def rolling_correlations(returns, windows=ROLLING_WINDOWS):
+    """
+    Rolling N×N correlation matrices for each window length
+
+    Prefix sums are built once; each window position then costs O(N²)
+    regardless of the window length. Returns (symbols, {window: [matrix
+    for each end index]}); windows longer than the data are skipped.
+    """
+    symbols = list(returns)
+    length = len(returns[symbols[0]])
+    sums, cross = _prefix_sums([returns[s] for s in symbols])
+
+    rolling = {}
+    for w in windows:
+        if w > length:
+            continue
+        rolling[w] = [_window_matrix(sums, cross, end - w, end) for end in range(w, length + 1)]
+    return symbols, rolling
+
+def latest_matrices(returns, windows=ROLLING_WINDOWS):
+    """Most recent matrix for each window plus the full sample ('all')"""
+    symbols = list(returns)
+    length = len(returns[symbols[0]])
+    sums, cross = _prefix_sums([returns[s] for s in symbols])
+
+    matrices = {w: _window_matrix(sums, cross, length - w, length) for w in windows if w <= length}
+    matrices['all'] = _window_matrix(sums, cross, 0, length)
+    return symbols, matrices
+
+def write_heatmap_table(symbols, matrices, path=CORRELATION_FILE):
+    """
+    Write matrices as a heatmap-ready CSV
+
+    One block of rows per window: window,symbol,<one column per symbol>.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        f.write('window,symbol,' + ','.join(symbols) + '\n')
+        for window, matrix in matrices.items():
+            for symbol, row in zip(symbols, matrix):
+                cells = ','.join('' if math.isnan(v) else f"{v:.4f}" for v in row)
+                f.write(f"{window},{symbol},{cells}\n")
+    print(f"✓ Correlation table saved: {path}")
+
+def write_rolling_table(dates, symbols, rolling, path=ROLLING_FILE):
+    """
+    Write rolling correlations as a long table
+
+    One row per window end, window length and symbol pair:
+    date,window,symbol_a,symbol_b,corr. `dates` has one entry per return,
+    so a window ending at index `end` is dated dates[end - 1].
+    """
+    pairs = [(i, j) for i in range(len(symbols)) for j in range(i + 1, len(symbols))]
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        f.write('date,window,symbol_a,symbol_b,corr\n')
+        for window, matrices in rolling.items():
+            for end, matrix in enumerate(matrices, start=window):
+                for i, j in pairs:
+                    v = matrix[i][j]
+                    f.write(f"{dates[end - 1]},{window},{symbols[i]},{symbols[j]},"
+                            f"{'' if math.isnan(v) else format(v, '.4f')}\n")
+    print(f"✓ Rolling correlations saved: {path}")
+
+def main():
+    symbols = sys.argv[1:] or DEFAULT_WATCHLIST
+    days = max(ROLLING_WINDOWS) * 2
+
+    print("=" * 70)
+    print(f"Cross-Asset Correlation Matrix ({len(symbols)} symbols)")
+    print("=" * 70)
+
+    print(f"\n📊 Fetching {days} days of data...")
+    results = fetch_watchlist(symbols, days=days)
+    dates, closes = align_closes(results)
+
+    if len(dates) < 3:
+        print("✗ Not enough overlapping data points")
+        return
+
+    returns = {symbol: calculate_returns(values) for symbol, values in closes.items()}
+    print(f"✓ {len(dates) - 1} aligned returns across {len(returns)} symbols")
+
+    names, matrices = latest_matrices(returns)
+
+    for window, matrix in matrices.items():
+        label = "Full sample" if window == 'all' else f"Last {window} returns"
+        print(f"\n📐 {label}")
+        print("          " + "".join(f"{s[:8]:>9s}" for s in names))
+        for symbol, row in zip(names, matrix):
+            cells = "".join("      n/a" if math.isnan(v) else f"{v:9.2f}" for v in row)
+            print(f"{symbol[:8]:10s}{cells}")
+
+    write_heatmap_table(names, matrices)
+    names, rolling = rolling_correlations(returns)
+    write_rolling_table(dates[1:], names, rolling)
+    print("\n" + "=" * 70)
+
+if __name__ == "__main__":
+    main()
@@ -4,46 +4,13 @@ ETH-BMNR Correlation Analysis
 Tests the claim: "ETH would get this going"
 """
 
-import json
-import urllib.request
-from datetime import datetime, timedelta
 import math
+import sys
+from watchlist import fetch_watchlist, align_closes
+from significance import DEFAULT_RESAMPLES, correlation_significance, format_p
 
-def fetch_crypto_data(symbol, days=30):
-    """Fetch cryptocurrency data from Yahoo Finance"""
-    now = int(datetime.now().timestamp())
-    past = int((datetime.now() - timedelta(days=days)).timestamp())
-    
-    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-    url += f"?period1={past}&period2={now}&interval=1d"
-    
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    req = urllib.request.Request(url, headers=headers)
-    
-    try:
-        with urllib.request.urlopen(req) as response:
-            data = json.loads(response.read().decode())
-            result = data['chart']['result'][0]
-            
-            timestamps = result['timestamp']
-            quotes = result['indicators']['quote'][0]
-            
-            data_points = []
-            for i in range(len(timestamps)):
-                if quotes['close'][i] is not None:
-                    data_points.append({
-                        'timestamp': datetime.fromtimestamp(timestamps[i]),
-                        'close': quotes['close'][i]
-                    })
-            
-            return data_points
-    except Exception as e:
-        print(f"Error fetching {symbol}: {e}")
-        return []
-
-def calculate_returns(data):
-    """Calculate daily returns"""
-    closes = [d['close'] for d in data]
+def calculate_returns(closes):
+    """Calculate daily returns from a sequence of closes (e.g. `series.close`)"""
     returns = []
     for i in range(1, len(closes)):
         ret = (closes[i] - closes[i-1]) / closes[i-1]
@@ -72,16 +39,22 @@ def calculate_correlation(returns1, returns2):
     return numerator / denominator
 
 def main():
+    resamples = DEFAULT_RESAMPLES
+    seed = None
+    if '--resamples' in sys.argv:
+        resamples = int(sys.argv[sys.argv.index('--resamples') + 1])
+    if '--seed' in sys.argv:
+        seed = int(sys.argv[sys.argv.index('--seed') + 1])
+    
     print("=" * 70)
     print("ETH-BMNR Correlation Analysis")
     print("Testing the claim: 'ETH would get this going'")
     print("=" * 70)
     
-    print("\n📊 Fetching ETH-USD data...")
-    eth_data = fetch_crypto_data("ETH-USD", days=30)
-    
-    print("📊 Fetching BMNR data...")
-    bmnr_data = fetch_crypto_data("BMNR", days=30)
+    print("\n📊 Fetching ETH-USD and BMNR data...")
+    results = fetch_watchlist(["ETH-USD", "BMNR"], days=30)
+    eth_data = results["ETH-USD"]
+    bmnr_data = results["BMNR"]
     
     if not eth_data or not bmnr_data:
         print("✗ Failed to fetch data")
@@ -91,10 +64,7 @@ def main():
     print(f"✓ BMNR: {len(bmnr_data)} data points")
     
     # Align data by date
-    eth_dict = {d['timestamp'].date(): d['close'] for d in eth_data}
-    bmnr_dict = {d['timestamp'].date(): d['close'] for d in bmnr_data}
-    
-    common_dates = sorted(set(eth_dict.keys()) & set(bmnr_dict.keys()))
+    common_dates, aligned = align_closes(results)
     
     if len(common_dates) < 2:
         print("✗ Not enough overlapping data points")
@@ -102,13 +72,12 @@ def main():
     
     print(f"✓ {len(common_dates)} overlapping trading days")
     
-    # Create aligned data
-    aligned_eth = [eth_dict[date] for date in common_dates]
-    aligned_bmnr = [bmnr_dict[date] for date in common_dates]
+    aligned_eth = aligned["ETH-USD"]
+    aligned_bmnr = aligned["BMNR"]
     
     # Calculate returns
-    eth_returns = calculate_returns([{'close': c} for c in aligned_eth])
-    bmnr_returns = calculate_returns([{'close': c} for c in aligned_bmnr])
+    eth_returns = calculate_returns(aligned_eth)
+    bmnr_returns = calculate_returns(aligned_bmnr)
     
     # Calculate correlation
     correlation = calculate_correlation(eth_returns, bmnr_returns)
@@ -121,6 +90,9 @@ def main():
         print(f"\n📈 Correlation Coefficient: {correlation:.4f}")
         print(f"   Coefficient of Determination (R²): {correlation**2:.4f}")
         
+        sig = correlation_significance(eth_returns, bmnr_returns, resamples, seed=seed)
+        p_label = format_p(sig['p_value'])
+        
         # Interpretation
         print("\n📊 Interpretation:")
         abs_corr = abs(correlation)
@@ -137,7 +109,7 @@ def main():
         
         direction = "POSITIVE" if correlation > 0 else "NEGATIVE"
         
-        print(f"   {color} {strength} {direction} correlation")
+        print(f"   {color} {strength} {direction} correlation ({p_label})")
         
         if abs_corr < 0.3:
             print(f"   → ETH and BMNR move largely independently")
@@ -157,7 +129,10 @@ def main():
         
         # Verdict on the claim
         print("\n⚖️  VERDICT on 'ETH would get this going':")
-        if abs_corr < 0.3:
+        if sig['p_value'] is not None and sig['p_value'] >= 0.05:
+            print(f"   ❌ CLAIM UNSUPPORTED - Correlation is not significant ({p_label})")
+            print("      Shuffled ETH/BMNR pairings often correlate this strongly by chance")
+        elif abs_corr < 0.3:
             print("   ❌ CLAIM UNSUPPORTED - Correlation is too weak")
             print("      ETH price changes do NOT reliably drive BMNR")
         elif abs_corr < 0.5:
@@ -175,6 +150,20 @@ def main():
         print(f"\n📝 Note: Based on n={n} data points ({len(common_dates)} days)")
         if n < 10:
             print("   ⚠️  WARNING: Small sample size - correlation may not be reliable")
+        print(f"   Permutation test ({sig['resamples']:,} shuffles): {p_label}")
+        if sig['bootstrap_ci']:
+            lo, hi = sig['bootstrap_ci']
+            print(f"   95% block-bootstrap CI: [{lo:+.3f}, {hi:+.3f}]")
+        if sig['fisher_ci']:
+            lo, hi = sig['fisher_ci']
+            print(f"   95% Fisher-z CI:        [{lo:+.3f}, {hi:+.3f}]")
+        
+        # Same-day correlation can't say who moves first
+        if n >= 8:
+            from lead_lag import lead_lag, print_lead_lag
+            
+            print("\n⏱  Lead-Lag (does ETH move first?):")
+            print_lead_lag(lead_lag(eth_returns, bmnr_returns, max_lag=min(5, n // 4)), unit="days")
     else:
         print("✗ Could not calculate correlation")
     
@@ -4,83 +4,74 @@ BitMine (BMNR) Tracker - Python Implementation
 Fetches data from Yahoo Finance and generates HTML visualization
 """
 
-import json
-import urllib.request
-from datetime import datetime, timedelta
 import os
-import math
+import sys
+from datetime import datetime
 from position_tracker import (
     load_position, 
     calculate_position_status, 
     generate_position_html_section,
     get_position_css
 )
+from bar_store import open_store
+from fib_confluence import (
+    find_confluence,
+    support_resistance,
+    generate_confluence_html_section,
+    get_confluence_css
+)
+from leaderboard import ensure_built, generate_leaderboard_html_section, get_leaderboard_css, standings
+from liquidation_risk import position_risk
+from prediction_store import PREDICTIONS_DB, PREDICTIONS_JSON, connect as connect_predictions, export_json
+from prediction_tracker import run_scheduler
+from price_series import PriceSeries
+from rolling_stats import RollingStats
+from stats_kernel import summarize
+from value_at_risk import position_var
+from yahoo_client import fetch_bars, fetch_bars_since
+
+CSV_FILE = "data/bmnr_data.csv"
+CSV_HEADER = 'timestamp,open,high,low,close,volume\n'
+STATS_WINDOW_DAYS = 30
 
 def fetch_yahoo_finance(symbol, days=30):
     """Fetch stock data from Yahoo Finance"""
-    now = int(datetime.now().timestamp())
-    past = int((datetime.now() - timedelta(days=days)).timestamp())
-    
-    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-    url += f"?period1={past}&period2={now}&interval=1d"
-    
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    req = urllib.request.Request(url, headers=headers)
-    
     try:
-        with urllib.request.urlopen(req) as response:
-            data = json.loads(response.read().decode())
-            result = data['chart']['result'][0]
-            
-            timestamps = result['timestamp']
-            quotes = result['indicators']['quote'][0]
-            
-            # Build data list
-            data_points = []
-            for i in range(len(timestamps)):
-                if quotes['close'][i] is not None:
-                    data_points.append({
-                        'timestamp': datetime.fromtimestamp(timestamps[i]),
-                        'open': quotes['open'][i],
-                        'high': quotes['high'][i],
-                        'low': quotes['low'][i],
-                        'close': quotes['close'][i],
-                        'volume': quotes['volume'][i]
-                    })
-            
-            return data_points
+        return fetch_bars(symbol, days=days)
     except Exception as e:
         print(f"Error fetching data: {e}")
-        return []
+        return PriceSeries.empty(symbol)
 
-def calculate_statistics(data):
-    """Calculate statistics from stock data"""
+def fetch_yahoo_finance_since(symbol, start):
+    """Fetch stock data from Yahoo Finance starting at `start`"""
+    try:
+        return fetch_bars_since(symbol, start)
+    except Exception as e:
+        print(f"Error fetching data: {e}")
+        return PriceSeries.empty(symbol)
+
+def calculate_statistics(data, periods_per_year=252):
+    """
+    Calculate statistics from stock data
+    
+    `periods_per_year` annualizes volatility for the bar resolution
+    (252 for daily equity bars; see intraday.periods_per_year).
+    """
     if not data:
         return {}
     
-    latest = data[-1]
-    previous = data[-2] if len(data) > 1 else latest
-    
-    price_change = latest['close'] - previous['close']
-    price_change_pct = (price_change / previous['close']) * 100
-    
-    # Volatility calculation
-    closes = [d['close'] for d in data]
-    returns = [math.log(closes[i] / closes[i-1]) for i in range(1, len(closes))]
-    mean_return = sum(returns) / len(returns)
-    variance = sum((r - mean_return) ** 2 for r in returns) / len(returns)
-    volatility = math.sqrt(variance) * math.sqrt(252) * 100  # Annualized
+    k = summarize(data, periods_per_year)
     
     stats = {
-        'current_price': round(latest['close'], 2),
-        'previous_price': round(previous['close'], 2),
-        'price_change': round(price_change, 2),
-        'price_change_pct': round(price_change_pct, 2),
-        'daily_high': round(max(d['high'] for d in data[-5:]), 2),
-        'daily_low': round(min(d['low'] for d in data[-5:]), 2),
-        'volume': int(latest['volume']),
-        'volatility': round(volatility, 2),
-        'last_update': latest['timestamp'].strftime('%Y-%m-%d %H:%M:%S UTC')
+        'current_price': round(k['latest_close'], 2),
+        'previous_price': round(k['previous_close'], 2),
+        'price_change': round(k['change'], 2),
+        'price_change_pct': round(k['change_pct'], 2),
+        'daily_high': round(k['recent_high'], 2),
+        'daily_low': round(k['recent_low'], 2),
+        'volume': int(k['volume']),
+        'volatility': round(k['volatility'], 2),
+        'last_update': data.datetime(-1).strftime('%Y-%m-%d %H:%M:%S UTC')
     }
     
     return stats
@@ -93,8 +84,22 @@ def format_volume(vol):
         return f"{vol / 1_000:.2f}K"
     return str(vol)
 
-def generate_html(data, stats):
-    """Generate HTML page"""
+def load_leaderboard():
+    """(by source, by timeframe) leaderboard standings, or None without a prediction database"""
+    if not os.path.exists(PREDICTIONS_DB):
+        return None
+    conn = connect_predictions()
+    ensure_built(conn)
+    return standings(conn, 'source'), standings(conn, 'bucket')
+
+def generate_html(data, stats, confluence=None, leaders=None, risk=None, var=None):
+    """
+    Generate HTML page
+    
+    `confluence`: support/resistance zones, `leaders`: prediction
+    leaderboard, `risk`: Monte Carlo liquidation odds for the position,
+    `var`: its historical VaR/ES report.
+    """
     os.makedirs('docs', exist_ok=True)
     
     # Load active position if exists
@@ -105,9 +110,21 @@ def generate_html(data, stats):
     if position:
         current_price = stats['current_price']
         status = calculate_position_status(position, current_price)
-        position_html = generate_position_html_section(position, status)
+        position_html = generate_position_html_section(position, status, risk, var)
         position_css = get_position_css()
     
+    confluence_html = ""
+    confluence_css = ""
+    if confluence:
+        confluence_html = generate_confluence_html_section(confluence, stats['current_price'])
+        confluence_css = get_confluence_css()
+    
+    leaderboard_html = ""
+    leaderboard_css = ""
+    if leaders:
+        leaderboard_html = generate_leaderboard_html_section(*leaders)
+        leaderboard_css = get_leaderboard_css()
+    
     # Generate simple ASCII chart for now (can add matplotlib later)
     chart_placeholder = "📊 Chart generation with matplotlib coming next..."
     
@@ -204,6 +221,8 @@ def generate_html(data, stats):
             font-size: 0.9em;
         }}
         {position_css}
+        {confluence_css}
+        {leaderboard_css}
     </style>
 </head>
 <body>
@@ -244,6 +263,10 @@ def generate_html(data, stats):
         
         {position_html}
         
+        {confluence_html}
+        
+        {leaderboard_html}
+        
         <div class="chart-container">
             <h2>Price History (30 Days)</h2>
             <p>{chart_placeholder}</p>
@@ -276,42 +299,217 @@ def generate_html(data, stats):
     
     print(f"✓ HTML generated: docs/index.html")
 
-def save_csv(data):
+def _parse_csv_row(line):
+    timestamp, open_, high, low, close, volume = line.rstrip('\n').split(',')
+    return (
+        int(datetime.fromisoformat(timestamp).timestamp()),
+        float(open_), float(high), float(low), float(close), float(volume)
+    )
+
+def _format_csv_rows(series):
+    return ''.join(
+        f"{datetime.fromtimestamp(ts)},{o},{h},{l},{c},{int(v)}\n"
+        for ts, o, h, l, c, v in series
+    )
+
+def load_csv(path=CSV_FILE, symbol="BMNR"):
+    """Load stored history from CSV (empty series if none)"""
+    if not os.path.exists(path):
+        return PriceSeries.empty(symbol)
+    
+    with open(path, 'r') as f:
+        lines = f.readlines()[1:]
+    return PriceSeries.from_rows((_parse_csv_row(line) for line in lines if line.strip()), symbol)
+
+def save_csv(data, path=CSV_FILE):
     """Save data to CSV"""
-    os.makedirs('data', exist_ok=True)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    
+    with open(path, 'w') as f:
+        f.write(CSV_HEADER)
+        f.write(_format_csv_rows(data))
+    
+    print(f"✓ Data saved: {path}")
+
+def _day_start(ts):
+    """Local midnight at or before epoch second `ts`, as a datetime"""
+    dt = datetime.fromtimestamp(ts)
+    return datetime(dt.year, dt.month, dt.day)
+
+def _merge_offset(f, cutoff):
+    """
+    Byte offset of the first stored row at or after `cutoff`
+
+    Only the tail of the file is read: with a one-bar overlap the merge point
+    is almost always within the last few rows.
+    """
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    block = 4096
+    
+    while True:
+        start = max(0, size - block)
+        f.seek(start)
+        chunk = f.read(size - start)
+        lines = chunk.split(b'\n')
+        offset = start
+        if start > 0:
+            # First piece may be a partial row
+            offset += len(lines[0]) + 1
+            lines = lines[1:]
+        
+        merge_at = size
+        earliest_kept = None
+        for line in lines:
+            if line and not line.startswith(b'timestamp'):
+                ts = datetime.fromisoformat(line.split(b',', 1)[0].decode())
+                if ts >= cutoff and merge_at == size:
+                    merge_at = offset
+                if earliest_kept is None:
+                    earliest_kept = ts
+            offset += len(line) + 1
+        
+        if start == 0 or (earliest_kept is not None and earliest_kept < cutoff):
+            return min(merge_at, size)
+        block *= 4
+
+def merge_csv(new_data, path=CSV_FILE):
+    """
+    Merge freshly fetched bars into the stored CSV history
+    
+    Stored rows overlapping the new data (the re-fetched, possibly
+    still-forming, last bar) are truncated away and the new rows appended,
+    so only the changed tail of the file is rewritten.
+    """
+    if not new_data:
+        return 0
     
-    with open('data/bmnr_data.csv', 'w') as f:
-        f.write('timestamp,open,high,low,close,volume\n')
-        for d in data:
-            f.write(f"{d['timestamp']},{d['open']},{d['high']},{d['low']},{d['close']},{d['volume']}\n")
+    if not os.path.exists(path):
+        save_csv(new_data, path)
+        return len(new_data)
     
-    print(f"✓ Data saved: data/bmnr_data.csv")
+    # Daily bars are matched by date: the still-forming bar's timestamp can
+    # differ from the finalized one
+    cutoff = _day_start(new_data.timestamp[0])
+    
+    with open(path, 'r+b') as f:
+        offset = _merge_offset(f, cutoff)
+        f.seek(offset)
+        f.truncate()
+        if offset > 0:
+            f.seek(offset - 1)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+        f.write(_format_csv_rows(new_data).encode())
+    
+    print(f"✓ Data merged: {path} ({len(new_data)} rows from {cutoff.date()})")
+    return len(new_data)
+
+def export_csv(store, path=CSV_FILE):
+    """Write the whole stored history out as CSV for the Pages site"""
+    save_csv(store.read(), path)
+
+def update_history(symbol="BMNR", days=STATS_WINDOW_DAYS, full=False, path=CSV_FILE):
+    """
+    Bring the stored history up to date and return it
+    
+    The binary bar store (data/bars/) is the source of truth; the CSV is
+    kept in step for the Pages site. Incremental by default: only bars newer
+    than the last stored timestamp are requested (plus that last bar again so
+    it gets corrected). A full `days`-long window is fetched when there is no
+    history yet or `full` is set.
+    """
+    store = open_store(symbol, "1d")
+    history = store.read()
+    
+    if not history and os.path.exists(path):
+        # One-time import of the CSV history written by earlier versions
+        history = load_csv(path, symbol)
+        store.append(history)
+        print(f"✓ Imported {len(history)} bars from {path} into {store.path}")
+    
+    if full or not history:
+        print(f"\n📊 Fetching {symbol} data from Yahoo Finance ({days} days)...")
+        data = fetch_yahoo_finance(symbol, days=days)
+        if not data:
+            return history
+        print(f"✓ Fetched {len(data)} data points")
+        store.merge(data, from_ts=int(_day_start(data.timestamp[0]).timestamp()))
+        print("\n💾 Saving data to CSV...")
+        export_csv(store, path)
+        return store.read()
+    
+    last = history.datetime(-1)
+    print(f"\n📊 Fetching {symbol} data from Yahoo Finance since {last}...")
+    new_data = fetch_yahoo_finance_since(symbol, last)
+    if not new_data:
+        print("⚠️  No new data; using stored history")
+        return history
+    
+    print(f"✓ Fetched {len(new_data)} data points")
+    print("\n💾 Merging data into bar store and CSV...")
+    store.merge(new_data, from_ts=int(_day_start(new_data.timestamp[0]).timestamp()))
+    merge_csv(new_data, path)
+    
+    return store.read()
 
 def main():
     print("=" * 50)
     print("BitMine (BMNR) Tracker - Data Fetch & Update")
     print("=" * 50)
     
-    print("\n📊 Fetching BMNR data from Yahoo Finance...")
-    data = fetch_yahoo_finance("BMNR", days=30)
+    if '--export-csv' in sys.argv:
+        export_csv(open_store("BMNR", "1d"))
+        return
     
-    if not data:
+    history = update_history("BMNR", days=STATS_WINDOW_DAYS, full='--full' in sys.argv)
+    
+    if not history:
         print("✗ Failed to fetch data")
         return
     
-    print(f"✓ Fetched {len(data)} data points")
+    print(f"✓ {len(history)} bars of stored history")
     
-    print("\n💾 Saving data to CSV...")
-    save_csv(data)
+    # Dashboard statistics cover the recent window, not the whole history
+    window_start = history.timestamp[-1] - STATS_WINDOW_DAYS * 86400
+    data = history.since(window_start)
     
     print("\n📈 Calculating statistics...")
     stats = calculate_statistics(data)
     
+    # Keep the streaming engine current for pollers (position tracker etc.)
+    rolling = RollingStats.load() or RollingStats()
+    rolling.catch_up(history)
+    rolling.save()
+    
     print(f"Current Price: ${stats['current_price']}")
     print(f"24h Change: {stats['price_change']} ({stats['price_change_pct']}%)")
     
+    # Support/resistance from Fibonacci levels of every swing in the history
+    zones, legs = find_confluence(history)
+    confluence = support_resistance(zones, stats['current_price'])
+    print(f"📐 {len(zones)} confluence zones from {legs} swing legs")
+    
+    # Forward liquidation odds for the open position (cached while inputs are unchanged)
+    position = load_position()
+    risk = position_risk(position, history) if position else None
+    if risk:
+        print(f"🎲 Liquidation odds within {risk['horizons'][-1]} days: "
+              f"{risk['methods']['bootstrap']['liquidation'][-1]*100:.1f}%")
+    var = position_var(position, history, stats['current_price']) if position else None
+    if var:
+        print(f"📉 1-day 99% VaR (filtered): ฿{var['methods']['filtered']['1']['0.99']['var']:,.0f}")
+    
+    # Resolve and expire predictions against the updated bars, then publish
+    # the JSON copy of the database with the site, once per build
+    if os.path.exists(PREDICTIONS_DB) or os.path.exists(PREDICTIONS_JSON):
+        print("\n🎯 Checking predictions...")
+        run_scheduler()
+        count = export_json(connect_predictions())
+        print(f"✓ {count} predictions exported to {PREDICTIONS_JSON}")
+    
     print("\n🌐 Generating HTML page...")
-    generate_html(data, stats)
+    generate_html(data, stats, confluence, load_leaderboard(), risk, var)
     
     print("\n" + "=" * 50)
     print("✓ Update complete!")
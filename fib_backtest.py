@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Fibonacci Level Backtester
+Do Fibonacci levels actually act as support/resistance for BMNR?
+
+Walks the whole stored history, detects ZigZag swing legs and, for each
+leg, follows price for the next N bars at every ratio level: was the level
+touched, and after the touch did price bounce off it or break through?
+The same test runs on random control levels at about the same depth as
+each ratio (the ratio jittered by up to CONTROL_JITTER), so every ratio
+has a baseline that shares its distance from the end pivot.
+"""
+
+import math
+import os
+import random
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from fibonacci_calculator import ratio_label, swing_legs, zigzag
+from intraday import load_resolution
+
+try:
+    import numpy as np
+except ImportError:  # stdlib-only fallback
+    np = None
+
+BACKTEST_FILE = "data/fib_backtest.csv"
+BACKTEST_RATIOS = (0.236, 0.382, 0.5, 0.618, 0.786)
+FORWARD_BARS = 50
+CONTROLS_PER_RATIO = 10
+# Controls sit within this many ratio units of their Fibonacci ratio: close
+# enough to share its depth, far enough to miss a level that really matters
+CONTROL_JITTER = 0.03
+REACTION = 0.1  # bounce/break distance, as a fraction of the leg's range
+LEGS_PER_TASK = 64
+# Below this many leg-bars a pool costs more than it saves
+POOL_THRESHOLD = 500_000
+
+def _outcomes_numpy(levels, distance, highs, lows, closes):
+    """(touched, bounced, broken) counts for levels approached from above"""
+    levels = np.asarray(levels)[:, None]
+    highs = np.frombuffer(highs)
+    lows = np.frombuffer(lows)
+    closes = np.frombuffer(closes)
+    n = len(highs)
+    positions = np.arange(n)
+
+    hit = lows <= levels
+    touched = hit.any(axis=1)
+    touch = np.where(touched, hit.argmax(axis=1), n)[:, None]
+
+    # The touch bar only counts its close; later bars check the bounce on the high first
+    at_touch = positions == touch
+    after = positions > touch
+    bounce = (after & (highs >= levels + distance)) | (at_touch & (closes >= levels + distance))
+    broke = (after | at_touch) & (closes <= levels - distance)
+
+    first_bounce = np.where(bounce.any(axis=1), bounce.argmax(axis=1), n)
+    first_break = np.where(broke.any(axis=1), broke.argmax(axis=1), n)
+    bounced = (first_bounce < n) & (first_bounce <= first_break)
+    broken = (first_break < n) & (first_break < first_bounce)
+    return touched.tolist(), bounced.tolist(), broken.tolist()
+
+def _outcome(level, distance, highs, lows, closes):
+    """(touched, bounced, broken) for one level approached from above"""
+    for touch in range(len(lows)):
+        if lows[touch] <= level:
+            break
+    else:
+        return False, False, False
+
+    if closes[touch] >= level + distance:
+        return True, True, False
+    if closes[touch] <= level - distance:
+        return True, False, True
+    for i in range(touch + 1, len(highs)):
+        if highs[i] >= level + distance:
+            return True, True, False
+        if closes[i] <= level - distance:
+            return True, False, True
+    return True, False, False
+
+def _run_legs(task):
+    """
+    Count outcomes for one chunk of legs
+
+    Top-level so it can be shipped to pool workers. Returns
+    {ratio or ('control', ratio): [tested, touched, bounced, broken]}.
+    """
+    legs, ratios, controls, reaction, seed = task
+    counts = {key: [0, 0, 0, 0] for key in _keys(ratios)}
+
+    for key, up, low, high, highs, lows, closes in legs:
+        rng = random.Random(repr((seed, key)))
+        leg_ratios, labels = list(ratios), list(ratios)
+        for ratio in ratios:
+            leg_ratios += [ratio + rng.uniform(-CONTROL_JITTER, CONTROL_JITTER) for _ in range(controls)]
+            labels += [('control', ratio)] * controls
+        distance = (high - low) * reaction
+        levels = [low + (high - low) * r for r in leg_ratios]
+
+        # A downtrend leg is approached from below: mirror it to reuse the uptrend test
+        if not up:
+            levels = [-v for v in levels]
+            highs, lows, closes = (array('d', (-v for v in lows)), array('d', (-v for v in highs)),
+                                   array('d', (-v for v in closes)))
+
+        if np is not None:
+            results = zip(*_outcomes_numpy(levels, distance, highs, lows, closes))
+        else:
+            results = (_outcome(level, distance, highs, lows, closes) for level in levels)
+
+        for label, (touched, bounced, broken) in zip(labels, results):
+            row = counts[label]
+            row[0] += 1
+            row[1] += touched
+            row[2] += bounced
+            row[3] += broken
+    return counts
+
+def _keys(ratios):
+    return list(ratios) + [('control', ratio) for ratio in ratios]
+
+def backtest(series, threshold=0.10, ratios=BACKTEST_RATIOS, forward=FORWARD_BARS,
+             controls=CONTROLS_PER_RATIO, reaction=REACTION, seed=0, workers=None):
+    """
+    Hit-rate statistics per ratio and its controls over every completed swing leg
+
+    Legs come from a ZigZag at `threshold`; each is followed for `forward`
+    bars after its end pivot. Outcomes per level: touched, then bounced
+    (moved `reaction` × range back away from the level) or broken (closed
+    that far through it). Each ratio gets `controls` levels drawn within
+    CONTROL_JITTER of it, seeded per leg, so results do not depend on the
+    worker count. The end pivot is only known in hindsight, and how often a
+    level bounces depends mostly on its depth; controls at the same depth
+    share both, so compare each ratio with its own controls.
+
+    Returns ({ratio or ('control', ratio): [tested, touched, bounced,
+    broken]}, number of legs).
+    """
+    legs = swing_legs(zigzag(series, (threshold,))[threshold], include_pending=False)
+    highs, lows, closes = series.high, series.low, series.close
+
+    payload = []
+    for leg in legs:
+        start = leg['end_index'] + 1
+        end = min(start + forward, len(series))
+        if start >= end:
+            continue
+        payload.append(((leg['start_index'], leg['end_index']), leg['direction'] == 'uptrend',
+                        leg['low'], leg['high'], array('d', highs[start:end]),
+                        array('d', lows[start:end]), array('d', closes[start:end])))
+
+    tasks = [(payload[i:i + LEGS_PER_TASK], tuple(ratios), controls, reaction, seed)
+             for i in range(0, len(payload), LEGS_PER_TASK)]
+
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(payload) * forward >= POOL_THRESHOLD else 1
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            chunks = list(pool.map(_run_legs, tasks))
+    else:
+        chunks = [_run_legs(task) for task in tasks]
+
+    totals = {key: [0, 0, 0, 0] for key in _keys(ratios)}
+    for chunk in chunks:
+        for key, row in chunk.items():
+            totals[key] = [a + b for a, b in zip(totals[key], row)]
+    return totals, len(payload)
+
+def _rate(part, whole):
+    return part / whole if whole else 0.0
+
+def _z_score(hits, trials, control_hits, control_trials):
+    """Two-proportion z-score of a ratio's bounce rate against its controls"""
+    if not trials or not control_trials:
+        return 0.0
+    pooled = (hits + control_hits) / (trials + control_trials)
+    se = math.sqrt(pooled * (1 - pooled) * (1 / trials + 1 / control_trials))
+    return (hits / trials - control_hits / control_trials) / se if se else 0.0
+
+def hit_rates(totals):
+    """Rows of touch/bounce/break rates per ratio, with the bounce edge over its own controls"""
+    rows = []
+    for key, (tested, touched, bounced, broken) in totals.items():
+        if isinstance(key, tuple):
+            continue
+        control = totals[('control', key)]
+        rows.append({
+            'ratio': key,
+            'tested': tested,
+            'touch_rate': _rate(touched, tested),
+            'bounce_rate': _rate(bounced, touched),
+            'break_rate': _rate(broken, touched),
+            'control_bounce_rate': _rate(control[2], control[1]),
+            'edge': _rate(bounced, touched) - _rate(control[2], control[1]),
+            'z': _z_score(bounced, touched, control[2], control[1]),
+        })
+    return rows
+
+def write_results(rows, path=BACKTEST_FILE):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        f.write('ratio,tested,touch_rate,bounce_rate,break_rate,control_bounce_rate,edge,z\n')
+        for row in rows:
+            f.write(f"{row['ratio']},{row['tested']},{row['touch_rate']:.4f},{row['bounce_rate']:.4f},"
+                    f"{row['break_rate']:.4f},{row['control_bounce_rate']:.4f},{row['edge']:.4f},{row['z']:.2f}\n")
+    print(f"✓ Backtest results saved: {path}")
+
+def main():
+    args = list(sys.argv[1:])
+    options = {}
+    for flag in ('--resolution', '--threshold', '--bars', '--controls', '--seed', '--workers'):
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            del args[i:i + 2]
+
+    symbol = args[0] if args else "BMNR"
+    resolution = options.get('--resolution', '1d')
+    threshold = float(options.get('--threshold', 10)) / 100
+    forward = int(options.get('--bars', FORWARD_BARS))
+    controls = int(options.get('--controls', CONTROLS_PER_RATIO))
+    seed = int(options.get('--seed', 0))
+    workers = int(options['--workers']) if '--workers' in options else None
+
+    print("=" * 70)
+    print(f"Fibonacci Level Backtest: {symbol} @ {resolution}")
+    print(f"ZigZag {threshold * 100:g}% | {forward} bars forward | {controls} control levels per ratio and leg")
+    print("=" * 70)
+
+    series = load_resolution(symbol, resolution)
+    if len(series) < 3:
+        print(f"✗ No stored {symbol} data (run fetch_and_generate.py or intraday.py ingest first)")
+        return
+    print(f"\n✓ {len(series)} bars: {series.datetime(0):%Y-%m-%d} → {series.datetime(-1):%Y-%m-%d}")
+
+    totals, legs = backtest(series, threshold, forward=forward, controls=controls,
+                            seed=seed, workers=workers)
+    if not legs:
+        print("✗ No completed swing legs at this threshold")
+        return
+    print(f"✓ {legs} swing legs tested")
+
+    rows = hit_rates(totals)
+    print(f"\n   {'Level':>8s}  {'Tested':>7s}  {'Touch':>6s}  {'Bounce':>7s}  {'Break':>6s}  {'Nearby':>7s}  "
+          f"{'Edge':>7s}  {'z':>6s}")
+    for row in rows:
+        print(f"   {ratio_label(row['ratio']):>8s}  {row['tested']:7d}  {row['touch_rate']:6.1%}  "
+              f"{row['bounce_rate']:7.1%}  {row['break_rate']:6.1%}  {row['control_bounce_rate']:7.1%}  "
+              f"{row['edge'] * 100:+6.1f}pp  {row['z']:+6.2f}")
+
+    print("\n⚖️  VERDICT:")
+    significant = [row for row in rows if abs(row['z']) >= 1.96]
+    if not significant:
+        print("   ❌ No ratio bounces more often than random levels at the same depth (|z| < 1.96)")
+    for row in significant:
+        word = "MORE" if row['z'] > 0 else "LESS"
+        print(f"   ⚠️  {ratio_label(row['ratio'])} bounces {word} often than random levels at the same depth "
+              f"(z = {row['z']:+.2f})")
+
+    write_results(rows)
+    print("\n" + "=" * 70)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Fibonacci Confluence Zones
+Price zones where levels from many different swing legs cluster
+
+All levels of all legs are sorted once; a two-pointer sweep then finds,
+for every level, the window of levels within `width` above it while
+counting the distinct legs and ratios inside. The best-scoring windows
+that do not overlap become the zones: O(L log L) for L levels instead of
+comparing every pair.
+"""
+
+import sys
+from bisect import bisect_right
+
+from fibonacci_calculator import (
+    DEFAULT_RATIOS, ZIGZAG_THRESHOLDS, LevelIndex, ratio_label, unique_legs, zigzag
+)
+from intraday import load_resolution
+
+ZONE_WIDTH = 0.01  # zone height as a fraction of price
+MIN_LEGS = 2
+RATIO_WEIGHT = 0.5  # score = distinct legs + RATIO_WEIGHT × distinct ratios
+DASHBOARD_LEVELS = 5
+MAX_DISTANCE = 0.5  # ignore zones further than this fraction from price
+
+def _score(legs, ratios):
+    return legs + RATIO_WEIGHT * ratios
+
+def confluence_zones(legs, ratios=DEFAULT_RATIOS, width=ZONE_WIDTH, min_legs=MIN_LEGS):
+    """
+    Non-overlapping confluence zones, best first
+
+    A zone spans levels [low, low × (1 + width)]. Each zone dict has 'low',
+    'high', 'center' (mean of its levels), 'legs' and 'ratios' (distinct
+    counts), 'levels' (members), 'ratio_set' and 'score'. Zones backed by
+    fewer than `min_legs` different legs are dropped.
+    """
+    index = LevelIndex(legs, ratios)
+    prices, level_legs, level_ratios = index.prices, index.level_legs, index.level_ratios
+    n = len(prices)
+
+    # Sweep: window [i, j) holds every level within width above prices[i]
+    leg_counts, ratio_counts = {}, {}
+    candidates = []
+    j = 0
+    for i in range(n):
+        limit = prices[i] * (1 + width)
+        while j < n and prices[j] <= limit:
+            leg_counts[level_legs[j]] = leg_counts.get(level_legs[j], 0) + 1
+            ratio_counts[level_ratios[j]] = ratio_counts.get(level_ratios[j], 0) + 1
+            j += 1
+        if len(leg_counts) >= min_legs:
+            candidates.append((_score(len(leg_counts), len(ratio_counts)), i, j))
+
+        for counts, key in ((leg_counts, level_legs[i]), (ratio_counts, level_ratios[i])):
+            counts[key] -= 1
+            if not counts[key]:
+                del counts[key]
+
+    # Greedy pick of the best windows that share no levels
+    candidates.sort(key=lambda c: (-c[0], c[1]))
+    starts, ends = [], []
+    zones = []
+    for score, i, j in candidates:
+        k = bisect_right(starts, i)
+        if (k and ends[k - 1] > i) or (k < len(starts) and starts[k] < j):
+            continue
+        starts.insert(k, i)
+        ends.insert(k, j)
+
+        members = range(i, j)
+        zone_ratios = sorted({index.ratios[level_ratios[m]] for m in members})
+        zones.append({
+            'low': prices[i],
+            'high': prices[j - 1],
+            'center': sum(prices[m] for m in members) / (j - i),
+            'legs': len({level_legs[m] for m in members}),
+            'ratios': len(zone_ratios),
+            'levels': j - i,
+            'ratio_set': zone_ratios,
+            'score': score,
+        })
+    return zones
+
+def support_resistance(zones, current_price, count=DASHBOARD_LEVELS, max_distance=MAX_DISTANCE):
+    """
+    Ranked support (below price) and resistance (above price) zones
+
+    Zones straddling the current price count as both; zones more than
+    `max_distance` away are ignored. Each list holds up to `count` zones,
+    strongest first.
+    """
+    zones = [z for z in zones if abs(z['center'] / current_price - 1) <= max_distance]
+    support = [z for z in zones if z['low'] <= current_price][:count]
+    resistance = [z for z in zones if z['high'] >= current_price][:count]
+    return {'support': support, 'resistance': resistance}
+
+def find_confluence(series, thresholds=ZIGZAG_THRESHOLDS, ratios=DEFAULT_RATIOS,
+                    width=ZONE_WIDTH, min_legs=MIN_LEGS):
+    """Confluence zones over every ZigZag leg of `series` at all thresholds"""
+    legs = unique_legs(zigzag(series, thresholds).values())
+    return confluence_zones(legs, ratios, width, min_legs), len(legs)
+
+def _zone_row(zone, current_price):
+    distance = (zone['center'] / current_price - 1) * 100
+    ratios = ", ".join(ratio_label(r) for r in zone['ratio_set'])
+    return distance, ratios
+
+def generate_confluence_html_section(levels, current_price):
+    """Generate HTML section for the ranked support/resistance list"""
+    if not levels['support'] and not levels['resistance']:
+        return ""
+
+    def rows(zones):
+        out = []
+        for zone in zones:
+            distance, ratios = _zone_row(zone, current_price)
+            out.append(f"""
+                <tr>
+                    <td>${zone['low']:.2f} - ${zone['high']:.2f}</td>
+                    <td>{distance:+.1f}%</td>
+                    <td>{zone['legs']}</td>
+                    <td>{ratios}</td>
+                    <td>{zone['score']:.1f}</td>
+                </tr>""")
+        return "".join(out) or '<tr><td colspan="5">None</td></tr>'
+
+    header = "<tr><th>Zone</th><th>Distance</th><th>Legs</th><th>Ratios</th><th>Score</th></tr>"
+    return f"""
+    <div class="confluence-container">
+        <h2>📐 Fibonacci Confluence Zones</h2>
+        <p class="confluence-note">Price zones where levels from different swing legs cluster</p>
+        <div class="confluence-grid">
+            <div>
+                <h3>🔼 Resistance</h3>
+                <table class="confluence-table">{header}{rows(levels['resistance'])}
+                </table>
+            </div>
+            <div>
+                <h3>🔽 Support</h3>
+                <table class="confluence-table">{header}{rows(levels['support'])}
+                </table>
+            </div>
+        </div>
+    </div>
+    """
+
+def get_confluence_css():
+    """Additional CSS for the confluence section"""
+    return """
+    .confluence-container {
+        padding: 30px;
+    }
+
+    .confluence-container h2 {
+        color: #2c3e50;
+        margin-bottom: 5px;
+    }
+
+    .confluence-note {
+        color: #7f8c8d;
+        margin-bottom: 15px;
+    }
+
+    .confluence-grid {
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
+        gap: 20px;
+    }
+
+    .confluence-table {
+        width: 100%;
+        border-collapse: collapse;
+    }
+
+    .confluence-table th, .confluence-table td {
+        padding: 8px;
+        border-bottom: 1px solid #ecf0f1;
+        text-align: left;
+    }
+
+    .confluence-table th {
+        color: #7f8c8d;
+        font-size: 0.85em;
+        text-transform: uppercase;
+    }
+    """
+
+def main():
+    symbol = sys.argv[1] if len(sys.argv) > 1 else "BMNR"
+    resolution = sys.argv[2] if len(sys.argv) > 2 else "1d"
+
+    print("=" * 70)
+    print(f"Fibonacci Confluence Zones: {symbol} @ {resolution}")
+    print("=" * 70)
+
+    series = load_resolution(symbol, resolution)
+    if len(series) < 3:
+        print(f"✗ No stored {symbol} data (run fetch_and_generate.py or intraday.py ingest first)")
+        return
+
+    current_price = series.close[-1]
+    zones, legs = find_confluence(series)
+    print(f"\n✓ {len(series)} bars, {legs} swing legs, {len(zones)} zones")
+    print(f"💰 Current Price: ${current_price:.2f}")
+
+    levels = support_resistance(zones, current_price, count=10)
+    for title, key in (("🔼 Resistance", 'resistance'), ("🔽 Support", 'support')):
+        print(f"\n{title}:")
+        for zone in levels[key]:
+            distance, ratios = _zone_row(zone, current_price)
+            print(f"   ${zone['low']:8.2f} - ${zone['high']:8.2f}  {distance:+6.1f}%  "
+                  f"{zone['legs']:3d} legs  score {zone['score']:5.1f}  ({ratios})")
+
+    print("\n" + "=" * 70)
+
+if __name__ == "__main__":
+    main()
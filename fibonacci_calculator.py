@@ -4,43 +4,28 @@ Fibonacci Retracement Calculator
 Tests predictions like "$53.63 at the 618 Fibonacci level"
 """
 
-import json
-import urllib.request
-from datetime import datetime, timedelta
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import datetime
+
+from intraday import load_resolution
+from price_series import PriceSeries
+from yahoo_client import fetch_bars
+
+try:
+    import numpy as np
+except ImportError:  # stdlib-only fallback
+    np = None
 
 def fetch_stock_data(symbol, days=90):
     """Fetch stock data"""
-    now = int(datetime.now().timestamp())
-    past = int((datetime.now() - timedelta(days=days)).timestamp())
-    
-    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-    url += f"?period1={past}&period2={now}&interval=1d"
-    
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    req = urllib.request.Request(url, headers=headers)
-    
     try:
-        with urllib.request.urlopen(req) as response:
-            data = json.loads(response.read().decode())
-            result = data['chart']['result'][0]
-            
-            timestamps = result['timestamp']
-            quotes = result['indicators']['quote'][0]
-            
-            data_points = []
-            for i in range(len(timestamps)):
-                if quotes['close'][i] is not None:
-                    data_points.append({
-                        'timestamp': datetime.fromtimestamp(timestamps[i]),
-                        'high': quotes['high'][i],
-                        'low': quotes['low'][i],
-                        'close': quotes['close'][i]
-                    })
-            
-            return data_points
+        return fetch_bars(symbol, days=days)
     except Exception as e:
         print(f"Error fetching {symbol}: {e}")
-        return []
+        return PriceSeries.empty(symbol)
 
 def calculate_fibonacci_levels(low, high, direction="uptrend"):
     """
@@ -76,33 +61,231 @@ def calculate_fibonacci_levels(low, high, direction="uptrend"):
     
     return levels
 
+def _extreme_index(values, better):
+    """Index of the most recent extreme of `values` in a single pass"""
+    best = 0
+    for i in range(1, len(values)):
+        if not better(values[best], values[i]):
+            best = i
+    return best
+
 def find_swing_points(data, lookback=20):
     """Find significant swing high and swing low"""
-    closes = [d['close'] for d in data]
-    highs = [d['high'] for d in data]
-    lows = [d['low'] for d in data]
+    recent = data[-lookback:]
     
-    # Find recent swing high and low
-    recent_high = max(highs[-lookback:])
-    recent_low = min(lows[-lookback:])
+    # Find recent swing high and low (latest bar on ties)
+    high_index = _extreme_index(recent.high, lambda kept, new: kept > new)
+    low_index = _extreme_index(recent.low, lambda kept, new: kept < new)
+    recent_high = recent.high[high_index]
+    recent_low = recent.low[low_index]
     
     # Find overall period high and low
-    period_high = max(highs)
-    period_low = min(lows)
-    
-    # Find dates
-    recent_high_date = data[[d['high'] for d in data].index(recent_high)]['timestamp']
-    recent_low_date = data[[d['low'] for d in data].index(recent_low)]['timestamp']
+    period_high = max(data.high)
+    period_low = min(data.low)
     
     return {
         'recent_high': recent_high,
         'recent_low': recent_low,
-        'recent_high_date': recent_high_date,
-        'recent_low_date': recent_low_date,
+        'recent_high_date': recent.datetime(high_index),
+        'recent_low_date': recent.datetime(low_index),
         'period_high': period_high,
         'period_low': period_low
     }
 
+SWING_HIGH = 1
+SWING_LOW = -1
+ZIGZAG_THRESHOLDS = (0.05, 0.10, 0.20)
+
+def average_true_range(data, period=14):
+    """
+    Wilder ATR for every bar in one pass
+
+    Bars before `period` use the plain mean of the true ranges seen so far.
+    """
+    highs, lows, closes = data.high, data.low, data.close
+    atr = array('d')
+    value = 0.0
+    for i in range(len(highs)):
+        if i == 0:
+            tr = highs[0] - lows[0]
+        else:
+            prev = closes[i - 1]
+            tr = max(highs[i] - lows[i], abs(highs[i] - prev), abs(lows[i] - prev))
+        n = min(i + 1, period)
+        value += (tr - value) / n
+        atr.append(value)
+    return atr
+
+def _swing_arrays():
+    return {'index': array('q'), 'timestamp': array('q'), 'price': array('d'),
+            'kind': array('b'), 'pending': None}
+
+class _ZigZag:
+    """
+    ZigZag state machine for one threshold
+
+    A swing is confirmed once price reverses from the running extreme by at
+    least the threshold distance; the extreme not yet confirmed is kept as
+    `pending`.
+    """
+
+    def __init__(self, threshold, mode='percent'):
+        self.threshold = threshold
+        self.mode = mode
+        self.swings = _swing_arrays()
+        self.trend = 0
+        self.high = self.low = None  # (index, price) candidates
+
+    def _confirm(self, candidate, kind, timestamps):
+        index, price = candidate
+        self.swings['index'].append(index)
+        self.swings['timestamp'].append(timestamps[index])
+        self.swings['price'].append(price)
+        self.swings['kind'].append(kind)
+
+    def _distance(self, price, atr):
+        """Reversal needed from `price` to confirm a swing"""
+        return price * self.threshold if self.mode == 'percent' else atr * self.threshold
+
+    def feed(self, i, high, low, atr, timestamps):
+        if self.trend == 0:
+            if self.high is None or high > self.high[1]:
+                self.high = (i, high)
+            if self.low is None or low < self.low[1]:
+                self.low = (i, low)
+            if self.low[0] < i and high >= self.low[1] + self._distance(self.low[1], atr):
+                self._confirm(self.low, SWING_LOW, timestamps)
+                self.trend, self.high = 1, (i, high)
+            elif self.high[0] < i and low <= self.high[1] - self._distance(self.high[1], atr):
+                self._confirm(self.high, SWING_HIGH, timestamps)
+                self.trend, self.low = -1, (i, low)
+        elif self.trend > 0:
+            if high > self.high[1]:
+                self.high = (i, high)
+            elif low <= self.high[1] - self._distance(self.high[1], atr):
+                self._confirm(self.high, SWING_HIGH, timestamps)
+                self.trend, self.low = -1, (i, low)
+        else:
+            if low < self.low[1]:
+                self.low = (i, low)
+            elif high >= self.low[1] + self._distance(self.low[1], atr):
+                self._confirm(self.low, SWING_LOW, timestamps)
+                self.trend, self.high = 1, (i, high)
+
+    def finish(self, timestamps):
+        if self.trend:
+            index, price = self.high if self.trend > 0 else self.low
+            self.swings['pending'] = (index, timestamps[index], price,
+                                      SWING_HIGH if self.trend > 0 else SWING_LOW)
+        return self.swings
+
+def zigzag(data, thresholds=ZIGZAG_THRESHOLDS, mode='percent', atr_period=14):
+    """
+    Every ZigZag swing high/low for several thresholds in one pass
+
+    mode='percent': a threshold of 0.10 needs a 10% reversal from the extreme.
+    mode='atr':     a threshold of 3 needs a reversal of 3 × ATR(atr_period).
+
+    Returns {threshold: swings} where swings holds parallel arrays 'index',
+    'timestamp', 'price', 'kind' (SWING_HIGH / SWING_LOW, alternating) plus
+    'pending', the latest unconfirmed extreme as (index, timestamp, price,
+    kind) or None.
+    """
+    if mode not in ('percent', 'atr'):
+        raise ValueError(f"Unknown zigzag mode: {mode}")
+
+    machines = [_ZigZag(t, mode) for t in thresholds]
+    timestamps, highs, lows = data.timestamp, data.high, data.low
+    atr = average_true_range(data, atr_period) if mode == 'atr' else None
+
+    for i in range(len(timestamps)):
+        for machine in machines:
+            machine.feed(i, highs[i], lows[i], atr[i] if atr else None, timestamps)
+
+    return {m.threshold: m.finish(timestamps) for m in machines}
+
+def _window_extremes(values, order, beats):
+    """Indices that are the extreme of the centred window of ±order bars (monotonic deque)"""
+    window = deque()
+    found = []
+    for end in range(len(values)):
+        while window and not beats(values[window[-1]], values[end]) and values[window[-1]] != values[end]:
+            window.pop()
+        window.append(end)
+        center = end - order
+        if window[0] < center - order:
+            window.popleft()
+        if center >= order and window[0] == center:
+            found.append(center)
+    return found
+
+def fractals(data, order=2):
+    """
+    Fractal swing points: a high (low) above (below) the `order` bars on each side
+
+    Linear time via sliding-window monotonic deques. On ties the earliest bar
+    wins. Returns swing arrays in the same layout as zigzag(); consecutive
+    swings of the same kind are possible (see swing_legs).
+    """
+    highs = _window_extremes(data.high, order, lambda kept, new: kept > new)
+    lows = _window_extremes(data.low, order, lambda kept, new: kept < new)
+    swings = _swing_arrays()
+
+    points = sorted([(i, SWING_HIGH) for i in highs] + [(i, SWING_LOW) for i in lows])
+    for i, kind in points:
+        swings['index'].append(i)
+        swings['timestamp'].append(data.timestamp[i])
+        swings['price'].append(data.high[i] if kind == SWING_HIGH else data.low[i])
+        swings['kind'].append(kind)
+    return swings
+
+def swing_legs(swings, include_pending=True):
+    """
+    Consecutive high→low / low→high legs of a swing set
+
+    Runs of same-kind swings (possible with fractals) collapse to their
+    most extreme point. Each leg is a dict with 'low', 'high', 'direction'
+    ('uptrend' ends on the high), and the start/end index and timestamp.
+    """
+    points = list(zip(swings['index'], swings['timestamp'], swings['price'], swings['kind']))
+    if include_pending and swings.get('pending'):
+        points.append(swings['pending'])
+
+    alternating = []
+    for point in points:
+        if alternating and alternating[-1][3] == point[3]:
+            kind, kept = point[3], alternating[-1][2]
+            if (kind == SWING_HIGH and point[2] > kept) or (kind == SWING_LOW and point[2] < kept):
+                alternating[-1] = point
+            continue
+        alternating.append(point)
+
+    legs = []
+    for start, end in zip(alternating, alternating[1:]):
+        up = end[3] == SWING_HIGH
+        legs.append({
+            'direction': 'uptrend' if up else 'downtrend',
+            'low': start[2] if up else end[2],
+            'high': end[2] if up else start[2],
+            'start_index': start[0],
+            'end_index': end[0],
+            'start_timestamp': start[1],
+            'end_timestamp': end[1],
+        })
+    return legs
+
+def unique_legs(swing_sets, include_pending=True):
+    """Swing legs of several swing sets (e.g. zigzag() thresholds), each leg once"""
+    legs = {}
+    for swings in swing_sets:
+        for leg in swing_legs(swings, include_pending):
+            legs.setdefault((leg['start_index'], leg['end_index']), leg)
+    return list(legs.values())
+
+def leg_fibonacci(legs):
+    """Fibonacci levels for every swing leg: [(leg, levels)]"""
+    return [(leg, calculate_fibonacci_levels(leg['low'], leg['high'], leg['direction'])) for leg in legs]
+
 def analyze_claim(target_price, current_price, fib_levels):
     """Analyze a specific Fibonacci claim"""
     closest_level = None
@@ -116,14 +299,205 @@ def analyze_claim(target_price, current_price, fib_levels):
     
     return closest_level, closest_diff
 
+RETRACEMENT_RATIOS = (0.0, 0.236, 0.382, 0.5, 0.618, 0.786, 1.0)
+EXTENSION_RATIOS = (1.618, 2.618)
+DEFAULT_RATIOS = RETRACEMENT_RATIOS + EXTENSION_RATIOS
+CLAIM_TOLERANCE = 0.01  # fraction of the target price
+
+def ratio_label(ratio):
+    return f"{ratio * 100:.1f}%"
+
+def parse_claim(text):
+    """
+    Parse "53.63@618", "53.63@0.618", "53.63@61.8%" or plain "53.63"
+
+    Returns (target_price, ratio or None). Values up to 10 are ratios as
+    written; whole numbers above 100 are quoted ratio digits ("the 618",
+    "the 1618") and are scaled down by 1000; anything else above 10 is a
+    percentage ("the 50", "the 100", "61.8").
+    """
+    price, _, ratio = text.partition('@')
+    if not ratio:
+        return float(price), None
+    if ratio.endswith('%'):
+        return float(price), float(ratio[:-1]) / 100
+    value = float(ratio)
+    if value <= 10:
+        return float(price), value
+    if value > 100 and value.is_integer():
+        return float(price), value / 1000
+    return float(price), value / 100
+
+class LevelIndex:
+    """
+    Fibonacci levels of many swing legs, sorted for bisection
+
+    Levels are low + range × ratio, so within a leg they are the sorted
+    ratio list mapped through an increasing affine function: the nearest
+    level to a target is found by bisecting the ratios at the target's
+    normalized position. All legs' levels are also kept in one sorted price
+    array so "every level within ±tolerance" is two bisections.
+    Legs with no range are skipped.
+    """
+
+    def __init__(self, legs, ratios=DEFAULT_RATIOS):
+        self.legs = [leg for leg in legs if leg['high'] > leg['low']]
+        self.ratios = sorted(ratios)
+        self.lows = array('d', (leg['low'] for leg in self.legs))
+        self.ranges = array('d', (leg['high'] - leg['low'] for leg in self.legs))
+
+        entries = sorted(
+            (low + span * ratio, leg, k)
+            for leg, (low, span) in enumerate(zip(self.lows, self.ranges))
+            for k, ratio in enumerate(self.ratios)
+        )
+        self.prices = array('d', (e[0] for e in entries))
+        self.level_legs = array('q', (e[1] for e in entries))
+        self.level_ratios = array('q', (e[2] for e in entries))
+
+    def __len__(self):
+        return len(self.legs)
+
+    def level(self, leg, ratio):
+        return self.lows[leg] + self.ranges[leg] * ratio
+
+    def nearest(self, targets):
+        """
+        Nearest level of every leg for every target
+
+        Returns (ratio_ids, levels) as len(targets) × len(legs) nested lists.
+        """
+        if not self.legs or not targets:
+            return [[] for _ in targets], [[] for _ in targets]
+
+        if np is not None:
+            ratios = np.asarray(self.ratios)
+            lows = np.frombuffer(self.lows)
+            ranges = np.frombuffer(self.ranges)
+            position = (np.asarray(targets, dtype=np.float64)[:, None] - lows) / ranges
+            right = np.clip(np.searchsorted(ratios, position), 1, len(ratios) - 1)
+            left = right - 1
+            pick = np.where(position - ratios[left] <= ratios[right] - position, left, right)
+            return pick.tolist(), (lows + ranges * ratios[pick]).tolist()
+
+        ratios = self.ratios
+        last = len(ratios) - 1
+        ids, levels = [], []
+        for target in targets:
+            row_ids, row_levels = [], []
+            for low, span in zip(self.lows, self.ranges):
+                position = (target - low) / span
+                right = min(max(bisect_left(ratios, position), 1), last) if last else 0
+                k = right
+                if last and position - ratios[right - 1] <= ratios[right] - position:
+                    k = right - 1
+                row_ids.append(k)
+                row_levels.append(low + span * ratios[k])
+            ids.append(row_ids)
+            levels.append(row_levels)
+        return ids, levels
+
+    def within(self, target, tolerance=CLAIM_TOLERANCE):
+        """Every (leg, ratio, level) within ±tolerance × target, nearest first"""
+        lo = bisect_left(self.prices, target * (1 - tolerance))
+        hi = bisect_right(self.prices, target * (1 + tolerance))
+        hits = [(self.level_legs[i], self.ratios[self.level_ratios[i]], self.prices[i]) for i in range(lo, hi)]
+        return sorted(hits, key=lambda hit: abs(hit[2] - target))
+
+def evaluate_claims(claims, legs, ratios=DEFAULT_RATIOS, tolerance=CLAIM_TOLERANCE):
+    """
+    Check many "X at the 618"-style claims against many swing legs at once
+
+    `claims` is a list of target prices or (target, ratio) pairs. Returns a
+    columnar table with one row per (claim, leg): 'claim', 'target', 'leg',
+    'ratio' and 'level' of the nearest level, 'diff_pct', 'within', and for
+    claims that name a ratio, 'claimed_level' and 'holds' (the claimed
+    ratio's level is within tolerance).
+    """
+    claims = [c if isinstance(c, tuple) else (c, None) for c in claims]
+    index = LevelIndex(legs, ratios)
+    ratio_ids, levels = index.nearest([target for target, _ in claims])
+
+    table = {name: [] for name in ('claim', 'target', 'leg', 'ratio', 'level', 'diff_pct',
+                                   'within', 'claimed_level', 'holds')}
+    for c, (target, claimed) in enumerate(claims):
+        for leg in range(len(index)):
+            level = levels[c][leg]
+            diff_pct = (level - target) / target * 100
+            claimed_level = index.level(leg, claimed) if claimed is not None else None
+            table['claim'].append(c)
+            table['target'].append(target)
+            table['leg'].append(leg)
+            table['ratio'].append(index.ratios[ratio_ids[c][leg]])
+            table['level'].append(level)
+            table['diff_pct'].append(diff_pct)
+            table['within'].append(abs(diff_pct) <= tolerance * 100)
+            table['claimed_level'].append(claimed_level)
+            table['holds'].append(claimed_level is not None
+                                  and abs(claimed_level - target) <= tolerance * target)
+    table['legs'] = index.legs
+    return table
+
+def summarize_claims(claims, table):
+    """Best-matching leg and number of supporting legs for each claim"""
+    claims = [c if isinstance(c, tuple) else (c, None) for c in claims]
+    per_claim = len(table['legs'])
+    summary = []
+    for c, (target, claimed) in enumerate(claims):
+        rows = range(c * per_claim, (c + 1) * per_claim)  # rows are grouped by claim
+        if claimed is not None:
+            candidates = [i for i in rows if table['claimed_level'][i] is not None]
+            best = min(candidates, key=lambda i: abs(table['claimed_level'][i] - target), default=None)
+        else:
+            best = min(rows, key=lambda i: abs(table['diff_pct'][i]), default=None)
+        summary.append({
+            'target': target,
+            'ratio': claimed,
+            'legs': len(rows),
+            'near_any': sum(1 for i in rows if table['within'][i]),
+            'holds': sum(1 for i in rows if table['holds'][i]),
+            'best': best,
+        })
+    return summary
+
+def print_claims(claims, table, tolerance=CLAIM_TOLERANCE):
+    """Print one line per claim plus its best-matching swing leg"""
+    print(f"\n   {'Claim':>18s}  {'Legs':>5s}  {'Near':>5s}  {'Holds':>5s}   Best leg")
+    for entry in summarize_claims(claims, table):
+        label = f"${entry['target']:.2f}"
+        if entry['ratio'] is not None:
+            label += f" @ {ratio_label(entry['ratio'])}"
+        holds = f"{entry['holds']:5d}" if entry['ratio'] is not None else "    -"
+        best = "-"
+        if entry['best'] is not None:
+            i = entry['best']
+            leg = table['legs'][table['leg'][i]]
+            start = datetime.fromtimestamp(leg['start_timestamp']).strftime('%Y-%m-%d')
+            end = datetime.fromtimestamp(leg['end_timestamp']).strftime('%Y-%m-%d')
+            if entry['ratio'] is not None:
+                level, ratio = table['claimed_level'][i], entry['ratio']
+            else:
+                level, ratio = table['level'][i], table['ratio'][i]
+            best = (f"{start}→{end} {ratio_label(ratio)} = ${level:.2f} "
+                    f"({(level / entry['target'] - 1) * 100:+.1f}%)")
+        print(f"   {label:>18s}  {entry['legs']:5d}  {entry['near_any']:5d}  {holds}   {best}")
+    print(f"\n   Near: legs with any level within ±{tolerance * 100:g}% of the target")
+    print(f"   Holds: legs whose claimed-ratio level is within ±{tolerance * 100:g}%")
+
 def main():
     print("=" * 70)
     print("Fibonacci Retracement Calculator")
     print("Testing claim: '$53.63 at the 618 Fibonacci level'")
     print("=" * 70)
     
-    print("\n📊 Fetching BMNR data (90 days)...")
-    data = fetch_stock_data("BMNR", days=90)
+    if '--resolution' in sys.argv:
+        # Swing analysis on stored bars resampled to any timeframe
+        resolution = sys.argv[sys.argv.index('--resolution') + 1]
+        print(f"\n📊 Loading stored BMNR data at {resolution} resolution...")
+        data = load_resolution("BMNR", resolution)
+    else:
+        print("\n📊 Fetching BMNR data (90 days)...")
+        data = fetch_stock_data("BMNR", days=90)
     
     if not data:
         print("✗ Failed to fetch data")
@@ -131,7 +505,7 @@ def main():
     
     print(f"✓ Fetched {len(data)} data points")
     
-    current_price = data[-1]['close']
+    current_price = data.close[-1]
     print(f"\n💰 Current Price: ${current_price:.2f}")
     
     # Find swing points
@@ -145,6 +519,27 @@ def main():
     print(f"   High: ${swing['period_high']:.2f}")
     print(f"   Low:  ${swing['period_low']:.2f}")
     
+    # Every swing leg in the history, not just the two windows above
+    mode, thresholds = 'percent', ZIGZAG_THRESHOLDS
+    if '--atr' in sys.argv:
+        mode = 'atr'
+        thresholds = tuple(float(t) for t in sys.argv[sys.argv.index('--atr') + 1].split(','))
+    elif '--zigzag' in sys.argv:
+        thresholds = tuple(float(t) / 100 for t in sys.argv[sys.argv.index('--zigzag') + 1].split(','))
+    
+    print(f"\n📊 ZigZag Swings ({'× ATR' if mode == 'atr' else '% reversal'}):")
+    swing_sets = zigzag(data, thresholds, mode)
+    for threshold, swings in swing_sets.items():
+        label = f"{threshold:g}× ATR" if mode == 'atr' else f"{threshold * 100:g}%"
+        legs = swing_legs(swings)
+        print(f"\n   {label}: {len(swings['index'])} confirmed swings, {len(legs)} legs")
+        for leg, levels in leg_fibonacci(legs[-3:]):
+            start = datetime.fromtimestamp(leg['start_timestamp']).strftime('%Y-%m-%d')
+            end = datetime.fromtimestamp(leg['end_timestamp']).strftime('%Y-%m-%d')
+            arrow = "↗" if leg['direction'] == 'uptrend' else "↘"
+            print(f"   {arrow} {start} → {end}  ${leg['low']:.2f}-${leg['high']:.2f}  "
+                  f"61.8% at ${levels['61.8%']:.2f}")
+    
     # Calculate Fibonacci levels for different scenarios
     print("\n" + "=" * 70)
     print("FIBONACCI RETRACEMENT LEVELS")
@@ -228,6 +623,17 @@ def main():
         print(f"     ${target_price} doesn't align with standard 61.8% calculations")
         print(f"     May be using different swing points or extensions")
     
+    # Every claim against every swing leg in one call
+    claims = [(target_price, 0.618)]
+    if '--claims' in sys.argv:
+        claims = [parse_claim(c) for c in sys.argv[sys.argv.index('--claims') + 1].split(',')]
+    
+    print("\n" + "=" * 70)
+    all_legs = unique_legs(swing_sets.values())
+    print(f"BATCH CLAIM CHECK ({len(claims)} claims × {len(all_legs)} swing legs)")
+    print("=" * 70)
+    print_claims(claims, evaluate_claims(claims, all_legs))
+    
     print("\n📝 Assembly Programmer's Note:")
     print("   Fibonacci retracements are DESCRIPTIVE, not PREDICTIVE")
     print("   They describe levels where traders might act, not where price WILL go")
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Intraday Ingestion & Resampling
+Stores 1m/5m/1h bars and streams them into higher-timeframe OHLCV bars
+"""
+
+import os
+import sys
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from bar_store import open_store, store_path
+from price_series import Bar, PriceSeries
+from yahoo_client import fetch_bars_since
+
+INTERVAL_SECONDS = {
+    '1m': 60, '2m': 120, '5m': 300, '15m': 900, '30m': 1800,
+    '1h': 3600, '1d': 86400, '1wk': 7 * 86400,
+}
+
+# Yahoo only serves this much intraday history, at most MAX_REQUEST_DAYS per call
+MAX_HISTORY_DAYS = {'1m': 29, '2m': 59, '5m': 59, '15m': 59, '30m': 59, '1h': 729}
+MAX_REQUEST_DAYS = {'1m': 7, '2m': 59, '5m': 59, '15m': 59, '30m': 59, '1h': 729}
+
+EXCHANGE_TZ = ZoneInfo("America/New_York")
+SESSION_OPEN = time(9, 30)
+SESSION_CLOSE = time(16, 0)
+EQUITY_SESSION_SECONDS = 390 * 60
+
+# 1970-01-05 was a Monday: crypto weeks start Monday 00:00 UTC
+WEEK_ANCHOR = 4 * 86400
+
+def session_type(symbol):
+    """'crypto' (24/7) for Yahoo crypto pairs like ETH-USD, else 'equity'"""
+    return 'crypto' if symbol.upper().endswith('-USD') else 'equity'
+
+def periods_per_year(interval, session='equity'):
+    """Bars per year at `interval`, for annualizing volatility"""
+    if interval == '1wk':
+        return 52
+    if interval == '1d':
+        return 365 if session == 'crypto' else 252
+    seconds = INTERVAL_SECONDS[interval]
+    if session == 'crypto':
+        return 365 * 86400 // seconds
+    return 252 * -(-EQUITY_SESSION_SECONDS // seconds)
+
+class _EquitySessions:
+    """
+    Regular-session boundaries for the exchange calendar
+
+    Boundaries are recomputed only when a bar falls on a new local day, so
+    the per-bar cost is a couple of integer comparisons.
+    """
+
+    def __init__(self):
+        self._day_start = self._day_end = None
+
+    def _load(self, ts):
+        if self._day_start is not None and self._day_start <= ts < self._day_end:
+            return
+        day = datetime.fromtimestamp(ts, EXCHANGE_TZ).date()
+        monday = day - timedelta(days=day.weekday())
+
+        def epoch(d, t):
+            return int(datetime.combine(d, t, EXCHANGE_TZ).timestamp())
+
+        self._day_start = epoch(day, time(0))
+        self._day_end = epoch(day + timedelta(days=1), time(0))
+        self._open = epoch(day, SESSION_OPEN)
+        self._close = epoch(day, SESSION_CLOSE)
+        self._week_open = epoch(monday, SESSION_OPEN)
+        self._trading_day = day.weekday() < 5
+
+    def _in_session(self, ts, check_hours=True):
+        # Close is inclusive: Yahoo stamps a day's closing print at 16:00
+        self._load(ts)
+        if not check_hours:
+            return self._trading_day
+        return self._trading_day and self._open <= ts <= self._close
+
+    def intraday(self, ts, seconds):
+        if not self._in_session(ts):
+            return None
+        return self._open + (ts - self._open) // seconds * seconds
+
+    def daily(self, ts, check_hours=True):
+        return self._open if self._in_session(ts, check_hours) else None
+
+    def weekly(self, ts, check_hours=True):
+        return self._week_open if self._in_session(ts, check_hours) else None
+
+def _bucketer(target, session, intraday_source=True):
+    """Function mapping a bar timestamp to its bucket start (None = drop)"""
+    seconds = INTERVAL_SECONDS[target]
+    if session == 'crypto':
+        if target == '1wk':
+            return lambda ts: ts - (ts - WEEK_ANCHOR) % seconds
+        return lambda ts: ts - ts % seconds
+
+    # Daily source bars already represent a whole session (and their stamps
+    # vary), so they are only matched to their trading day
+    sessions = _EquitySessions()
+    if target == '1wk':
+        return lambda ts: sessions.weekly(ts, intraday_source)
+    if target == '1d':
+        return lambda ts: sessions.daily(ts, intraday_source)
+    return lambda ts: sessions.intraday(ts, seconds)
+
+def resample(bars, target, session='equity', source=None):
+    """
+    Stream time-ordered bars into `target` bars
+
+    open=first, high=max, low=min, close=last, volume=sum. Equity buckets
+    follow the regular session (pre/post-market bars are dropped, intraday
+    buckets are anchored at the open); crypto buckets are UTC-aligned. Only
+    the bucket being built is held in memory. The final bucket may still be
+    forming. Pass the `source` interval when resampling daily bars.
+    """
+    intraday_source = source is None or INTERVAL_SECONDS[source] < INTERVAL_SECONDS['1d']
+    bucket_of = _bucketer(target, session, intraday_source)
+    current = None
+
+    for ts, o, h, l, c, v in bars:
+        start = bucket_of(ts)
+        if start is None:
+            continue
+        if current is None or start != current[0]:
+            if current is not None:
+                yield Bar(*current)
+            current = [start, o, h, l, c, v]
+        else:
+            if h > current[2]:
+                current[2] = h
+            if l < current[3]:
+                current[3] = l
+            current[4] = c
+            current[5] += v
+
+    if current is not None:
+        yield Bar(*current)
+
+def resample_series(series, target, session=None, source=None):
+    """Resample a PriceSeries to `target`"""
+    session = session or session_type(series.symbol or '')
+    return PriceSeries.from_rows(resample(series, target, session, source), series.symbol)
+
+def ingest(symbol, interval='1m'):
+    """
+    Bring the `interval` bar store for `symbol` up to date
+
+    Picks up from the last stored bar (re-fetching it so a forming bar is
+    corrected), or from as far back as Yahoo serves on first run, walking
+    forward in request-sized chunks.
+    """
+    store = open_store(symbol, interval)
+    stored = store.read()
+    now = datetime.now()
+    earliest = now - timedelta(days=MAX_HISTORY_DAYS.get(interval, 3650))
+    start = max(stored.datetime(-1), earliest) if stored else earliest
+    step = timedelta(days=MAX_REQUEST_DAYS.get(interval, 3650))
+
+    added = 0
+    while start < now:
+        end = min(start + step, now)
+        try:
+            chunk = fetch_bars_since(symbol, start, interval, period2=end)
+        except Exception as e:
+            print(f"Error fetching {symbol} {interval}: {e}")
+            break
+        added += store.merge(chunk)
+        start = end
+
+    print(f"✓ {store.describe()} (+{added} bars fetched)")
+    return store
+
+def load_resolution(symbol, resolution, source=None, session=None):
+    """
+    Bars for `symbol` at `resolution`, resampled from one stored source
+
+    `source` defaults to the finest stored interval not coarser than
+    `resolution`. `session` defaults to the symbol's own; pass 'equity' to
+    bucket a crypto pair on exchange hours so its bars line up with a
+    stock's.
+    """
+    if source is None:
+        candidates = sorted(
+            (i for i in INTERVAL_SECONDS
+             if INTERVAL_SECONDS[i] <= INTERVAL_SECONDS[resolution]
+             and os.path.exists(store_path(symbol, i))),
+            key=INTERVAL_SECONDS.get
+        )
+        if not candidates:
+            return PriceSeries.empty(symbol)
+        source = candidates[0]
+
+    native = session_type(symbol)
+    series = open_store(symbol, source).read()
+    if source == resolution and session in (None, native):
+        return series
+    return resample_series(series, resolution, session or native, source)
+
+def main():
+    usage = (
+        "Usage:\n"
+        "  python3 intraday.py ingest <symbol> [interval]            - Fetch bars into the store\n"
+        "  python3 intraday.py stats <symbol> <resolution> [source]  - Statistics at a resolution"
+    )
+    if len(sys.argv) < 3:
+        print(usage)
+        return
+
+    command, symbol = sys.argv[1], sys.argv[2]
+
+    if command == "ingest":
+        ingest(symbol, sys.argv[3] if len(sys.argv) > 3 else '1m')
+
+    elif command == "stats" and len(sys.argv) > 3:
+        from fetch_and_generate import calculate_statistics
+
+        resolution = sys.argv[3]
+        source = sys.argv[4] if len(sys.argv) > 4 else None
+        series = load_resolution(symbol, resolution, source)
+        if len(series) < 2:
+            print(f"✗ Not enough stored {symbol} data for {resolution} bars")
+            return
+
+        stats = calculate_statistics(series, periods_per_year(resolution, session_type(symbol)))
+        print(f"\n📊 {symbol} @ {resolution} ({len(series)} bars)")
+        for key, value in stats.items():
+            print(f"   {key:18s} {value}")
+
+    else:
+        print(usage)
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,12 @@ Simulate short selling with real-world mechanics
 Currency: Bytes (฿) where ฿1 = $1 USD equivalent
 """
 
-import json
-import os
 from datetime import datetime, timedelta
-import urllib.request
+from bar_store import open_store
+from portfolio import Portfolio
+from trade_journal import JOURNAL_FILE, open_journal
+from yahoo_client import get_market_price
 
-POSITION_FILE = "data/trading_position.json"
 BORROW_RATE = 0.08  # 8% annual hard-to-borrow fee
 COMMISSION_RATE = 0.005  # 0.5% per trade
 INITIAL_MARGIN = 1.50  # 150% required
@@ -20,14 +20,7 @@ LIQUIDATION_THRESHOLD = 1.10  # 110% forced liquidation
 def get_current_price():
     """Fetch current BMNR price from Yahoo Finance"""
     try:
-        url = "https://query1.finance.yahoo.com/v8/finance/chart/BMNR?interval=1d"
-        headers = {'User-Agent': 'Mozilla/5.0 (compatible; BitMineTracker/1.0)'}
-        req = urllib.request.Request(url, headers=headers)
-        
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode())
-            quote = data['chart']['result'][0]['meta']
-            return float(quote.get('regularMarketPrice', 31.36))
+        return get_market_price("BMNR")
     except Exception as e:
         print(f"⚠️  Price fetch failed: {e}")
         print(f"⚠️  Using fallback price: ฿31.36")
@@ -36,7 +29,8 @@ def get_current_price():
 def open_short_position(shares, capital):
     """Open a new short position"""
     
-    if os.path.exists(POSITION_FILE):
+    journal = open_journal()
+    if journal.current_position("BMNR"):
         print("❌ Position already exists! Close it first with: check_position() then close_position()")
         return
     
@@ -69,20 +63,7 @@ def open_short_position(shares, capital):
     print(f"Initial Equity: ฿{equity:,.2f}")
     print(f"Initial Margin Level: {margin_level:.1f}%")
     
-    position = {
-        "shares": shares,
-        "entry_price": current_price,
-        "entry_date": datetime.now().isoformat(),
-        "initial_capital": capital,
-        "cash": cash_after,
-        "open_commission": commission,
-        "borrow_rate": BORROW_RATE,
-        "status": "OPEN"
-    }
-    
-    os.makedirs('data', exist_ok=True)
-    with open(POSITION_FILE, 'w') as f:
-        json.dump(position, f, indent=2)
+    journal.open_trade("BMNR", shares, current_price, capital, commission, BORROW_RATE)
     
     print("\n" + "="*70)
     print("✅ POSITION OPENED")
@@ -97,34 +78,39 @@ def open_short_position(shares, capital):
 def check_position():
     """Check current position status"""
     
-    if not os.path.exists(POSITION_FILE):
+    journal = open_journal()
+    position = journal.current_position("BMNR")
+    if not position:
         print("\n❌ No active position")
         print("💡 Open one with: open_short_position(shares, capital)")
         return None
     
-    with open(POSITION_FILE, 'r') as f:
-        position = json.load(f)
+    # A spike between checks may already have hit the liquidation level
+    from replay import replay  # replay imports this module's constants
+    history = replay(position, open_store("BMNR", "1d").read(),
+                     MAINTENANCE_MARGIN, LIQUIDATION_THRESHOLD, COMMISSION_RATE)
+    if history['liquidated']:
+        when = datetime.fromtimestamp(history['liquidation_timestamp'])
+        print(f"\n🚨 LIQUIDATED ON {when:%Y-%m-%d} - the bar high crossed ฿{history['liquidation_price']:.2f}")
+        close_position_forced(history['liquidation_price'], "LIQUIDATED", history['liquidation_timestamp'])
+        return None
     
     current_price = get_current_price()
     entry_price = position['entry_price']
     shares = position['shares']
     cash = position['cash']
-    entry_date = datetime.fromisoformat(position['entry_date'])
-    days_held = (datetime.now() - entry_date).total_seconds() / 86400
     
-    # Calculate P&L
-    position_value_entry = shares * entry_price
-    position_value_current = shares * current_price
-    price_pnl = position_value_entry - position_value_current
-    
-    # Calculate fees
-    daily_borrow_fee = (position_value_entry * BORROW_RATE) / 365
-    total_borrow_fees = daily_borrow_fee * days_held
-    
-    # Calculate equity and margin
-    total_pnl = price_pnl - total_borrow_fees - position['open_commission']
-    equity = cash + total_pnl
-    margin_level = (equity / position_value_current) * 100 if position_value_current > 0 else 0
+    # Mark to market through the portfolio engine (same accounting as the dashboard)
+    book = Portfolio.from_position(position, maintenance=MAINTENANCE_MARGIN, liquidation=LIQUIDATION_THRESHOLD)
+    marks = book.revalue([current_price])
+    days_held = float(marks['days_elapsed'][0])
+    price_pnl = float(marks['unrealized_pnl'][0])
+    total_borrow_fees = float(marks['borrow_fees'][0])
+    total_pnl = float(marks['net_pnl'][0])
+    equity = float(marks['equity'][0])
+    position_value_current = float(marks['current_value'][0])
+    margin_level = float(marks['margin_level'][0]) * 100
+    journal.accrue_fees(position['trade'], total_borrow_fees)
     
     print("\n" + "="*70)
     print("📊 POSITION STATUS")
@@ -151,6 +137,8 @@ def check_position():
     if margin_level < LIQUIDATION_THRESHOLD * 100:
         print(f"\n🚨 LIQUIDATION - POSITION FORCE CLOSED AT ฿{current_price:.2f}")
         close_position_forced(current_price, "LIQUIDATED")
+        print("\n" + "="*70 + "\n")
+        return None
     elif margin_level < MAINTENANCE_MARGIN * 100:
         print(f"\n⚠️  MARGIN CALL - Deposit more capital or close position!")
         print(f"    Need margin > 125%, currently at {margin_level:.1f}%")
@@ -171,17 +159,12 @@ def check_position():
 def close_position():
     """Close position voluntarily"""
     
-    if not os.path.exists(POSITION_FILE):
+    journal = open_journal()
+    position = journal.current_position("BMNR")
+    if not position:
         print("\n❌ No active position to close")
         return
     
-    with open(POSITION_FILE, 'r') as f:
-        position = json.load(f)
-    
-    if position['status'] == 'LIQUIDATED':
-        print("\n💀 Position already liquidated by The House")
-        return
-    
     current_price = get_current_price()
     shares = position['shares']
     position_value = shares * current_price
@@ -189,6 +172,7 @@ def close_position():
     
     status = check_position()
     if not status:
+        print("\n💀 Position already liquidated by The House")
         return
     
     final_equity = status['equity'] - close_commission
@@ -202,22 +186,7 @@ def close_position():
     print(f"Final Equity: ฿{final_equity:,.2f}")
     print(f"Total Return: {total_return:+.2f}%")
     
-    position['status'] = 'CLOSED'
-    position['close_price'] = current_price
-    position['close_date'] = datetime.now().isoformat()
-    position['close_commission'] = close_commission
-    position['final_equity'] = final_equity
-    position['total_return'] = total_return
-    
-    with open(POSITION_FILE, 'w') as f:
-        json.dump(position, f, indent=2)
-    
-    # Archive and remove active position
-    archive_file = f"data/closed_position_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(archive_file, 'w') as f:
-        json.dump(position, f, indent=2)
-    
-    os.remove(POSITION_FILE)
+    open_journal().close_trade(position['trade'], current_price, close_commission, final_equity, total_return)
     
     if total_return > 0:
         print("\n✅ Profitable exit - well played")
@@ -226,36 +195,28 @@ def close_position():
         print("\n📉 Loss realized - the glyph won this round")
         print("💬 Livermore: \"The market is never wrong. Opinions often are.\"")
     
-    print(f"\n📁 Position archived: {archive_file}")
+    print(f"\n📁 Trade #{position['trade']} recorded in {JOURNAL_FILE}")
     print("="*70 + "\n")
 
-def close_position_forced(price, reason="LIQUIDATED"):
-    """Force close position (liquidation)"""
-    
-    with open(POSITION_FILE, 'r') as f:
-        position = json.load(f)
-    
-    shares = position['shares']
-    position_value = shares * price
-    close_commission = position_value * COMMISSION_RATE
-    
-    position['status'] = reason
-    position['close_price'] = price
-    position['close_date'] = datetime.now().isoformat()
-    position['close_commission'] = close_commission
-    
-    with open(POSITION_FILE, 'w') as f:
-        json.dump(position, f, indent=2)
-    
-    archive_file = f"data/liquidated_position_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(archive_file, 'w') as f:
-        json.dump(position, f, indent=2)
-    
-    os.remove(POSITION_FILE)
+def close_position_forced(price, reason="LIQUIDATED", when=None):
+    """Force close position (liquidation) at `price`, as of epoch second `when` (default: now)"""
+    
+    journal = open_journal()
+    position = journal.current_position("BMNR")
+    when = when if when is not None else datetime.now().timestamp()
+    
+    # Borrow fees stop accruing at the liquidation, not when it is noticed
+    close_commission = position['shares'] * price * COMMISSION_RATE
+    marks = Portfolio.from_position(position).revalue([price], now=when)
+    final_equity = float(marks['equity'][0]) - close_commission
+    total_return = (final_equity - position['initial_capital']) / position['initial_capital'] * 100
+    journal.close_trade(position['trade'], price, close_commission, final_equity, total_return,
+                        float(marks['borrow_fees'][0]), liquidated=True, status=reason,
+                        time=datetime.fromtimestamp(when).isoformat())
     
     print("\n💀 THE HOUSE HAS SPOKEN")
     print("💬 Livermore: \"Markets can remain irrational longer than you can remain solvent.\"")
-    print(f"📁 Position archived: {archive_file}")
+    print(f"📁 Trade #{position['trade']} recorded in {JOURNAL_FILE}")
 
 def show_menu():
     """Display interactive menu"""
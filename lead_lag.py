@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Lead-Lag Cross-Correlation
+Does ETH move first? Correlation of returns at every lag up to ±K in one FFT pass
+"""
+
+import cmath
+import math
+import sys
+
+from eth_correlation import calculate_returns
+from intraday import INTERVAL_SECONDS, MAX_REQUEST_DAYS, load_resolution
+from watchlist import align_closes, fetch_watchlist
+
+try:
+    import numpy as np
+except ImportError:  # stdlib-only fallback
+    np = None
+
+Z_95 = 1.96
+
+def _fft(values, invert=False):
+    """Iterative radix-2 FFT of a power-of-two-length list of complex numbers"""
+    a = list(values)
+    n = len(a)
+
+    j = 0
+    for i in range(1, n):
+        bit = n >> 1
+        while j & bit:
+            j ^= bit
+            bit >>= 1
+        j |= bit
+        if i < j:
+            a[i], a[j] = a[j], a[i]
+
+    length = 2
+    while length <= n:
+        step = cmath.exp((2j if invert else -2j) * math.pi / length)
+        half = length // 2
+        for start in range(0, n, length):
+            w = 1
+            for k in range(start, start + half):
+                u, v = a[k], a[k + half] * w
+                a[k], a[k + half] = u + v, u - v
+                w *= step
+        length <<= 1
+
+    if invert:
+        a = [x / n for x in a]
+    return a
+
+def _raw_cross_products(x, y, max_lag):
+    """
+    sum_t x[t] * y[t + lag] for lag in -max_lag..max_lag
+
+    Zero-padded FFTs make this O(n log n) instead of O(n·K).
+    """
+    n = len(x)
+    size = 1
+    while size < n + max_lag + 1:
+        size <<= 1
+
+    if np is not None:
+        fx = np.fft.rfft(x, size)
+        fy = np.fft.rfft(y, size)
+        r = np.fft.irfft(np.conj(fx) * fy, size)
+        return [float(r[lag % size]) for lag in range(-max_lag, max_lag + 1)]
+
+    fx = _fft([complex(v) for v in x] + [0j] * (size - n))
+    fy = _fft([complex(v) for v in y] + [0j] * (size - n))
+    r = _fft([a.conjugate() * b for a, b in zip(fx, fy)], invert=True)
+    return [r[lag % size].real for lag in range(-max_lag, max_lag + 1)]
+
+def cross_correlation(x, y, max_lag):
+    """
+    Cross-correlation of two equal-length series at lags -max_lag..max_lag
+
+    Positive lag means x leads y: corr(x[t], y[t + lag]). Uses the standard
+    biased estimator (normalized by n and the full-sample deviations).
+    Returns (lags, correlations).
+    """
+    n = len(x)
+    if n != len(y) or n < 2:
+        raise ValueError("series must have equal length >= 2")
+    max_lag = min(max_lag, n - 1)
+
+    if np is not None:
+        dx = np.asarray(x, dtype=np.float64)
+        dy = np.asarray(y, dtype=np.float64)
+        dx = dx - dx.mean()
+        dy = dy - dy.mean()
+        norm = math.sqrt(float(dx @ dx) * float(dy @ dy))
+    else:
+        mean_x = sum(x) / n
+        mean_y = sum(y) / n
+        dx = [v - mean_x for v in x]
+        dy = [v - mean_y for v in y]
+        norm = math.sqrt(sum(v * v for v in dx) * sum(v * v for v in dy))
+
+    lags = list(range(-max_lag, max_lag + 1))
+    if norm == 0:
+        return lags, [0.0] * len(lags)
+    return lags, [c / norm for c in _raw_cross_products(dx, dy, max_lag)]
+
+def lead_lag(x, y, max_lag=5, z=Z_95):
+    """
+    Find the lag with the strongest cross-correlation
+
+    The confidence band is the white-noise band ±z/sqrt(n - |lag|): a peak
+    inside it is indistinguishable from no relationship at that lag.
+    """
+    lags, corrs = cross_correlation(x, y, max_lag)
+    n = len(x)
+    peak = max(range(len(lags)), key=lambda i: abs(corrs[i]))
+    band = z / math.sqrt(n - abs(lags[peak]))
+
+    return {
+        'lags': lags,
+        'correlations': corrs,
+        'peak_lag': lags[peak],
+        'peak_correlation': corrs[peak],
+        'band': band,
+        'significant': abs(corrs[peak]) > band,
+        'n': n,
+    }
+
+def describe_lag(lag, unit, leader, follower):
+    if lag > 0:
+        return f"{leader} leads {follower} by {lag} {unit}"
+    if lag < 0:
+        return f"{follower} leads {leader} by {-lag} {unit}"
+    return "Moves are simultaneous (lag 0)"
+
+def print_lead_lag(result, leader="ETH", follower="BMNR", unit="bars"):
+    """Print a lead-lag result as a lag profile plus verdict"""
+    band = result['band']
+    print(f"\n   {'Lag':>5s}  {'Corr':>7s}")
+    for lag, corr in zip(result['lags'], result['correlations']):
+        bar = "█" * int(abs(corr) * 20)
+        flag = " *" if abs(corr) > band else ""
+        print(f"   {lag:+5d}  {corr:+7.3f}  {bar}{flag}")
+
+    print(f"\n   Peak: lag {result['peak_lag']:+d} ({result['peak_correlation']:+.3f}), "
+          f"95% band ±{band:.3f}")
+    print(f"   → {describe_lag(result['peak_lag'], unit, leader, follower)}")
+    if not result['significant']:
+        print("   ⚠️  Peak is inside the noise band - no reliable lead/lag")
+
+def main():
+    interval = "1d"
+    max_lag = 5
+    if '--interval' in sys.argv:
+        interval = sys.argv[sys.argv.index('--interval') + 1]
+    if '--max-lag' in sys.argv:
+        max_lag = int(sys.argv[sys.argv.index('--max-lag') + 1])
+
+    symbols = ["ETH-USD", "BMNR"]
+    # Stored history (intraday.py ingest) reaches back years; the API only
+    # serves a few days per request at 1m. ETH is bucketed on BMNR's session.
+    results = {}
+    if interval in INTERVAL_SECONDS:
+        results = {s: load_resolution(s, interval, session='equity') for s in symbols}
+    if results and all(results.values()):
+        first = max(series.datetime(0) for series in results.values())
+        window = f"stored bars since {first:%Y-%m-%d}"
+    else:
+        days = MAX_REQUEST_DAYS.get(interval, 365)
+        results = None
+        window = f"{days} days (live, nothing stored)"
+
+    print("=" * 70)
+    print("ETH → BMNR Lead-Lag Analysis")
+    print(f"Interval: {interval} | Lags: ±{max_lag} | Window: {window}")
+    print("=" * 70)
+
+    if results is None:
+        results = fetch_watchlist(symbols, days=days, interval=interval)
+    dates, closes = align_closes(results, by='date' if interval in ('1d', '1wk') else 'timestamp')
+    if len(dates) < max_lag + 3:
+        print("✗ Not enough overlapping data points")
+        return
+
+    eth_returns = calculate_returns(closes["ETH-USD"])
+    bmnr_returns = calculate_returns(closes["BMNR"])
+    print(f"\n✓ {len(eth_returns)} aligned returns")
+
+    result = lead_lag(eth_returns, bmnr_returns, max_lag)
+    print_lead_lag(result, unit="bars" if interval not in ('1d', '1wk') else "days")
+    print("\n" + "=" * 70)
+
+if __name__ == "__main__":
+    main()
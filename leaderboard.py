@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Prediction Leaderboard
+Per-source and per-timeframe accuracy, kept as running aggregates
+
+Every resolution (or un-resolution: re-marking, deleting) adds or subtracts
+one prediction's contribution to four summary rows (source × timeframe
+bucket, with '*' for "all"), so the leaderboard never rescans the
+predictions table. Errors go into a fixed histogram so the median can be
+read off the counts.
+
+Calibration compares a source's hit rate with the chance a driftless
+random walk at the prevailing volatility would have touched the same
+targets: a positive edge beats chance, a negative one means the calls
+were bolder than they were right.
+"""
+
+import html
+import json
+import sys
+from bisect import bisect_right
+from datetime import datetime
+
+import prediction_store
+
+ALL = '*'
+
+# Horizon (days from prediction to deadline) → bucket; no deadline is 'open'
+TIMEFRAME_BUCKETS = ((7, '1w'), (31, '1m'), (92, '3m'), (366, '1y'))
+BUCKET_LABELS = {'1w': '≤ 1 week', '1m': '≤ 1 month', '3m': '≤ 3 months', '1y': '≤ 1 year',
+                 'long': '> 1 year', 'open': 'Open-ended', ALL: 'All'}
+
+# Error histogram (% from target): bin 0 holds exact hits, bin k spans
+# ERROR_EDGES[k]..ERROR_EDGES[k + 1], the last bin is open-ended
+ERROR_EDGES = (0, 0, 1, 2, 3, 5, 7.5, 10, 15, 20, 25, 30, 40, 50, 75, 100)
+
+RESOLVED = ('hit', 'missed')
+DASHBOARD_ROWS = 10
+
+def timeframe_bucket(pred):
+    """Bucket key for a prediction's horizon"""
+    if pred.get('deadline') is None:
+        return 'open'
+    days = (pred['deadline'] - datetime.fromisoformat(pred['timestamp']).timestamp()) / 86400
+    for limit, key in TIMEFRAME_BUCKETS:
+        if days <= limit:
+            return key
+    return 'long'
+
+def _error_bin(error):
+    return 0 if error <= 0 else bisect_right(ERROR_EDGES, error) - 1
+
+def median_error(counts):
+    """Median of a histogram of errors, interpolated within its bin"""
+    total = sum(counts)
+    if not total:
+        return None
+    half = total / 2
+    seen = 0
+    for k, count in enumerate(counts):
+        if count and seen + count >= half:
+            low = ERROR_EDGES[k]
+            high = ERROR_EDGES[k + 1] if k + 1 < len(ERROR_EDGES) else low
+            return low + (high - low) * (half - seen) / count
+        seen += count
+    return None
+
+def record(conn, pred, sign=1):
+    """
+    Add (sign=1) or remove (sign=-1) one prediction's outcome
+
+    Call inside the caller's transaction with the prediction's resolved
+    row; active predictions contribute nothing.
+    """
+    status = pred['status']
+    if status not in RESOLVED and status != 'expired':
+        return
+    hit = status == 'hit'
+    accuracy = pred.get('accuracy_score')
+    chance = pred.get('touch_probability')
+    error = pred.get('error_pct')
+    resolved = status in RESOLVED
+
+    bucket = timeframe_bucket(pred)
+    for key in ((pred['source'], bucket), (pred['source'], ALL), (ALL, bucket), (ALL, ALL)):
+        conn.execute("INSERT OR IGNORE INTO leaderboard (source, bucket) VALUES (?, ?)", key)
+        counts = json.loads(conn.execute(
+            "SELECT error_counts FROM leaderboard WHERE source = ? AND bucket = ?", key
+        ).fetchone()[0])
+        if resolved and error is not None:
+            counts.extend([0] * (len(ERROR_EDGES) - len(counts)))
+            counts[_error_bin(error)] += sign
+        conn.execute(
+            """UPDATE leaderboard SET
+                   resolved = resolved + ?, hits = hits + ?, expired = expired + ?,
+                   accuracy_sum = accuracy_sum + ?, accuracy_count = accuracy_count + ?,
+                   chance_sum = chance_sum + ?, chance_count = chance_count + ?, chance_hits = chance_hits + ?,
+                   error_counts = ?
+               WHERE source = ? AND bucket = ?""",
+            (sign * resolved, sign * hit, sign * (not resolved),
+             sign * (accuracy or 0.0) * resolved, sign * (resolved and accuracy is not None),
+             sign * (chance or 0.0) * resolved, sign * (resolved and chance is not None),
+             sign * (resolved and hit and chance is not None),
+             json.dumps(counts)) + key
+        )
+
+def rebuild(conn):
+    """Recompute every aggregate from the predictions table (one-off backfill)"""
+    with prediction_store.transaction(conn):
+        conn.execute("DELETE FROM leaderboard")
+        for pred in prediction_store.by_status(conn, *RESOLVED, 'expired'):
+            record(conn, pred)
+        conn.execute("INSERT OR REPLACE INTO store_meta VALUES ('leaderboard_built', '1')")
+
+def ensure_built(conn):
+    """Backfill the aggregates once for predictions resolved before they existed"""
+    if conn.execute("SELECT 1 FROM store_meta WHERE key = 'leaderboard_built'").fetchone() is None:
+        rebuild(conn)
+
+def _standing(row):
+    counts = json.loads(row['error_counts'])
+    resolved = row['resolved']
+    return {
+        'source': row['source'],
+        'bucket': row['bucket'],
+        'resolved': resolved,
+        'hits': row['hits'],
+        'expired': row['expired'],
+        'hit_rate': row['hits'] / resolved * 100 if resolved else None,
+        'mean_accuracy': row['accuracy_sum'] / row['accuracy_count'] if row['accuracy_count'] else None,
+        'median_error': median_error(counts),
+        'chance_rate': row['chance_sum'] / row['chance_count'] * 100 if row['chance_count'] else None,
+        'calibration': ((row['chance_hits'] - row['chance_sum']) / row['chance_count'] * 100
+                        if row['chance_count'] else None),
+    }
+
+def standings(conn, by='source'):
+    """
+    Leaderboard rows with derived metrics, best hit rate first
+
+    by='source' gives one row per source over all timeframes, by='bucket'
+    one row per timeframe bucket over all sources; the overall '*' row is
+    last.
+    """
+    across = 'source' if by == 'bucket' else 'bucket'
+    rows = conn.execute(
+        f"SELECT * FROM leaderboard WHERE {across} = ? AND resolved > 0", (ALL,)
+    ).fetchall()
+    out = [_standing(row) for row in rows]
+    out.sort(key=lambda s: (s[by] == ALL, -(s['hit_rate'] or 0), -s['resolved']))
+    return out
+
+def _fmt(value, fmt, suffix=''):
+    return "—" if value is None else f"{value:{fmt}}{suffix}"
+
+def _cells(standing):
+    return (f"{standing['hits']}/{standing['resolved']}",
+            _fmt(standing['hit_rate'], '.0f', '%'),
+            _fmt(standing['mean_accuracy'], '.1f', '%'),
+            _fmt(standing['median_error'], '.1f', '%'),
+            _fmt(standing['chance_rate'], '.0f', '%'),
+            _fmt(standing['calibration'], '+.0f', ' pts'))
+
+def generate_leaderboard_html_section(by_source, by_bucket):
+    """Generate HTML section for the source accuracy leaderboard"""
+    if not by_source:
+        return ""
+
+    def rows(standings, key, name):
+        out = []
+        # Best DASHBOARD_ROWS plus the overall row, which sorts last
+        for standing in standings[:-1][:DASHBOARD_ROWS] + standings[-1:]:
+            label = html.escape(name(standing))
+            css = ' class="leaderboard-total"' if standing[key] == ALL else ''
+            cells = "".join(f"<td>{cell}</td>" for cell in _cells(standing))
+            out.append(f"""
+                <tr{css}><td>{label}</td>{cells}</tr>""")
+        return "".join(out)
+
+    header = ("<th>Hits</th><th>Hit Rate</th><th>Mean Accuracy</th>"
+              "<th>Median Error</th><th>Chance</th><th>Calibration</th>")
+    source_name = lambda s: 'All sources' if s['source'] == ALL else s['source']
+    bucket_name = lambda s: 'All timeframes' if s['bucket'] == ALL else BUCKET_LABELS[s['bucket']]
+    return f"""
+    <div class="leaderboard-container">
+        <h2>🏆 Prediction Leaderboard</h2>
+        <p class="leaderboard-note">Chance: hit rate a random walk at the prevailing volatility would have had.
+        Calibration: hit rate minus chance, in points (positive beats chance)</p>
+        <table class="leaderboard-table">
+            <tr><th>Source</th>{header}</tr>{rows(by_source, 'source', source_name)}
+        </table>
+        <h3>By Timeframe</h3>
+        <table class="leaderboard-table">
+            <tr><th>Timeframe</th>{header}</tr>{rows(by_bucket, 'bucket', bucket_name)}
+        </table>
+    </div>
+    """
+
+def get_leaderboard_css():
+    """Additional CSS for the leaderboard section"""
+    return """
+    .leaderboard-container {
+        padding: 30px;
+    }
+
+    .leaderboard-container h2 {
+        color: #2c3e50;
+        margin-bottom: 5px;
+    }
+
+    .leaderboard-container h3 {
+        color: #2c3e50;
+        margin: 20px 0 10px;
+    }
+
+    .leaderboard-note {
+        color: #7f8c8d;
+        margin-bottom: 15px;
+    }
+
+    .leaderboard-table {
+        width: 100%;
+        border-collapse: collapse;
+    }
+
+    .leaderboard-table th, .leaderboard-table td {
+        padding: 8px;
+        border-bottom: 1px solid #ecf0f1;
+        text-align: left;
+    }
+
+    .leaderboard-table th {
+        color: #7f8c8d;
+        font-size: 0.85em;
+        text-transform: uppercase;
+    }
+
+    .leaderboard-total td {
+        font-weight: bold;
+        border-top: 2px solid #bdc3c7;
+    }
+    """
+
+def print_standings(conn):
+    """Print both leaderboard tables"""
+    header = f"{'Hits':>8}  {'Rate':>5}  {'Accuracy':>8}  {'Med.Err':>7}  {'Chance':>6}  {'Calib.':>8}"
+    for by, title, name in (('source', 'Source', lambda s: s['source']),
+                            ('bucket', 'Timeframe', lambda s: BUCKET_LABELS[s['bucket']])):
+        print(f"\n{title:<20}{header}")
+        print("-" * 70)
+        for standing in standings(conn, by):
+            label = 'All' if standing[by] == ALL else name(standing)
+            hits, rate, accuracy, error, chance, calibration = _cells(standing)
+            print(f"{label[:20]:<20}{hits:>8}  {rate:>5}  {accuracy:>8}  {error:>7}  {chance:>6}  {calibration:>8}")
+
+def main():
+    conn = prediction_store.connect()
+    if '--rebuild' in sys.argv:
+        rebuild(conn)
+        print("✓ Leaderboard rebuilt from stored predictions")
+    else:
+        ensure_built(conn)
+
+    print("=" * 70)
+    print("🏆 PREDICTION LEADERBOARD")
+    print("=" * 70)
+    if not standings(conn):
+        print("\n📝 No resolved predictions yet.")
+    else:
+        print_standings(conn)
+    print("\n" + "=" * 70)
+
+if __name__ == "__main__":
+    main()
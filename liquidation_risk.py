@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Liquidation Risk Simulator
+Monte Carlo odds of a margin call or liquidation for the open position
+
+Prices are simulated day by day from the last stored close, two ways:
+geometric Brownian motion at the realized volatility (with a Brownian
+bridge test for crossings between closes), and a bootstrap of historical
+days that resamples each day's close-to-close return together with its
+adverse intraday extreme. Borrow fees keep accruing, so the margin call
+and liquidation prices creep towards the market every day.
+
+Paths run in vectorized batches (NumPy when installed) across a process
+pool, each batch seeded from (seed, batch number). Results are cached by a
+hash of every input, so the hourly dashboard build only re-simulates when
+the position or the price history changed.
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from bar_store import open_store
+from jesse_livermore_game import LIQUIDATION_THRESHOLD, MAINTENANCE_MARGIN
+from replay import trigger_price
+from trade_journal import JOURNAL_FILE, current_position
+
+try:
+    import numpy as np
+except ImportError:  # stdlib-only fallback
+    np = None
+
+RISK_CACHE_FILE = "data/liquidation_risk_cache.json"
+CACHE_ENTRIES = 16
+MODEL_VERSION = 1  # bump when the simulation changes so cached results miss
+
+HORIZONS = (1, 5, 20)  # trading days
+METHODS = ('gbm', 'bootstrap')
+DEFAULT_PATHS = 100_000
+DEFAULT_SEED = 0  # fixed so identical inputs give identical (cacheable) results
+VOL_WINDOW = 252  # most recent daily bars used for volatility and the bootstrap
+CALENDAR_DAYS_PER_STEP = 365 / 252  # borrow fees accrue over weekends too
+BATCH_SIZE = 10_000
+# Below this many path-days a pool costs more than it saves
+POOL_THRESHOLD = 1_000_000
+
+def _simulate_batch(task):
+    """
+    First-crossing day of each barrier for one batch of paths
+
+    Returns one list per barrier: counts of paths first crossing on day
+    1..steps, then the count that never crossed. Top-level so it can be
+    shipped to pool workers.
+    """
+    method, size, seed, start, sigma, returns, excursions, side, barriers = task
+    steps = len(barriers[0])
+    log_start = math.log(start)
+    log_barriers = [[math.log(b) if b > 0 else -side * math.inf for b in level] for level in barriers]
+    variance = sigma * sigma
+
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        if method == 'gbm':
+            moves = rng.standard_normal((size, steps)) * sigma - 0.5 * variance
+        else:
+            picks = rng.integers(0, len(returns), (size, steps))
+            moves = np.asarray(returns)[picks]
+        path = log_start + np.cumsum(moves, axis=1)
+        prev = np.concatenate((np.full((size, 1), log_start), path[:, :-1]), axis=1)
+        if method == 'gbm':
+            uniform = rng.random((size, steps))
+        else:
+            extreme = prev + np.asarray(excursions)[picks]
+
+        out = []
+        for level in log_barriers:
+            b = np.asarray(level)
+            if method == 'gbm':
+                # P(a Brownian bridge between two closes on the safe side touches b)
+                gap = (prev - b) * (path - b)
+                with np.errstate(over='ignore', invalid='ignore'):
+                    bridge = np.exp(-2 * gap / variance) if variance > 0 else np.zeros_like(gap)
+                crossed = (side * (b - path) >= 0) | (uniform < bridge)
+            else:
+                crossed = side * (b - extreme) >= 0
+            first = np.where(crossed.any(axis=1), crossed.argmax(axis=1), steps)
+            out.append(np.bincount(first, minlength=steps + 1).tolist())
+        return out
+
+    rng = random.Random(repr(seed))
+    out = [[0] * (steps + 1) for _ in log_barriers]
+    for _ in range(size):
+        first = [steps] * len(log_barriers)
+        prev = log_start
+        for t in range(steps):
+            if method == 'gbm':
+                price = prev + rng.gauss(-0.5 * variance, sigma)
+                u = rng.random()
+            else:
+                pick = rng.randrange(len(returns))
+                price = prev + returns[pick]
+                extreme = prev + excursions[pick]
+            for k, level in enumerate(log_barriers):
+                if first[k] < steps:
+                    continue
+                b = level[t]
+                if method == 'gbm':
+                    gap = (prev - b) * (price - b)
+                    bridge = math.exp(-2 * gap / variance) if variance > 0 and gap > 0 else float(gap <= 0)
+                    crossed = side * (b - price) >= 0 or u < bridge
+                else:
+                    crossed = side * (b - extreme) >= 0
+                if crossed:
+                    first[k] = t
+            prev = price
+        for k, day in enumerate(first):
+            out[k][day] += 1
+    return out
+
+def market_inputs(series, side=-1, window=VOL_WINDOW):
+    """
+    Daily log returns, adverse intraday excursions and volatility from stored bars
+
+    The excursion of a day is log(high / previous close) for a short (log
+    of the low for a long): how far against the position it went.
+    """
+    n = len(series)
+    start = max(1, n - window)
+    closes, extremes = series.close, series.high if side < 0 else series.low
+    returns = [math.log(closes[i] / closes[i - 1]) for i in range(start, n)]
+    excursions = [math.log(extremes[i] / closes[i - 1]) for i in range(start, n)]
+    sigma = statistics.stdev(returns) if len(returns) > 1 else 0.0
+    return returns, excursions, sigma
+
+def _barriers(position, side, levels, fees_now, fee_per_day, steps):
+    """Margin-call/liquidation price for each level at the end of each day"""
+    return [[trigger_price(side, position["shares"], position["entry_price"], position["cash"],
+                           fees_now + fee_per_day * CALENDAR_DAYS_PER_STEP * (t + 1), level)
+             for t in range(steps)]
+            for level in levels]
+
+def simulate_liquidation(position, series, paths=DEFAULT_PATHS, seed=DEFAULT_SEED, workers=None,
+                         horizons=HORIZONS, maintenance=MAINTENANCE_MARGIN, liquidation=LIQUIDATION_THRESHOLD):
+    """
+    Probability of a margin call / liquidation within each horizon, per method
+
+    Valued at the last bar of `series` (daily bars). Returns a JSON-ready
+    dict: 'price', 'valuation_time', 'sigma' (daily), 'paths', 'horizons',
+    'fee_per_day', 'equity' and, under 'methods', for 'gbm' and
+    'bootstrap': 'margin_call' and 'liquidation' probabilities and
+    'fee_drag' (expected borrow fees until the horizon or liquidation) per
+    horizon.
+    """
+    side = 1 if position.get("side") == "long" else -1
+    returns, excursions, sigma = market_inputs(series, side)
+    price, valuation_time = series.close[-1], series.timestamp[-1]
+    entry_time = datetime.fromisoformat(position["entry_date"]).timestamp()
+    steps = max(horizons)
+
+    fee_per_day = position["shares"] * position["entry_price"] * position.get("borrow_rate", 0.0) / 365
+    fees_now = fee_per_day * max(valuation_time - entry_time, 0) / 86400
+    barriers = _barriers(position, side, (maintenance, liquidation), fees_now, fee_per_day, steps)
+    equity = position["cash"] + side * (price - position["entry_price"]) * position["shares"] - fees_now
+
+    if workers is None:
+        workers = (os.cpu_count() or 1) if paths * steps >= POOL_THRESHOLD else 1
+
+    methods = {}
+    for number, method in enumerate(METHODS):
+        tasks = []
+        for batch, first in enumerate(range(0, paths, BATCH_SIZE)):
+            size = min(BATCH_SIZE, paths - first)
+            tasks.append((method, size, (seed, number, batch), price, sigma, returns, excursions, side, barriers))
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+                chunks = list(pool.map(_simulate_batch, tasks))
+        else:
+            chunks = [_simulate_batch(task) for task in tasks]
+        counts = [[sum(chunk[k][day] for chunk in chunks) for day in range(steps + 1)] for k in range(2)]
+
+        summary = {'margin_call': [], 'liquidation': [], 'fee_drag': []}
+        for horizon in horizons:
+            liquidated = counts[1][:horizon]
+            # Fees stop on the liquidation day
+            days_open = (sum(c * (day + 1) for day, c in enumerate(liquidated))
+                         + (paths - sum(liquidated)) * horizon) / paths
+            summary['margin_call'].append(sum(counts[0][:horizon]) / paths)
+            summary['liquidation'].append(sum(liquidated) / paths)
+            summary['fee_drag'].append(fee_per_day * CALENDAR_DAYS_PER_STEP * days_open)
+        methods[method] = summary
+
+    return {
+        'price': price,
+        'valuation_time': valuation_time,
+        'sigma': sigma,
+        'paths': paths,
+        'horizons': list(horizons),
+        'fee_per_day': fee_per_day,
+        'equity': equity,
+        'methods': methods,
+    }
+
+def _input_hash(position, series, paths, seed, horizons, maintenance, liquidation):
+    returns, excursions, _ = market_inputs(series, 1 if position.get("side") == "long" else -1)
+    payload = {
+        'version': MODEL_VERSION,
+        'position': {k: position.get(k) for k in ("shares", "entry_price", "entry_date", "cash",
+                                                   "borrow_rate", "side")},
+        'price': series.close[-1],
+        'valuation_time': series.timestamp[-1],
+        'returns': returns,
+        'excursions': excursions,
+        'paths': paths, 'seed': seed, 'horizons': list(horizons),
+        'maintenance': maintenance, 'liquidation': liquidation,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def _load_cache(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_cache(cache, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp, path)
+
+def position_risk(position, series, paths=DEFAULT_PATHS, seed=DEFAULT_SEED, workers=None,
+                  horizons=HORIZONS, maintenance=MAINTENANCE_MARGIN, liquidation=LIQUIDATION_THRESHOLD,
+                  cache_file=RISK_CACHE_FILE):
+    """simulate_liquidation() through the input-hash cache (None without enough history)"""
+    if len(series) < 3:
+        return None
+    key = _input_hash(position, series, paths, seed, horizons, maintenance, liquidation)
+    cache = _load_cache(cache_file) if cache_file else {}
+    if key in cache:
+        return cache[key]
+
+    result = simulate_liquidation(position, series, paths, seed, workers, horizons, maintenance, liquidation)
+    if cache_file:
+        cache[key] = result
+        for old in list(cache)[:-CACHE_ENTRIES]:
+            del cache[old]
+        _save_cache(cache, cache_file)
+    return result
+
+def print_risk(risk):
+    """Table of margin-call/liquidation odds per horizon and method"""
+    print(f"\n💰 Price ฿{risk['price']:.2f} | daily σ {risk['sigma'] * 100:.2f}% | "
+          f"equity ฿{risk['equity']:,.2f} | {risk['paths']:,} paths per method")
+    print(f"\n{'Horizon':<10}{'Method':<12}{'Margin Call':>12}{'Liquidation':>13}{'Fee Drag':>14}")
+    print("-" * 61)
+    for i, horizon in enumerate(risk['horizons']):
+        for method, summary in risk['methods'].items():
+            print(f"{horizon:>3} days  {method:<12}{summary['margin_call'][i] * 100:>11.2f}%"
+                  f"{summary['liquidation'][i] * 100:>12.2f}%{'฿' + format(summary['fee_drag'][i], ',.2f'):>14}")
+
+def main():
+    args = sys.argv[1:]
+    paths = int(args[args.index('--paths') + 1]) if '--paths' in args else DEFAULT_PATHS
+    seed = int(args[args.index('--seed') + 1]) if '--seed' in args else DEFAULT_SEED
+    workers = int(args[args.index('--workers') + 1]) if '--workers' in args else None
+
+    position = current_position("BMNR")
+    if not position:
+        print(f"✗ No open position in {JOURNAL_FILE}")
+        return
+
+    series = open_store("BMNR", "1d").read()
+    print("=" * 61)
+    print("🎲 LIQUIDATION RISK: BMNR short (Monte Carlo)")
+    print("=" * 61)
+    if '--no-cache' in args:
+        risk = simulate_liquidation(position, series, paths, seed, workers) if len(series) >= 3 else None
+    else:
+        risk = position_risk(position, series, paths, seed, workers)
+    if risk is None:
+        print("✗ Not enough stored history (run fetch_and_generate.py first)")
+        return
+    print_risk(risk)
+    print("\n" + "=" * 61)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Parameter Sweep
+Replay the short game over stored history for every combination of its
+margin and fee model
+
+jesse_livermore_game.py fixes the borrow rate, commission, initial /
+maintenance / liquidation margins; this runner takes a grid over those
+plus position size, capital and entry date, opens each position the way
+open_short_position() would (at the entry bar's open, rejected if the
+capital does not cover initial margin plus commission) and replays it to
+the end of the stored bars (see replay.py).
+
+Combinations are chunked into tasks and spread over a process pool; each
+task carries the bar columns once, so the workers never touch the store.
+"""
+
+import itertools
+import os
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from bar_store import open_store
+from jesse_livermore_game import (BORROW_RATE, COMMISSION_RATE, INITIAL_MARGIN, LIQUIDATION_THRESHOLD,
+                                  MAINTENANCE_MARGIN)
+from price_series import COLUMNS, PriceSeries
+from replay import replay
+
+SWEEP_FILE = "data/parameter_sweep.csv"
+PARAMETERS = ('borrow_rate', 'commission_rate', 'initial_margin', 'maintenance_margin',
+              'liquidation_threshold', 'shares', 'capital', 'entry_date')
+RESULT_COLUMNS = PARAMETERS + ('opened', 'entry_price', 'final_equity', 'return_pct', 'max_drawdown',
+                               'liquidated', 'days_to_liquidation', 'margin_call_bars')
+
+# Grid over the game's constants and their neighbours; entry dates default to
+# every ENTRY_EVERY bars of the stored history
+DEFAULT_GRID = {
+    'borrow_rate': (0.04, BORROW_RATE, 0.15),
+    'commission_rate': (0.001, COMMISSION_RATE),
+    'initial_margin': (INITIAL_MARGIN,),
+    'maintenance_margin': (1.20, MAINTENANCE_MARGIN, 1.30),
+    'liquidation_threshold': (1.05, LIQUIDATION_THRESHOLD),
+    'shares': (500, 1000, 2000),
+    'capital': (50_000, 100_000),
+}
+ENTRY_EVERY = 21  # bars (about a month of daily bars)
+MIN_BARS_AFTER_ENTRY = 5
+COMBOS_PER_TASK = 250
+# Below this many combination-bars a pool costs more than it saves
+POOL_THRESHOLD = 2_000_000
+
+_FLAGS = {'--borrow': 'borrow_rate', '--commission': 'commission_rate', '--initial': 'initial_margin',
+          '--maintenance': 'maintenance_margin', '--liquidation': 'liquidation_threshold',
+          '--shares': 'shares', '--capital': 'capital', '--entry': 'entry_date'}
+
+def entry_dates(series, every=ENTRY_EVERY, min_bars=MIN_BARS_AFTER_ENTRY):
+    """Bar timestamps every `every` bars, leaving at least `min_bars` to replay"""
+    return tuple(series.timestamp[i] for i in range(0, max(len(series) - min_bars, 0), every))
+
+def combinations(grid):
+    """
+    Every combination of the grid, as tuples in PARAMETERS order
+
+    Skips margin ladders that make no sense (liquidation must sit below
+    maintenance, maintenance at or below initial).
+    """
+    for combo in itertools.product(*(grid[name] for name in PARAMETERS)):
+        _, _, initial, maintenance, liquidation = combo[:5]
+        if liquidation < maintenance <= initial:
+            yield combo
+
+def _run_combos(task):
+    """
+    Replay one chunk of combinations
+
+    Top-level so it can be shipped to pool workers. Returns one row (in
+    RESULT_COLUMNS order) per combination.
+    """
+    columns, symbol, combos = task
+    series = PriceSeries(*columns, symbol=symbol)
+    rows = []
+    for combo in combos:
+        borrow, commission_rate, initial, maintenance, liquidation, shares, capital, entry_time = combo
+        bars = series.since(entry_time)
+        price = bars.open[0]
+        commission = shares * price * commission_rate
+        if capital < shares * price * initial + commission:
+            rows.append(combo + (False, price, capital, 0.0, 0.0, False, None, 0))
+            continue
+        position = {
+            "shares": shares,
+            "entry_price": price,
+            "entry_date": datetime.fromtimestamp(bars.timestamp[0]).isoformat(),
+            "initial_capital": capital,
+            "cash": capital - commission,
+            "open_commission": commission,
+            "borrow_rate": borrow,
+        }
+        result = replay(position, bars, maintenance, liquidation, commission_rate)
+        rows.append(combo + (True, price, result['final_equity'],
+                             (result['final_equity'] / capital - 1) * 100, result['max_drawdown'],
+                             result['liquidated'], result['days_to_liquidation'], result['margin_call_bars']))
+    return rows
+
+def sweep(series, grid, workers=None):
+    """
+    Replay every valid combination of `grid` over `series`
+
+    `grid` maps each name in PARAMETERS to a sequence of values
+    ('entry_date' as epoch seconds; see entry_dates()). Returns rows in
+    RESULT_COLUMNS order, in grid order regardless of the worker count.
+    """
+    combos = list(combinations(grid))
+    columns = tuple(array('q' if name == 'timestamp' else 'd', getattr(series, name)) for name in COLUMNS)
+    tasks = [(columns, series.symbol, combos[i:i + COMBOS_PER_TASK])
+             for i in range(0, len(combos), COMBOS_PER_TASK)]
+
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(combos) * len(series) >= POOL_THRESHOLD else 1
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            chunks = list(pool.map(_run_combos, tasks))
+    else:
+        chunks = [_run_combos(task) for task in tasks]
+    return [row for chunk in chunks for row in chunk]
+
+def _cell(name, value):
+    if value is None:
+        return ''
+    if name == 'entry_date':
+        return f"{datetime.fromtimestamp(value):%Y-%m-%d}"
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, float):
+        return f"{value:.6g}" if name.endswith(('rate', 'margin', 'threshold')) else f"{value:.4f}"
+    return str(value)
+
+def write_results(rows, path=SWEEP_FILE):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(','.join(RESULT_COLUMNS) + '\n')
+        for row in rows:
+            f.write(','.join(_cell(name, value) for name, value in zip(RESULT_COLUMNS, row)) + '\n')
+    print(f"✓ Sweep results saved: {path}")
+
+def print_summary(rows, limit=5):
+    """Liquidation rate and the best and worst opened combinations"""
+    opened = [dict(zip(RESULT_COLUMNS, row)) for row in rows if row[RESULT_COLUMNS.index('opened')]]
+    print(f"\n✓ {len(opened):,} positions opened, {len(rows) - len(opened):,} rejected (insufficient capital)")
+    if not opened:
+        return
+    liquidated = [r for r in opened if r['liquidated']]
+    print(f"💥 Liquidated: {len(liquidated):,} ({len(liquidated) / len(opened) * 100:.1f}%)")
+    if liquidated:
+        days = sorted(r['days_to_liquidation'] for r in liquidated)
+        print(f"   Median days to liquidation: {days[len(days) // 2]:.0f}")
+
+    opened.sort(key=lambda r: r['return_pct'], reverse=True)
+    header = (f"   {'Borrow':>6}  {'Comm.':>6}  {'Maint.':>6}  {'Liq.':>5}  {'Shares':>6}  {'Capital':>8}  "
+              f"{'Entry':>10}  {'Return':>8}  {'Max DD':>6}")
+    for title, picks in (('🏆 Best', opened[:limit]), ('📉 Worst', opened[-limit:][::-1])):
+        print(f"\n{title}:")
+        print(header)
+        for r in picks:
+            print(f"   {r['borrow_rate'] * 100:5.1f}%  {r['commission_rate'] * 100:5.2f}%  "
+                  f"{r['maintenance_margin'] * 100:5.0f}%  {r['liquidation_threshold'] * 100:4.0f}%  "
+                  f"{r['shares']:6,}  {'฿' + format(r['capital'], ',.0f'):>8}  {_cell('entry_date', r['entry_date']):>10}  "
+                  f"{r['return_pct']:+7.1f}%  {r['max_drawdown'] * 100:5.1f}%"
+                  + ("  💥" if r['liquidated'] else ""))
+
+def benchmark(combos=10_000, years=5, workers=None):
+    """Seconds for a sweep of about `combos` combinations over a random walk of daily bars"""
+    import random
+    rng = random.Random(0)
+    bars = years * 252
+    t0 = int(time.time()) - bars * 86400
+    price, rows = 30.0, []
+    for i in range(bars):
+        move = price * rng.gauss(0, 0.04)
+        rows.append((t0 + i * 86400, price, price + abs(move), price - abs(move), price + move, 0.0))
+        price = max(price + move, 1.0)
+    series = PriceSeries.from_rows(rows, "SIM")
+    grid = dict(DEFAULT_GRID)
+    per_entry = sum(1 for _ in combinations({**grid, 'entry_date': (0,)}))
+    grid['entry_date'] = entry_dates(series, max(1, (bars - MIN_BARS_AFTER_ENTRY) * per_entry // combos))
+    start = time.perf_counter()
+    results = sweep(series, grid, workers)
+    return len(results), time.perf_counter() - start
+
+def _grid_value(name, text):
+    if name == 'entry_date':
+        return datetime.fromisoformat(text).timestamp()
+    if name in ('shares', 'capital'):
+        return int(text)
+    return float(text)
+
+def main():
+    args = list(sys.argv[1:])
+    options = {}
+    for flag in list(_FLAGS) + ['--interval', '--entry-every', '--workers', '--output']:
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            del args[i:i + 2]
+    workers = int(options['--workers']) if '--workers' in options else None
+
+    if '--benchmark' in args:
+        count, seconds = benchmark(workers=workers)
+        print(f"✓ {count:,} combinations in {seconds:.1f}s ({count / seconds:,.0f}/s)")
+        return
+
+    symbol = args[0] if args else "BMNR"
+    interval = options.get('--interval', '1d')
+    series = open_store(symbol, interval).read()
+    if len(series) <= MIN_BARS_AFTER_ENTRY:
+        print(f"✗ No stored {symbol} data (run fetch_and_generate.py first)")
+        return
+
+    grid = dict(DEFAULT_GRID)
+    grid['entry_date'] = entry_dates(series, int(options.get('--entry-every', ENTRY_EVERY)))
+    for flag, name in _FLAGS.items():
+        if flag in options:
+            grid[name] = tuple(_grid_value(name, v) for v in options[flag].split(','))
+    # Entries after the last bar have nothing to replay
+    grid['entry_date'] = tuple(t for t in grid['entry_date'] if t <= series.timestamp[-1])
+
+    print("=" * 90)
+    print(f"🧪 PARAMETER SWEEP: {symbol} short @ {interval}")
+    print("=" * 90)
+    print(f"\n✓ {len(series)} bars: {series.datetime(0):%Y-%m-%d} → {series.datetime(-1):%Y-%m-%d}")
+    for name in PARAMETERS:
+        values = grid[name]
+        shown = ', '.join(_cell(name, v) for v in values[:6]) + (f", … ({len(values)})" if len(values) > 6 else '')
+        print(f"   {name:<22}{shown}")
+
+    start = time.perf_counter()
+    rows = sweep(series, grid, workers)
+    print(f"\n✓ {len(rows):,} combinations replayed in {time.perf_counter() - start:.1f}s")
+    if not rows:
+        return
+    print_summary(rows)
+    print()
+    write_results(rows, options.get('--output', SWEEP_FILE))
+    print("\n" + "=" * 90)
+
+if __name__ == "__main__":
+    main()
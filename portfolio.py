@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Portfolio Engine
+Many long and short positions across symbols and accounts, in columns
+
+Positions live in parallel typed arrays (account, symbol, side, shares,
+entry price/time, borrow rate, commission), accounts in a cash column.
+revalue() prices every position and rolls the results up per account in
+one pass: gathers and a bincount with NumPy, a single loop without it.
+
+Accounting follows the position tracker: cash is collateral net of
+commissions, positions contribute their unrealized P&L less accrued borrow
+fees, and margin level = equity / gross market value.
+"""
+
+import sys
+import time
+from array import array
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:  # stdlib-only fallback
+    np = None
+
+LONG = 1
+SHORT = -1
+
+INITIAL_MARGIN = 1.50
+MAINTENANCE_MARGIN = 1.25
+LIQUIDATION_MARGIN = 1.10
+WARNING_BUFFER = 1.1  # warn below maintenance × this
+
+# Account margin states, least to most severe
+HEALTHY, WARNING, MARGIN_CALL, LIQUIDATION = 0, 1, 2, 3
+MARGIN_STATES = ("HEALTHY", "WARNING", "MARGIN CALL", "LIQUIDATION")
+
+_POSITION_COLUMNS = (('account', 'q'), ('symbol', 'q'), ('side', 'b'), ('shares', 'd'),
+                     ('entry_price', 'd'), ('entry_time', 'd'), ('borrow_rate', 'd'),
+                     ('commission', 'd'))
+
+def _column(values, typecode='d'):
+    return np.frombuffer(values, dtype=np.dtype(typecode)) if len(values) else np.zeros(0, np.dtype(typecode))
+
+class Portfolio:
+    """
+    Columnar book of positions across accounts
+
+    Symbols are interned to integer ids; prices passed to revalue() are a
+    {symbol: price} mapping or a sequence indexed by symbol id.
+    """
+
+    def __init__(self, maintenance=MAINTENANCE_MARGIN, liquidation=LIQUIDATION_MARGIN):
+        self.maintenance = maintenance
+        self.liquidation = liquidation
+        self.symbols = []
+        self._symbol_ids = {}
+        self.cash = array('d')
+        for name, typecode in _POSITION_COLUMNS:
+            setattr(self, name, array(typecode))
+
+    @classmethod
+    def from_position(cls, position, symbol="BMNR", **thresholds):
+        """One-account portfolio holding an open game position (see trade_journal.py)"""
+        book = cls(**thresholds)
+        commission = position.get("open_commission", 0.0)
+        account = book.open_account(position["cash"] + commission)
+        book.add_position(
+            account, position.get("symbol", symbol), position["shares"], position["entry_price"],
+            datetime.fromisoformat(position["entry_date"]).timestamp(),
+            side=LONG if position.get("side") == "long" else SHORT,
+            borrow_rate=position.get("borrow_rate", 0.0), commission=commission,
+        )
+        return book
+
+    def __len__(self):
+        return len(self.shares)
+
+    @property
+    def accounts(self):
+        return len(self.cash)
+
+    def symbol_id(self, symbol):
+        """Integer id for `symbol`, interning it on first use"""
+        if symbol not in self._symbol_ids:
+            self._symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return self._symbol_ids[symbol]
+
+    def open_account(self, cash):
+        """New account with `cash` collateral; returns its id"""
+        self.cash.append(cash)
+        return len(self.cash) - 1
+
+    def add_position(self, account, symbol, shares, entry_price, entry_time=None,
+                     side=SHORT, borrow_rate=0.0, commission=0.0):
+        """Record a fill (commission is taken from the account's cash); returns the position index"""
+        row = (account, self.symbol_id(symbol), side, shares, entry_price,
+               entry_time if entry_time is not None else time.time(), borrow_rate, commission)
+        for (name, _), value in zip(_POSITION_COLUMNS, row):
+            getattr(self, name).append(value)
+        self.cash[account] -= commission
+        return len(self.shares) - 1
+
+    def _prices(self, prices):
+        if isinstance(prices, dict):
+            return [prices.get(symbol, float('nan')) for symbol in self.symbols]
+        return prices
+
+    def revalue(self, prices, now=None):
+        """
+        Mark every position and account to market
+
+        Returns a dict of columns. Per position: 'current_value',
+        'unrealized_pnl', 'pnl_percent', 'borrow_fees', 'net_pnl',
+        'days_elapsed'. Per account: 'equity', 'exposure' (gross market
+        value), 'margin_level' (inf without positions) and 'state'
+        (HEALTHY … LIQUIDATION). NumPy arrays when NumPy is installed,
+        lists otherwise.
+        """
+        now = now if now is not None else time.time()
+        prices = self._prices(prices)
+        if np is not None:
+            return self._revalue_numpy(np.asarray(prices, dtype=np.float64), now)
+
+        accounts = self.accounts
+        equity = list(self.cash)
+        exposure = [0.0] * accounts
+        out = {key: [] for key in ('current_value', 'unrealized_pnl', 'pnl_percent',
+                                   'borrow_fees', 'net_pnl', 'days_elapsed')}
+        for i in range(len(self.shares)):
+            price, entry, shares = prices[self.symbol[i]], self.entry_price[i], self.shares[i]
+            days = (now - self.entry_time[i]) / 86400
+            value = shares * price
+            pnl = self.side[i] * (price - entry) * shares
+            fees = shares * entry * self.borrow_rate[i] / 365 * days
+            account = self.account[i]
+            equity[account] += pnl - fees
+            exposure[account] += value
+            for key, v in (('current_value', value), ('unrealized_pnl', pnl),
+                           ('pnl_percent', self.side[i] * (price - entry) / entry * 100),
+                           ('borrow_fees', fees), ('net_pnl', pnl - fees - self.commission[i]),
+                           ('days_elapsed', days)):
+                out[key].append(v)
+
+        margin = [e / x if x > 0 else float('inf') for e, x in zip(equity, exposure)]
+        out.update(equity=equity, exposure=exposure, margin_level=margin,
+                   state=[self._state(level) for level in margin])
+        return out
+
+    def _revalue_numpy(self, prices, now):
+        account = _column(self.account, 'q')
+        side = _column(self.side, 'b')
+        shares = _column(self.shares)
+        entry = _column(self.entry_price)
+        price = prices[_column(self.symbol, 'q')] if len(self.shares) else np.zeros(0)
+
+        days = (now - _column(self.entry_time)) / 86400
+        value = shares * price
+        move = side * (price - entry)
+        pnl = move * shares
+        fees = shares * entry * _column(self.borrow_rate) / 365 * days
+
+        accounts = self.accounts
+        equity = _column(self.cash) + np.bincount(account, weights=pnl - fees, minlength=accounts)
+        exposure = np.bincount(account, weights=value, minlength=accounts)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            margin = np.where(exposure > 0, equity / exposure, np.inf)
+        return {
+            'current_value': value,
+            'unrealized_pnl': pnl,
+            'pnl_percent': move / entry * 100,
+            'borrow_fees': fees,
+            'net_pnl': pnl - fees - _column(self.commission),
+            'days_elapsed': days,
+            'equity': equity,
+            'exposure': exposure,
+            'margin_level': margin,
+            'state': self.margin_state(margin),
+        }
+
+    def net_exposure(self, prices, account=None):
+        """Signed market value per symbol (long positive, short negative), optionally for one account"""
+        prices = self._prices(prices)
+        totals = [0.0] * len(self.symbols)
+        for i in range(len(self.shares)):
+            if account is None or self.account[i] == account:
+                totals[self.symbol[i]] += self.side[i] * self.shares[i] * prices[self.symbol[i]]
+        return dict(zip(self.symbols, totals))
+
+    def _state(self, level):
+        if level < self.liquidation:
+            return LIQUIDATION
+        if level < self.maintenance:
+            return MARGIN_CALL
+        if level < self.maintenance * WARNING_BUFFER:
+            return WARNING
+        return HEALTHY
+
+    def margin_state(self, levels):
+        """State code for each margin level (array in, array out with NumPy)"""
+        if np is not None:
+            thresholds = np.array([self.liquidation, self.maintenance, self.maintenance * WARNING_BUFFER])
+            return (3 - np.searchsorted(thresholds, levels, side='right')).astype(np.int8)
+        return [self._state(level) for level in levels]
+
+    def can_open(self, account, symbol, shares, price, commission=0.0, initial=INITIAL_MARGIN,
+                 now=None, prices=None):
+        """Whether the account keeps `initial` margin after opening the position and paying commission"""
+        return self.margin_after(account, symbol, shares, price, commission, now, prices) >= initial
+
+    def margin_after(self, account, symbol, shares, price, commission=0.0, now=None, prices=None):
+        """Account margin level if it opened `shares` of `symbol` at `price` (`prices`: its other marks)"""
+        prices = dict(prices or {})
+        prices.setdefault(symbol, price)
+        marks = self.revalue(prices, now)
+        equity = float(marks['equity'][account]) - commission
+        exposure = float(marks['exposure'][account]) + shares * price
+        return equity / exposure if exposure > 0 else float('inf')
+
+    def close(self, indices, prices, now=None, commission_rate=0.0):
+        """
+        Close positions at market: realized P&L less borrow fees and the
+        closing commission goes to cash, and the rows are removed
+
+        Returns the realized amount per closed position, in `indices` order.
+        """
+        marks = self.revalue(prices, now)
+        closing = set(indices)
+        realized = []
+        for i in indices:
+            amount = (float(marks['unrealized_pnl'][i]) - float(marks['borrow_fees'][i])
+                      - float(marks['current_value'][i]) * commission_rate)
+            self.cash[self.account[i]] += amount
+            realized.append(amount)
+        keep = [i for i in range(len(self.shares)) if i not in closing]
+        for name, typecode in _POSITION_COLUMNS:
+            column = getattr(self, name)
+            setattr(self, name, array(typecode, (column[i] for i in keep)))
+        return realized
+
+    def apply_margin_rules(self, prices, now=None, commission_rate=0.0):
+        """
+        Liquidate every account below the liquidation margin
+
+        Returns (marks before liquidation, ids of the liquidated accounts).
+        """
+        marks = self.revalue(prices, now)
+        if np is not None:
+            liquidated = np.flatnonzero(marks['state'] == LIQUIDATION).tolist()
+        else:
+            liquidated = [a for a, state in enumerate(marks['state']) if state == LIQUIDATION]
+        if liquidated:
+            doomed = set(liquidated)
+            self.close([i for i in range(len(self.shares)) if self.account[i] in doomed],
+                       prices, now, commission_rate)
+        return marks, liquidated
+
+def benchmark(accounts=10_000, positions_per_account=3, symbols=("BMNR", "MSTR", "COIN"), rounds=20):
+    """Average milliseconds to revalue a random book of simulated accounts"""
+    import random
+    rng = random.Random(0)
+    book = Portfolio()
+    now = time.time()
+    for _ in range(accounts):
+        account = book.open_account(rng.uniform(50_000, 200_000))
+        for _ in range(positions_per_account):
+            book.add_position(account, rng.choice(symbols), rng.randint(100, 3000), rng.uniform(20, 60),
+                              now - rng.uniform(0, 90) * 86400, side=rng.choice((LONG, SHORT)),
+                              borrow_rate=0.08, commission=10.0)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        book.revalue([rng.uniform(20, 60) for _ in symbols], now)
+    return (time.perf_counter() - start) / rounds * 1000, len(book)
+
+def main():
+    accounts = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    print("=" * 60)
+    print("Portfolio Engine Benchmark")
+    print("=" * 60)
+    ms, positions = benchmark(accounts)
+    print(f"\n✓ {accounts:,} accounts / {positions:,} positions revalued in {ms:.2f} ms "
+          f"({'NumPy' if np is not None else 'stdlib'})")
+
+if __name__ == "__main__":
+    main()
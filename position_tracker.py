@@ -4,67 +4,100 @@ Jesse Livermore Position Tracker
 Integrates with BMNR tracker to show active short position
 """
 
-import json
-import os
 from datetime import datetime
 
-POSITION_FILE = "data/trading_position.json"
+from portfolio import Portfolio
+from rolling_stats import load_current_stats
+from trade_journal import current_position
 
 def load_position():
-    """Load active position if exists"""
-    if os.path.exists(POSITION_FILE):
-        try:
-            with open(POSITION_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            pass
-    return None
+    """Load active position if exists (rebuilt from the trade journal)"""
+    try:
+        return current_position("BMNR")
+    except (OSError, ValueError, KeyError):
+        return None
 
-def calculate_position_status(position, current_price):
-    """Calculate all position metrics"""
-    entry_price = position["entry_price"]
-    shares = position["shares"]
-    cash = position["cash"]
-    entry_value = shares * entry_price
-    current_value = shares * current_price
-    
-    # P&L calculation (short: profit when price falls)
-    price_diff = entry_price - current_price
-    unrealized_pnl = price_diff * shares
-    pnl_percent = (price_diff / entry_price) * 100
-    
-    # Time-based fees
-    entry_dt = datetime.fromisoformat(position["entry_date"])
-    now_dt = datetime.now()
-    days_elapsed = (now_dt - entry_dt).total_seconds() / 86400
-    
-    daily_fee_rate = position["borrow_rate"] / 365
-    borrow_fees = entry_value * daily_fee_rate * days_elapsed
-    
-    total_fees = position["open_commission"] + borrow_fees
-    net_pnl = unrealized_pnl - total_fees
-    
-    # Margin calculation
-    equity = cash + unrealized_pnl - borrow_fees
-    margin_level = equity / current_value if current_value > 0 else 0
+def calculate_position_status(position, current_price, now=None):
+    """Calculate all position metrics (a one-position view over the portfolio engine)"""
+    book = Portfolio.from_position(position)
+    marks = book.revalue([current_price], now or datetime.now().timestamp())
+    
+    def mark(key):
+        return float(marks[key][0])
     
     return {
         "current_price": current_price,
-        "current_value": current_value,
-        "unrealized_pnl": unrealized_pnl,
-        "pnl_percent": pnl_percent,
-        "borrow_fees": borrow_fees,
-        "total_fees": total_fees,
-        "net_pnl": net_pnl,
-        "equity": equity,
-        "margin_level": margin_level,
-        "days_elapsed": days_elapsed,
-        "maintenance_margin": 1.25,
-        "liquidation_margin": 1.10
+        "current_value": mark("current_value"),
+        "unrealized_pnl": mark("unrealized_pnl"),
+        "pnl_percent": mark("pnl_percent"),
+        "borrow_fees": mark("borrow_fees"),
+        "total_fees": position["open_commission"] + mark("borrow_fees"),
+        "net_pnl": mark("net_pnl"),
+        "equity": mark("equity"),
+        "margin_level": mark("margin_level"),
+        "days_elapsed": mark("days_elapsed"),
+        "maintenance_margin": book.maintenance,
+        "liquidation_margin": book.liquidation
     }
 
-def generate_position_html_section(position, status):
-    """Generate HTML section for position display"""
+def generate_risk_html(risk):
+    """Monte Carlo margin-call/liquidation odds per horizon (see liquidation_risk.py)"""
+    if not risk:
+        return ""
+    
+    rows = []
+    for i, horizon in enumerate(risk['horizons']):
+        gbm, boot = risk['methods']['gbm'], risk['methods']['bootstrap']
+        rows.append(f"""
+                <tr>
+                    <td>{horizon} day{'s' if horizon != 1 else ''}</td>
+                    <td>{gbm['margin_call'][i]*100:.1f}% / {boot['margin_call'][i]*100:.1f}%</td>
+                    <td>{gbm['liquidation'][i]*100:.1f}% / {boot['liquidation'][i]*100:.1f}%</td>
+                    <td>-฿{boot['fee_drag'][i]:,.2f}</td>
+                </tr>""")
+    
+    return f"""
+        <div class="risk-forecast">
+            <h3>🎲 Forward Risk ({risk['paths']:,} simulated paths, daily σ {risk['sigma']*100:.1f}%)</h3>
+            <table class="risk-table">
+                <tr><th>Horizon</th><th>Margin Call (GBM / Hist.)</th><th>Liquidation (GBM / Hist.)</th><th>Borrow Fees</th></tr>{"".join(rows)}
+            </table>
+        </div>"""
+
+def generate_var_html(report):
+    """Historical / filtered historical VaR and ES per horizon (see value_at_risk.py)"""
+    if not report:
+        return ""
+    
+    historical, filtered = report['methods']['historical'], report['methods']['filtered']
+    confidences = list(historical[next(iter(historical))])
+    
+    def loss(figures, key):
+        return "—" if figures[key] is None else f"฿{figures[key]:,.0f}"
+    
+    rows = []
+    for horizon in historical:
+        cells = "".join(
+            f"<td>{loss(historical[horizon][c], 'var')} / {loss(filtered[horizon][c], 'var')}"
+            f"<br><small>ES {loss(historical[horizon][c], 'es')} / {loss(filtered[horizon][c], 'es')}</small></td>"
+            for c in confidences
+        )
+        rows.append(f"""
+                    <tr><td>{horizon} day{'s' if horizon != '1' else ''}</td>{cells}</tr>""")
+    
+    headers = "".join(f"<th>VaR {float(c)*100:.0f}% (Hist. / Filtered)</th>" for c in confidences)
+    return f"""
+            <table class="var-table">
+                <tr><th>Horizon</th>{headers}</tr>{"".join(rows)}
+            </table>"""
+
+def generate_position_html_section(position, status, risk=None, var=None):
+    """
+    Generate HTML section for position display
+    
+    `risk`: liquidation_risk.position_risk() result, `var`:
+    value_at_risk.position_var() report shown under the margin bar.
+    """
     
     # Determine status indicators
     if status["margin_level"] < status["liquidation_margin"]:
@@ -125,8 +158,9 @@ def generate_position_html_section(position, status):
                     <span>Maintenance: {status['maintenance_margin']*100:.0f}%</span>
                     <span>Current: {status['margin_level']*100:.1f}%</span>
                 </div>
-            </div>
+            </div>{generate_var_html(var)}
         </div>
+        {generate_risk_html(risk)}
         
         <div class="position-details">
             <div class="detail-row">
@@ -310,6 +344,55 @@ def get_position_css():
         color: #94a3b8;
     }
     
+    .risk-forecast {
+        background: #0f172a;
+        padding: 15px;
+        border-radius: 8px;
+        margin: 20px 0;
+    }
+    
+    .risk-forecast h3 {
+        margin: 0 0 10px 0;
+        font-size: 1em;
+        color: #e2e8f0;
+    }
+    
+    .risk-table {
+        width: 100%;
+        border-collapse: collapse;
+    }
+    
+    .risk-table th, .risk-table td {
+        padding: 8px;
+        border-bottom: 1px solid #1e293b;
+        text-align: left;
+    }
+    
+    .risk-table th {
+        color: #94a3b8;
+        font-size: 0.85em;
+    }
+    
+    .var-table {
+        width: 100%;
+        border-collapse: collapse;
+        margin-top: 15px;
+    }
+    
+    .var-table th, .var-table td {
+        padding: 6px 8px;
+        text-align: left;
+    }
+    
+    .var-table th {
+        color: #94a3b8;
+        font-size: 0.85em;
+    }
+    
+    .var-table small {
+        color: #94a3b8;
+    }
+    
     .position-details {
         background: #0f172a;
         padding: 15px;
@@ -349,9 +432,9 @@ def get_position_css():
 if __name__ == "__main__":
     # Test the position tracker
     position = load_position()
-    current_price = get_current_price()
+    current_price = load_current_stats().get('current_price')
     
-    if position:
+    if position and current_price:
         status = calculate_position_status(position, current_price)
         print("Position Status:")
         print(f"  Current Price: ฿{status['current_price']:.2f}")
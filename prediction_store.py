@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Prediction Store
+SQLite-backed storage for tracked predictions
+
+WAL mode lets the CLI and scheduled runs read and write concurrently; each
+write touches one row instead of rewriting a JSON file. The legacy
+data/predictions.json is imported once on first open and is exported again
+once per Pages build (fetch_and_generate.py), not on every write.
+"""
+
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+
+PREDICTIONS_DB = "data/predictions.db"
+PREDICTIONS_JSON = "data/predictions.json"
+
+FIELDS = ('id', 'timestamp', 'statement', 'target_price', 'initial_price', 'timeframe',
+          'source', 'notes', 'status', 'result', 'accuracy_score',
+          'deadline', 'first_touch', 'mae_pct', 'error_pct', 'touch_probability')
+
+# Applied in order; PRAGMA user_version records how many have run
+MIGRATIONS = [
+    """
+    CREATE TABLE predictions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        statement TEXT NOT NULL,
+        target_price REAL NOT NULL,
+        initial_price REAL,
+        timeframe TEXT,
+        source TEXT NOT NULL DEFAULT 'Manual',
+        notes TEXT NOT NULL DEFAULT '',
+        status TEXT NOT NULL DEFAULT 'active',
+        result TEXT,
+        accuracy_score TEXT
+    );
+    CREATE INDEX idx_predictions_status ON predictions(status);
+    CREATE INDEX idx_predictions_source ON predictions(source);
+    CREATE INDEX idx_predictions_timestamp ON predictions(timestamp);
+    CREATE TABLE store_meta (key TEXT PRIMARY KEY, value TEXT);
+    """,
+    # Price-path verification: deadline and first touch in epoch seconds
+    """
+    ALTER TABLE predictions ADD COLUMN deadline INTEGER;
+    ALTER TABLE predictions ADD COLUMN first_touch INTEGER;
+    ALTER TABLE predictions ADD COLUMN mae_pct REAL;
+    """,
+    # Expiry scheduling: active predictions ordered by deadline
+    """
+    CREATE INDEX idx_predictions_due ON predictions(status, deadline);
+    """,
+    # Numeric accuracy ("73.2%" → 73.2; SQLite cannot change a column's type in
+    # place, so the table is rebuilt) and per-source leaderboard aggregates
+    """
+    CREATE TABLE predictions_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        statement TEXT NOT NULL,
+        target_price REAL NOT NULL,
+        initial_price REAL,
+        timeframe TEXT,
+        source TEXT NOT NULL DEFAULT 'Manual',
+        notes TEXT NOT NULL DEFAULT '',
+        status TEXT NOT NULL DEFAULT 'active',
+        result TEXT,
+        accuracy_score REAL,
+        deadline INTEGER,
+        first_touch INTEGER,
+        mae_pct REAL,
+        error_pct REAL,
+        touch_probability REAL
+    );
+    INSERT INTO predictions_new (id, timestamp, statement, target_price, initial_price, timeframe, source,
+                                 notes, status, result, accuracy_score, deadline, first_touch, mae_pct)
+        SELECT id, timestamp, statement, target_price, initial_price, timeframe, source,
+               notes, status, result, CAST(REPLACE(accuracy_score, '%', '') AS REAL), deadline, first_touch, mae_pct
+        FROM predictions;
+    INSERT OR REPLACE INTO store_meta
+        SELECT 'predictions_seq', seq FROM sqlite_sequence WHERE name = 'predictions';
+    DROP TABLE predictions;
+    ALTER TABLE predictions_new RENAME TO predictions;
+    DELETE FROM sqlite_sequence WHERE name = 'predictions';
+    INSERT INTO sqlite_sequence (name, seq)
+        SELECT 'predictions', CAST(value AS INTEGER) FROM store_meta WHERE key = 'predictions_seq';
+    DELETE FROM store_meta WHERE key = 'predictions_seq';
+    CREATE INDEX idx_predictions_status ON predictions(status);
+    CREATE INDEX idx_predictions_source ON predictions(source);
+    CREATE INDEX idx_predictions_timestamp ON predictions(timestamp);
+    CREATE INDEX idx_predictions_due ON predictions(status, deadline);
+    CREATE TABLE leaderboard (
+        source TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        resolved INTEGER NOT NULL DEFAULT 0,
+        hits INTEGER NOT NULL DEFAULT 0,
+        expired INTEGER NOT NULL DEFAULT 0,
+        accuracy_sum REAL NOT NULL DEFAULT 0,
+        accuracy_count INTEGER NOT NULL DEFAULT 0,
+        chance_sum REAL NOT NULL DEFAULT 0,
+        chance_count INTEGER NOT NULL DEFAULT 0,
+        chance_hits INTEGER NOT NULL DEFAULT 0,
+        error_counts TEXT NOT NULL DEFAULT '[]',
+        PRIMARY KEY (source, bucket)
+    );
+    """,
+]
+
+@contextmanager
+def transaction(conn):
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on error (takes the write lock up front)"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+def _schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def _migrate_schema(conn):
+    """Bring the schema up to date under one write lock"""
+    if _schema_version(conn) >= len(MIGRATIONS):
+        return
+    with transaction(conn):
+        version = _schema_version(conn)
+        for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+            for statement in script.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+
+def connect(path=PREDICTIONS_DB, json_path=PREDICTIONS_JSON):
+    """
+    Open (creating if needed) the prediction database
+
+    On the first open the legacy JSON file, if any, is imported with its
+    original IDs.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    # Autocommit: single-row writes commit immediately, multi-statement work uses BEGIN
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    _migrate_schema(conn)
+
+    imported = conn.execute("SELECT value FROM store_meta WHERE key = 'json_imported'").fetchone()
+    if imported is None:
+        with transaction(conn):
+            # Re-check under the write lock in case another process got here first
+            if conn.execute("SELECT 1 FROM store_meta WHERE key = 'json_imported'").fetchone() is None:
+                count = import_json(conn, json_path) if json_path and os.path.exists(json_path) else 0
+                conn.execute("INSERT INTO store_meta VALUES ('json_imported', ?)", (str(count),))
+    return conn
+
+def parse_accuracy(value):
+    """Accuracy as a number (legacy files store text such as 73.2%)"""
+    if isinstance(value, str):
+        value = value.strip().rstrip('%')
+        return float(value) if value else None
+    return value
+
+def import_json(conn, path=PREDICTIONS_JSON):
+    """Insert every prediction from a JSON export, keeping IDs (inside the caller's transaction)"""
+    with open(path, 'r') as f:
+        predictions = json.load(f)
+    for p in predictions:
+        p['accuracy_score'] = parse_accuracy(p.get('accuracy_score'))
+    rows = [tuple(p.get(field) for field in FIELDS) for p in predictions]
+    conn.executemany(
+        f"INSERT OR REPLACE INTO predictions ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})",
+        rows
+    )
+    return len(rows)
+
+def export_json(conn, path=PREDICTIONS_JSON):
+    """Write all predictions to JSON (same layout as the legacy file), atomically"""
+    predictions = [dict(row) for row in conn.execute(f"SELECT {', '.join(FIELDS)} FROM predictions ORDER BY id")]
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(predictions, f, indent=2)
+    os.replace(tmp, path)
+    return len(predictions)
+
+def add(conn, prediction):
+    """Insert a prediction dict (without 'id'); returns the new ID"""
+    fields = [f for f in FIELDS if f != 'id' and f in prediction]
+    cursor = conn.execute(
+        f"INSERT INTO predictions ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))})",
+        [prediction[f] for f in fields]
+    )
+    return cursor.lastrowid
+
+def get(conn, pred_id):
+    row = conn.execute("SELECT * FROM predictions WHERE id = ?", (pred_id,)).fetchone()
+    return dict(row) if row else None
+
+def update(conn, pred_id, **fields):
+    """Set columns of one prediction; returns False if the ID does not exist"""
+    unknown = set(fields) - set(FIELDS[1:])
+    if unknown:
+        raise ValueError(f"Unknown prediction fields: {', '.join(sorted(unknown))}")
+    assignments = ', '.join(f"{name} = ?" for name in fields)
+    cursor = conn.execute(f"UPDATE predictions SET {assignments} WHERE id = ?",
+                          list(fields.values()) + [pred_id])
+    return cursor.rowcount > 0
+
+def delete(conn, pred_id):
+    return conn.execute("DELETE FROM predictions WHERE id = ?", (pred_id,)).rowcount > 0
+
+def by_status(conn, *statuses):
+    """Predictions with any of `statuses` (index lookup), oldest first"""
+    marks = ', '.join('?' * len(statuses))
+    rows = conn.execute(f"SELECT * FROM predictions WHERE status IN ({marks}) ORDER BY timestamp, id", statuses)
+    return [dict(row) for row in rows]
+
+def due(conn, until):
+    """Active predictions with a deadline at or before `until` (epoch), earliest first"""
+    rows = conn.execute(
+        "SELECT * FROM predictions WHERE status = 'active' AND deadline <= ? ORDER BY deadline", (until,)
+    )
+    return [dict(row) for row in rows]
+
+def pending(conn, since):
+    """Active predictions with no deadline or a deadline at or after `since` (epoch), oldest first"""
+    rows = conn.execute(
+        "SELECT * FROM predictions WHERE status = 'active' AND (deadline IS NULL OR deadline >= ?)"
+        " ORDER BY timestamp, id", (since,)
+    )
+    return [dict(row) for row in rows]
+
+def undated(conn):
+    """Active predictions whose timeframe has not been turned into a deadline"""
+    rows = conn.execute("SELECT * FROM predictions WHERE status = 'active' AND deadline IS NULL")
+    return [dict(row) for row in rows]
+
+def by_source(conn, source):
+    rows = conn.execute("SELECT * FROM predictions WHERE source = ? ORDER BY timestamp, id", (source,))
+    return [dict(row) for row in rows]
+
+def all_predictions(conn):
+    return [dict(row) for row in conn.execute("SELECT * FROM predictions ORDER BY id")]
+
+def get_meta(conn, key, default=None):
+    row = conn.execute("SELECT value FROM store_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+def set_meta(conn, key, value):
+    conn.execute("INSERT OR REPLACE INTO store_meta VALUES (?, ?)", (key, str(value)))
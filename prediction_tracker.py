@@ -4,47 +4,53 @@ Prediction Tracker
 Log and measure accuracy of external predictions about BMNR
 """
 
-import json
-import os
 from datetime import datetime
-import urllib.request
+import leaderboard
+import prediction_store
+from bar_store import open_store
+from prediction_store import PREDICTIONS_JSON as PREDICTIONS_FILE
+from prediction_verify import resolution, verify_predictions
+from timeframes import parse_timeframe
+from yahoo_client import get_market_price
 
-PREDICTIONS_FILE = "data/predictions.json"
+# Deadline passed but no stored prices cover it yet: wait this long before expiring
+EXPIRY_GRACE_DAYS = 3
+
+_store = None
+
+def get_store():
+    """Shared connection to the prediction database (imports the JSON file on first use)"""
+    global _store
+    if _store is None:
+        _store = prediction_store.connect()
+        leaderboard.ensure_built(_store)
+    return _store
 
 def load_predictions():
     """Load existing predictions"""
-    if os.path.exists(PREDICTIONS_FILE):
-        with open(PREDICTIONS_FILE, 'r') as f:
-            return json.load(f)
-    return []
+    return prediction_store.all_predictions(get_store())
 
-def save_predictions(predictions):
-    """Save predictions to file"""
-    os.makedirs(os.path.dirname(PREDICTIONS_FILE), exist_ok=True)
-    with open(PREDICTIONS_FILE, 'w') as f:
-        json.dump(predictions, f, indent=2)
+def export_predictions(path=PREDICTIONS_FILE):
+    """Refresh the JSON copy published with the Pages site"""
+    count = prediction_store.export_json(get_store(), path)
+    print(f"✓ {count} predictions exported to {path}")
 
 def get_current_price():
     """Fetch current BMNR price"""
     try:
-        url = "https://query1.finance.yahoo.com/v8/finance/chart/BMNR?interval=1d&range=1d"
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        req = urllib.request.Request(url, headers=headers)
-        
-        with urllib.request.urlopen(req) as response:
-            data = json.loads(response.read().decode())
-            result = data['chart']['result'][0]
-            return result['meta']['regularMarketPrice']
-    except:
+        return get_market_price("BMNR")
+    except Exception:
         return None
 
+def _deadline(timeframe, start):
+    deadline = parse_timeframe(timeframe, start)
+    return int(deadline.timestamp()) if deadline else None
+
 def add_prediction(statement, target_price, timeframe, source="Manual", notes=""):
     """Add a new prediction"""
-    predictions = load_predictions()
-    
+    now = datetime.now()
     prediction = {
-        "id": len(predictions) + 1,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now.isoformat(),
         "statement": statement,
         "target_price": target_price,
         "initial_price": get_current_price(),
@@ -53,18 +59,103 @@ def add_prediction(statement, target_price, timeframe, source="Manual", notes=""
         "notes": notes,
         "status": "active",
         "result": None,
-        "accuracy_score": None
+        "accuracy_score": None,
+        "deadline": _deadline(timeframe, now)
     }
     
-    predictions.append(prediction)
-    save_predictions(predictions)
+    prediction['id'] = prediction_store.add(get_store(), prediction)
     
     print(f"✓ Prediction #{prediction['id']} added")
+    if prediction['deadline']:
+        print(f"   Deadline: {datetime.fromtimestamp(prediction['deadline']):%Y-%m-%d %H:%M}")
     return prediction
 
+def verify_active(symbol="BMNR", interval="1d", recheck=()):
+    """
+    Resolve active predictions against the stored price path; returns how many resolved
+
+    Only predictions whose window reaches the last bar the previous run
+    saw (that bar may have been re-fetched) or later are checked: earlier
+    windows have no new bars. `recheck` adds IDs whose deadline just
+    changed.
+    """
+    store = get_store()
+    series = open_store(symbol, interval).read()
+    if not series:
+        return 0
+    
+    marker = f"verified_through:{symbol}:{interval}"
+    since = prediction_store.get_meta(store, marker)
+    if since is None:
+        active = prediction_store.by_status(store, 'active')
+    else:
+        active = prediction_store.pending(store, int(since))
+    by_id = {pred['id']: pred for pred in active}
+    for pred_id in recheck:
+        pred = prediction_store.get(store, pred_id)
+        if pred and pred['status'] == 'active' and pred_id not in by_id:
+            active.append(pred)
+            by_id[pred_id] = pred
+    
+    resolved = 0
+    with prediction_store.transaction(store):
+        prediction_store.set_meta(store, marker, series.timestamp[-1])
+        for result in verify_predictions(active, series):
+            pred = by_id[result['id']]
+            changes = resolution(pred, result)
+            prediction_store.update(store, result['id'], **changes)
+            if 'status' in changes:
+                leaderboard.record(store, {**pred, **changes})
+                resolved += 1
+                print(f"✓ Prediction #{result['id']} {changes['status'].upper()}: {changes['result']}")
+    return resolved
+
+def schedule_deadlines():
+    """
+    Parse deadlines for active predictions that don't have one yet (e.g. imported from JSON)
+
+    Returns the IDs that got a deadline.
+    """
+    store = get_store()
+    dated = []
+    with prediction_store.transaction(store):
+        for pred in prediction_store.undated(store):
+            deadline = _deadline(pred['timeframe'], datetime.fromisoformat(pred['timestamp']))
+            if deadline:
+                prediction_store.update(store, pred['id'], deadline=deadline)
+                dated.append(pred['id'])
+    return dated
+
+def expire_due(now=None):
+    """
+    Expire active predictions past their deadline that verification could not resolve
+
+    Due predictions come off the (status, deadline) index earliest first, so
+    each run only touches the ones that are due.
+    """
+    now = now or datetime.now()
+    store = get_store()
+    cutoff = int(now.timestamp()) - EXPIRY_GRACE_DAYS * 86400
+    expired = 0
+    with prediction_store.transaction(store):
+        for pred in prediction_store.due(store, cutoff):
+            deadline = datetime.fromtimestamp(pred['deadline']).strftime('%Y-%m-%d')
+            changes = {'status': 'expired', 'result': f"Deadline {deadline} passed; no stored prices to verify"}
+            prediction_store.update(store, pred['id'], **changes)
+            leaderboard.record(store, {**pred, **changes})
+            print(f"⌛ Prediction #{pred['id']} EXPIRED (deadline {deadline})")
+            expired += 1
+    return expired
+
+def run_scheduler():
+    """Deadlines, price-path verification, then expiry; returns how many predictions changed"""
+    dated = schedule_deadlines()
+    return verify_active(recheck=dated) + expire_due()
+
 def check_predictions():
     """Check status of all predictions"""
-    predictions = load_predictions()
+    run_scheduler()
+    
     current_price = get_current_price()
     
     if not current_price:
@@ -76,8 +167,9 @@ def check_predictions():
     print("PREDICTION TRACKING")
     print("=" * 80)
     
-    active = [p for p in predictions if p['status'] == 'active']
-    completed = [p for p in predictions if p['status'] in ['hit', 'missed', 'expired']]
+    store = get_store()
+    active = prediction_store.by_status(store, 'active')
+    completed = prediction_store.by_status(store, 'hit', 'missed', 'expired')
     
     if active:
         print(f"\n📊 ACTIVE PREDICTIONS ({len(active)}):")
@@ -101,6 +193,11 @@ def check_predictions():
             print(f"   Progress: {progress_pct:.1f}% of predicted move")
             print(f"   Remaining: ${move_needed:.2f} ({pct_needed:+.1f}%)")
             print(f"   Timeframe: {pred['timeframe']}")
+            if pred['deadline']:
+                days_left = (pred['deadline'] - datetime.now().timestamp()) / 86400
+                print(f"   Deadline: {datetime.fromtimestamp(pred['deadline']):%Y-%m-%d} ({days_left:.0f} days left)")
+            if pred['mae_pct'] is not None:
+                print(f"   Max adverse excursion so far: {pred['mae_pct']:.1f}%")
             
             if pred['notes']:
                 print(f"   Notes: {pred['notes']}")
@@ -114,8 +211,8 @@ def check_predictions():
             print(f"   Status: {pred['status'].upper()}")
             print(f"   Target: ${pred['target_price']:.2f}")
             print(f"   Result: {pred['result']}")
-            if pred['accuracy_score']:
-                print(f"   Accuracy: {pred['accuracy_score']}")
+            if pred['accuracy_score'] is not None:
+                print(f"   Accuracy: {pred['accuracy_score']:.1f}%")
     
     if not active and not completed:
         print("\n📝 No predictions tracked yet.")
@@ -125,31 +222,49 @@ def check_predictions():
 
 def mark_prediction(pred_id, status, result_price=None):
     """Mark a prediction as hit/missed/expired"""
-    predictions = load_predictions()
+    store = get_store()
+    pred = prediction_store.get(store, pred_id)
     
-    for pred in predictions:
-        if pred['id'] == pred_id:
-            pred['status'] = status
-            
-            if result_price:
-                target = pred['target_price']
-                initial = pred['initial_price']
-                
-                # Calculate accuracy
-                target_move = target - initial
-                actual_move = result_price - initial
-                
-                if target_move != 0:
-                    accuracy = (actual_move / target_move) * 100
-                    pred['accuracy_score'] = f"{accuracy:.1f}%"
-                
-                pred['result'] = f"Price reached ${result_price:.2f}"
-            
-            save_predictions(predictions)
-            print(f"✓ Prediction #{pred_id} marked as {status}")
-            return
+    if pred is None:
+        print(f"✗ Prediction #{pred_id} not found")
+        return
     
-    print(f"✗ Prediction #{pred_id} not found")
+    changes = {'status': status}
+    
+    if result_price:
+        target = pred['target_price']
+        initial = pred['initial_price']
+        
+        # Calculate accuracy
+        target_move = target - initial
+        actual_move = result_price - initial
+        
+        if target_move != 0:
+            accuracy = (actual_move / target_move) * 100
+            changes['accuracy_score'] = round(accuracy, 1)
+        
+        changes['error_pct'] = round(abs(result_price - target) / target * 100, 2)
+        changes['result'] = f"Price reached ${result_price:.2f}"
+    
+    # Swap this prediction's old outcome for the new one in the leaderboard
+    with prediction_store.transaction(store):
+        leaderboard.record(store, pred, sign=-1)
+        prediction_store.update(store, pred_id, **changes)
+        leaderboard.record(store, {**pred, **changes})
+    print(f"✓ Prediction #{pred_id} marked as {status}")
+
+def delete_prediction(pred_id):
+    """Remove a prediction (its ID is never reused)"""
+    store = get_store()
+    with prediction_store.transaction(store):
+        pred = prediction_store.get(store, pred_id)
+        if pred is not None:
+            leaderboard.record(store, pred, sign=-1)
+            prediction_store.delete(store, pred_id)
+    if pred is not None:
+        print(f"✓ Prediction #{pred_id} deleted")
+    else:
+        print(f"✗ Prediction #{pred_id} not found")
 
 def main():
     import sys
@@ -192,6 +307,23 @@ def main():
         mark_prediction(pred_id, "missed")
         check_predictions()
     
+    elif command == "--delete":
+        if len(sys.argv) < 3:
+            print("Usage: python3 prediction_tracker.py --delete <id>")
+            return
+        
+        delete_prediction(int(sys.argv[2]))
+    
+    elif command == "--verify":
+        changed = run_scheduler()
+        print(f"✓ {changed} predictions resolved or expired")
+    
+    elif command == "--export-json":
+        export_predictions()
+    
+    elif command == "--leaderboard":
+        leaderboard.print_standings(get_store())
+    
     elif command == "--list":
         check_predictions()
     
@@ -200,6 +332,10 @@ def main():
         print("  --add <target> <timeframe> [statement]  - Add new prediction")
         print("  --hit <id> <price>                      - Mark prediction as hit")
         print("  --miss <id>                             - Mark prediction as missed")
+        print("  --delete <id>                           - Delete a prediction")
+        print("  --verify                                - Resolve/expire predictions from stored prices")
+        print("  --export-json                           - Rewrite data/predictions.json from the database")
+        print("  --leaderboard                           - Accuracy by source and timeframe")
         print("  --list                                  - Show all predictions")
         print("\nDefault (no args): Show current status")
 
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Prediction Verification
+Resolve predictions against the stored OHLCV path, all at once
+
+For every prediction the window runs from the first bar after it was made
+to its deadline (or the last stored bar). Sparse tables answer range
+max/min queries in O(1), so finding the first bar whose high (low) reaches
+the target is a binary search of O(log n) queries per prediction, run in
+lock-step across all predictions with NumPy when available.
+
+Each result also carries the chance of touching the target under a
+driftless random walk with the volatility seen before the prediction, the
+baseline the leaderboard calibrates sources against.
+"""
+
+import math
+from datetime import datetime
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:  # stdlib-only fallback
+    np = None
+
+VOL_LOOKBACK = 30  # bars of realized volatility before a prediction
+
+class RangeIndex:
+    """
+    O(1) range-max queries over one column (sparse table)
+
+    Built once in O(n log n). Range minimums are range maximums of the
+    negated column. Queries take inclusive [left, right] bounds and accept
+    NumPy index arrays when NumPy is installed.
+    """
+
+    def __init__(self, values):
+        n = len(values)
+        if np is not None:
+            levels = [np.asarray(values, dtype=np.float64)]
+            width = 1
+            while width * 2 <= n:
+                prev = levels[-1]
+                level = np.full(n, -np.inf)
+                level[:n - width] = np.maximum(prev[:n - width], prev[width:])
+                levels.append(level)
+                width *= 2
+            self.table = np.vstack(levels)
+        else:
+            self.table = [list(values)]
+            width = 1
+            while width * 2 <= n:
+                prev = self.table[-1]
+                self.table.append([max(prev[i], prev[i + width]) for i in range(n - 2 * width + 1)])
+                width *= 2
+
+    def query(self, left, right):
+        """max(values[left..right]) for scalars or arrays of bounds"""
+        if np is not None:
+            left = np.asarray(left)
+            right = np.asarray(right)
+            k = np.floor(np.log2(right - left + 1)).astype(np.int64)
+            return np.maximum(self.table[k, left], self.table[k, right - (1 << k) + 1])
+        k = (right - left + 1).bit_length() - 1
+        return max(self.table[k][left], self.table[k][right - (1 << k) + 1])
+
+def _first_reach(index, left, right, level):
+    """Smallest m in [left, right] with max(values[left..m]) >= level (caller checks it exists)"""
+    if np is not None:
+        lo, hi = left.copy(), right.copy()
+        while True:
+            active = lo < hi
+            if not active.any():
+                return lo
+            mid = (lo + hi) // 2
+            reached = index.query(left, mid) >= level
+            hi = np.where(active & reached, mid, hi)
+            lo = np.where(active & ~reached, mid + 1, lo)
+
+    lo, hi = left, right
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if index.query(left, mid) >= level:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+def touch_probability(reference, target, variance):
+    """
+    P(a driftless random walk in log price touches `target` from `reference`)
+
+    `variance` is the log-return variance over the whole window; by the
+    reflection principle the chance is 2 × P(end of walk beyond target).
+    """
+    if variance is None or reference <= 0 or target <= 0:
+        return None
+    distance = abs(math.log(target / reference))
+    if variance <= 0:
+        return 1.0 if distance == 0 else 0.0
+    return min(1.0, math.erfc(distance / math.sqrt(2 * variance)))
+
+def _variance_rates(series):
+    """Prefix sums of squared close-to-close log returns (variance per second = Δsum / Δtime)"""
+    close = series.close
+    squares = (math.log(close[i] / close[i - 1]) ** 2 if close[i - 1] > 0 and close[i] > 0 else 0.0
+               for i in range(1, len(close)))
+    return list(accumulate(squares, initial=0.0))
+
+def _window_variance(series, cumulative, left, horizon):
+    """Variance expected over `horizon` seconds at the realized rate of the bars before `left`"""
+    end = left - 1
+    begin = max(0, end - VOL_LOOKBACK)
+    if end - begin < 2:
+        return None
+    elapsed = series.timestamp[end] - series.timestamp[begin]
+    if elapsed <= 0:
+        return None
+    return (cumulative[end] - cumulative[begin]) / elapsed * max(horizon, 0)
+
+def verify_predictions(predictions, series, now=None):
+    """
+    Check every prediction's target against the stored price path
+
+    A prediction's window starts at the first bar after its timestamp and
+    ends at its 'deadline' (epoch seconds) if set, else the last bar.
+    Targets above the reference price (initial_price, or the last close
+    before the prediction) are touched by a bar high, targets below by a
+    bar low.
+
+    Returns one dict per prediction that has bars in its window: 'id',
+    'touched', 'touch_timestamp', 'touch_index', 'best_price' (most
+    favourable price in the window), 'mae_pct' (maximum adverse excursion
+    before the touch or window end, as a positive %), 'reference' and
+    'expired' (deadline passed without a touch, and the stored bars reach
+    past it so the window is complete) and 'touch_probability' (random-walk
+    chance of a touch by the deadline, or by the last bar if there is none;
+    None without enough earlier bars).
+    """
+    now = now if now is not None else datetime.now().timestamp()
+    n = len(series)
+    if not n or not predictions:
+        return []
+
+    highs = RangeIndex(series.high)
+    neg_lows = RangeIndex([-v for v in series.low])
+    cumulative = _variance_rates(series)
+
+    rows = []
+    for pred in predictions:
+        start = datetime.fromisoformat(pred['timestamp']).timestamp()
+        left = series.index_at(start + 1e-6)
+        deadline = pred.get('deadline')
+        right = (series.index_at(deadline + 1) if deadline is not None else n) - 1
+        if left > right:
+            continue
+        reference = pred.get('initial_price')
+        if reference is None:
+            before = series.index_at(start) - 1
+            reference = series.close[before] if before >= 0 else series.open[left]
+        up = pred['target_price'] >= reference
+        rows.append((pred, left, right, reference, up))
+    if not rows:
+        return []
+
+    if np is not None:
+        left = np.array([r[1] for r in rows], dtype=np.int64)
+        right = np.array([r[2] for r in rows], dtype=np.int64)
+        up = np.array([r[4] for r in rows])
+        target = np.array([r[0]['target_price'] for r in rows], dtype=np.float64)
+        reference = np.array([r[3] for r in rows], dtype=np.float64)
+
+        # Work in "favourable" space: highs for up targets, negated lows for down targets
+        best = np.where(up, highs.query(left, right), -neg_lows.query(left, right))
+        touched = np.where(up, best >= target, best <= target)
+        touch = np.full(len(rows), -1, dtype=np.int64)
+        for mask, index, level in ((touched & up, highs, target), (touched & ~up, neg_lows, -target)):
+            if mask.any():
+                touch[mask] = _first_reach(index, left[mask], right[mask], level[mask])
+
+        end = np.where(touched, touch, right)
+        worst_low = -neg_lows.query(left, end)
+        worst_high = highs.query(left, end)
+        mae = np.where(up, (reference - worst_low) / reference, (worst_high - reference) / reference)
+        mae = np.maximum(mae, 0.0) * 100
+        columns = zip(touched.tolist(), touch.tolist(), best.tolist(), mae.tolist())
+    else:
+        columns = []
+        for pred, left, right, reference, up in rows:
+            target = pred['target_price']
+            if up:
+                best = highs.query(left, right)
+                touched = best >= target
+                touch = _first_reach(highs, left, right, target) if touched else -1
+            else:
+                best = -neg_lows.query(left, right)
+                touched = best <= target
+                touch = _first_reach(neg_lows, left, right, -target) if touched else -1
+            end = touch if touched else right
+            if up:
+                mae = (reference + neg_lows.query(left, end)) / reference
+            else:
+                mae = (highs.query(left, end) - reference) / reference
+            columns.append((touched, touch, best, max(mae, 0.0) * 100))
+
+    complete_until = min(now, series.timestamp[-1])
+    results = []
+    for (pred, left, right, reference, up), (touched, touch, best, mae) in zip(rows, columns):
+        deadline = pred.get('deadline')
+        start = datetime.fromisoformat(pred['timestamp']).timestamp()
+        horizon = (deadline if deadline is not None else series.timestamp[-1]) - start
+        variance = _window_variance(series, cumulative, left, horizon)
+        results.append({
+            'id': pred['id'],
+            'touched': bool(touched),
+            'touch_index': touch if touched else None,
+            'touch_timestamp': series.timestamp[touch] if touched else None,
+            'best_price': best,
+            'mae_pct': mae,
+            'reference': reference,
+            'expired': not touched and deadline is not None and deadline <= complete_until,
+            'touch_probability': touch_probability(reference, pred['target_price'], variance),
+        })
+    return results
+
+def resolution(pred, result):
+    """
+    Status/result/accuracy changes implied by one verification result
+
+    Returns the column updates for prediction_store.update(); while the
+    prediction is still open that is only the running MAE. Resolved
+    predictions also get 'error_pct' (distance from the best price to the
+    target, % of target) and the random-walk 'touch_probability'.
+    """
+    reference = result['reference']
+    target = pred['target_price']
+    target_move = target - reference
+    changes = {'mae_pct': round(result['mae_pct'], 2)}
+    if result['touched'] or result['expired']:
+        changes['touch_probability'] = result['touch_probability']
+
+    if result['touched']:
+        touched_on = datetime.fromtimestamp(result['touch_timestamp']).strftime('%Y-%m-%d')
+        changes.update({
+            'status': 'hit',
+            'first_touch': result['touch_timestamp'],
+            'result': f"Touched ${target:.2f} on {touched_on} (MAE {result['mae_pct']:.1f}%)",
+            'accuracy_score': 100.0,
+            'error_pct': 0.0,
+        })
+    elif result['expired']:
+        changes.update({
+            'status': 'missed',
+            'result': f"Expired; best price ${result['best_price']:.2f} (MAE {result['mae_pct']:.1f}%)",
+            'error_pct': round(abs(result['best_price'] - target) / target * 100, 2),
+        })
+        if target_move != 0:
+            accuracy = (result['best_price'] - reference) / target_move * 100
+            changes['accuracy_score'] = round(accuracy, 1)
+    return changes
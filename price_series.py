@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+PriceSeries - Columnar OHLCV Container
+Epoch-second timestamps and float64 OHLCV in contiguous arrays
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from datetime import datetime
+
+COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+# One row, materialized on demand (timestamp in epoch seconds)
+Bar = namedtuple('Bar', COLUMNS)
+
+class PriceSeries:
+    """
+    OHLCV bars stored column by column
+
+    Each column is a memoryview over an `array` ('q' for timestamps, 'd' for
+    prices and volume). Column access and slicing return views of the same
+    buffers, so `series.close` or `series[-30:]` never copies data; NumPy
+    users can wrap a column with `numpy.asarray(series.close)`, which also
+    accepts the strided columns of a series read from a BarStore.
+
+    Indexing with an int returns a `Bar` namedtuple.
+    """
+
+    __slots__ = COLUMNS + ('symbol',)
+
+    def __init__(self, timestamp, open, high, low, close, volume, symbol=None):
+        self.symbol = symbol
+        self.timestamp = _column(timestamp, 'q')
+        self.open = _column(open, 'd')
+        self.high = _column(high, 'd')
+        self.low = _column(low, 'd')
+        self.close = _column(close, 'd')
+        self.volume = _column(volume, 'd')
+
+        n = len(self.timestamp)
+        if any(len(getattr(self, name)) != n for name in COLUMNS[1:]):
+            raise ValueError("PriceSeries columns must have equal length")
+
+    @classmethod
+    def empty(cls, symbol=None):
+        return cls([], [], [], [], [], [], symbol=symbol)
+
+    @classmethod
+    def from_rows(cls, rows, symbol=None):
+        """Build from an iterable of (timestamp, open, high, low, close, volume)"""
+        columns = (array('q'), array('d'), array('d'), array('d'), array('d'), array('d'))
+        appends = [c.append for c in columns]
+        for row in rows:
+            for append, value in zip(appends, row):
+                append(value)
+        return cls(*columns, symbol=symbol)
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PriceSeries(*(getattr(self, name)[index] for name in COLUMNS), symbol=self.symbol)
+        return Bar(*(getattr(self, name)[index] for name in COLUMNS))
+
+    def __iter__(self):
+        return (Bar(*row) for row in zip(*(getattr(self, name) for name in COLUMNS)))
+
+    def __repr__(self):
+        if not len(self):
+            return f"PriceSeries({self.symbol!r}, empty)"
+        return (f"PriceSeries({self.symbol!r}, {len(self)} bars, "
+                f"{self.datetime(0)} → {self.datetime(-1)})")
+
+    def datetime(self, index):
+        """Timestamp of bar `index` as a local datetime"""
+        return datetime.fromtimestamp(self.timestamp[index])
+
+    def index_at(self, ts):
+        """Index of the first bar at or after epoch second `ts` (binary search)"""
+        return bisect_left(self.timestamp, ts)
+
+    def since(self, ts):
+        """View of all bars at or after epoch second `ts`"""
+        return self[self.index_at(ts):]
+
+    def until(self, ts):
+        """View of all bars strictly before epoch second `ts`"""
+        return self[:self.index_at(ts)]
+
+    def concat(self, other):
+        """New series with `other` appended (copies both)"""
+        columns = []
+        for name in COLUMNS:
+            column = array('q' if name == 'timestamp' else 'd', getattr(self, name))
+            column.extend(getattr(other, name))
+            columns.append(column)
+        return PriceSeries(*columns, symbol=self.symbol or other.symbol)
+
+def _column(values, typecode):
+    """Wrap values as a memoryview of the right type, copying only if needed"""
+    if isinstance(values, memoryview) and values.format == typecode:
+        return values
+    if isinstance(values, array) and values.typecode == typecode:
+        return memoryview(values)
+    return memoryview(array(typecode, values))
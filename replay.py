@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Position Replay
+Step a position through stored OHLCV bars, bar by bar
+
+check_position() only sees the price at the moment it runs; a spike in
+between can blow through the liquidation level unnoticed. The replay
+checks every bar's adverse extreme (the high for a short, the low for a
+long), accrues borrow fees up to each bar, liquidates at the trigger price
+(or the open, if the bar gapped through it) and records the equity curve
+at each close.
+
+The NumPy kernel evaluates all bars as array expressions and stops at the
+first breach; the fallback is a single loop over the typed columns.
+"""
+
+import sys
+import time
+from array import array
+from datetime import datetime
+
+from bar_store import open_store
+from jesse_livermore_game import COMMISSION_RATE, LIQUIDATION_THRESHOLD, MAINTENANCE_MARGIN
+from trade_journal import JOURNAL_FILE, current_position
+
+try:
+    import numpy as np
+except ImportError:  # stdlib-only fallback
+    np = None
+
+def trigger_price(side, shares, entry, cash, fees, liquidation):
+    """Price at which margin level = equity / (shares × price) falls to `liquidation`"""
+    if side < 0:
+        return (cash + entry * shares - fees) / (shares * (liquidation + 1))
+    if liquidation == 1:
+        return float('-inf')
+    return (cash - entry * shares - fees) / (shares * (liquidation - 1))
+
+def _replay_numpy(ts, highs, lows, closes, side, shares, entry, cash, fee_rate, entry_time, liquidation):
+    ts = np.asarray(ts, dtype=np.int64)
+    closes = np.asarray(closes, dtype=np.float64)
+    adverse = np.asarray(highs if side < 0 else lows, dtype=np.float64)
+
+    fees = fee_rate * (ts - entry_time)
+    worst = (cash + side * (adverse - entry) * shares - fees) / (shares * adverse)
+    breach = worst < liquidation
+    end = int(breach.argmax()) if breach.any() else len(ts) - 1
+
+    stop = end + 1
+    equity = cash + side * (closes[:stop] - entry) * shares - fees[:stop]
+    return end, bool(breach[end]), fees[:stop], worst[:stop], equity, closes[:stop] * shares
+
+def _replay_loop(ts, highs, lows, closes, side, shares, entry, cash, fee_rate, entry_time, liquidation):
+    adverse_prices = highs if side < 0 else lows
+    fees_out, worst_out, equity_out, value_out = array('d'), array('d'), array('d'), array('d')
+    end, liquidated = len(ts) - 1, False
+    for i in range(len(ts)):
+        fees = fee_rate * (ts[i] - entry_time)
+        adverse = adverse_prices[i]
+        worst = (cash + side * (adverse - entry) * shares - fees) / (shares * adverse)
+        fees_out.append(fees)
+        worst_out.append(worst)
+        equity_out.append(cash + side * (closes[i] - entry) * shares - fees)
+        value_out.append(closes[i] * shares)
+        if worst < liquidation:
+            end, liquidated = i, True
+            break
+    return end, liquidated, fees_out, worst_out, equity_out, value_out
+
+def _max_drawdown(equity, start):
+    """Largest peak-to-trough fall of the equity curve, as a fraction of the peak"""
+    if np is not None and not isinstance(equity, array):
+        peaks = np.maximum.accumulate(np.concatenate(([start], equity)))[1:]
+        return float(((peaks - equity) / peaks).max()) if len(equity) else 0.0
+    peak, worst = start, 0.0
+    for value in equity:
+        peak = max(peak, value)
+        worst = max(worst, (peak - value) / peak)
+    return worst
+
+def replay(position, series, maintenance=MAINTENANCE_MARGIN, liquidation=LIQUIDATION_THRESHOLD,
+           commission_rate=COMMISSION_RATE):
+    """
+    Replay an open game position (see trade_journal.py) over `series`
+
+    Starts at the first bar at or after the entry and ends at the first
+    bar whose adverse extreme breaches `liquidation` margin (filled at the
+    trigger price, or the open on a gap, less commission) or at the last
+    bar (closed at its close, less commission, for 'final_equity').
+
+    Returns 'timestamp', 'equity' and 'margin_level' (at each close) and
+    'worst_margin' (at each adverse extreme) columns plus 'bars',
+    'liquidated', 'liquidation_timestamp', 'liquidation_price',
+    'days_to_liquidation', 'margin_call_bars' (worst margin below
+    `maintenance`), 'first_margin_call', 'borrow_fees', 'commissions',
+    'final_equity' and 'max_drawdown'.
+    """
+    side = 1 if position.get("side") == "long" else -1
+    shares = position["shares"]
+    entry = position["entry_price"]
+    cash = position["cash"]
+    entry_time = datetime.fromisoformat(position["entry_date"]).timestamp()
+    fee_rate = shares * entry * position.get("borrow_rate", 0.0) / 365 / 86400
+
+    bars = series.since(entry_time)
+    result = {
+        'bars': len(bars), 'liquidated': False, 'liquidation_timestamp': None, 'liquidation_price': None,
+        'days_to_liquidation': None, 'margin_call_bars': 0, 'first_margin_call': None,
+        'borrow_fees': 0.0, 'commissions': position.get("open_commission", 0.0),
+        'final_equity': cash, 'max_drawdown': 0.0,
+        'timestamp': bars.timestamp, 'equity': [], 'margin_level': [], 'worst_margin': [],
+    }
+    if not len(bars):
+        return result
+
+    kernel = _replay_numpy if np is not None else _replay_loop
+    end, liquidated, fees, worst, equity, value = kernel(
+        bars.timestamp, bars.high, bars.low, bars.close, side, shares, entry, cash, fee_rate, entry_time, liquidation
+    )
+
+    if np is not None:
+        margin = equity / value
+        calls = np.flatnonzero(worst < maintenance)
+        margin_calls, first_call = len(calls), (int(calls[0]) if len(calls) else None)
+    else:
+        margin = array('d', (e / v for e, v in zip(equity, value)))
+        calls = [i for i, w in enumerate(worst) if w < maintenance]
+        margin_calls, first_call = len(calls), (calls[0] if calls else None)
+
+    if liquidated:
+        trigger = trigger_price(side, shares, entry, cash, fees[end], liquidation)
+        # Gapped through the trigger: filled at the open; never beyond the bar's range
+        if side < 0:
+            price = max(min(trigger, bars.high[end]), bars.open[end])
+        else:
+            price = min(max(trigger, bars.low[end]), bars.open[end])
+        exit_equity = cash + side * (price - entry) * shares - fees[end]
+        equity[end] = exit_equity
+        margin[end] = exit_equity / (shares * price)
+        result.update(liquidation_timestamp=bars.timestamp[end], liquidation_price=price,
+                      days_to_liquidation=(bars.timestamp[end] - entry_time) / 86400)
+    else:
+        price = bars.close[end]
+
+    close_commission = shares * price * commission_rate
+    result.update(
+        bars=end + 1,
+        liquidated=liquidated,
+        margin_call_bars=margin_calls,
+        first_margin_call=bars.timestamp[first_call] if first_call is not None else None,
+        borrow_fees=float(fees[end]),
+        commissions=result['commissions'] + close_commission,
+        final_equity=float(equity[end]) - close_commission,
+        max_drawdown=_max_drawdown(equity, cash),
+        timestamp=bars.timestamp[:end + 1],
+        equity=equity,
+        margin_level=margin,
+        worst_margin=worst,
+    )
+    return result
+
+def benchmark(bars=5_000_000):
+    """Bars per second for a random-walk replay that never liquidates"""
+    import random
+    from price_series import PriceSeries
+    rng = random.Random(0)
+    price, rows = 30.0, []
+    t0 = int(time.time()) - bars * 60
+    for i in range(bars):
+        price *= 1 + rng.gauss(0, 0.0005)
+        rows.append((t0 + i * 60, price, price * 1.001, price * 0.999, price, 0.0))
+    series = PriceSeries.from_rows(rows, "SIM")
+    position = {"shares": 1, "entry_price": 30.0, "cash": 1e9, "open_commission": 0.0,
+                "entry_date": datetime.fromtimestamp(t0).isoformat(), "borrow_rate": 0.08}
+    start = time.perf_counter()
+    replay(position, series)
+    return bars / (time.perf_counter() - start)
+
+def print_replay(result):
+    """Summary of a replay"""
+    if not result['bars']:
+        print("\n📝 No stored bars since the position was opened")
+        return
+    first, last = result['timestamp'][0], result['timestamp'][-1]
+    print(f"\n✓ Replayed {result['bars']:,} bars: {datetime.fromtimestamp(first):%Y-%m-%d %H:%M} → "
+          f"{datetime.fromtimestamp(last):%Y-%m-%d %H:%M}")
+    if result['liquidated']:
+        print(f"\n🚨 LIQUIDATED {datetime.fromtimestamp(result['liquidation_timestamp']):%Y-%m-%d %H:%M} "
+              f"at ฿{result['liquidation_price']:.2f} after {result['days_to_liquidation']:.1f} days")
+    elif result['margin_call_bars']:
+        print(f"\n⚠️  {result['margin_call_bars']} bars below maintenance margin, first on "
+              f"{datetime.fromtimestamp(result['first_margin_call']):%Y-%m-%d %H:%M}")
+    else:
+        print("\n✅ Never touched maintenance margin")
+    print(f"\n💰 Borrow Fees: -฿{result['borrow_fees']:,.2f}")
+    print(f"   Commissions: -฿{result['commissions']:,.2f}")
+    print(f"   Final Equity (after closing): ฿{result['final_equity']:,.2f}")
+    print(f"   Max Drawdown: {result['max_drawdown'] * 100:.1f}%")
+    print(f"   Lowest Margin Level: {min(result['worst_margin']) * 100:.1f}%")
+
+def main():
+    if '--benchmark' in sys.argv:
+        rate = benchmark()
+        print(f"✓ {rate / 1e6:.1f} million bars/second ({'NumPy' if np is not None else 'stdlib'})")
+        return
+
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    interval = args[0] if args else "1d"
+    position = current_position("BMNR")
+    if not position:
+        print(f"✗ No open position in {JOURNAL_FILE}")
+        return
+
+    print("=" * 70)
+    print(f"📼 POSITION REPLAY: BMNR @ {interval}")
+    print("=" * 70)
+    print_replay(replay(position, open_store("BMNR", interval).read()))
+    print("\n" + "=" * 70)
+
+if __name__ == "__main__":
+    main()
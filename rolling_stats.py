@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Rolling Statistics Engine
+Bar-by-bar dashboard statistics in constant time per update
+"""
+
+import json
+import math
+import os
+from collections import deque
+from datetime import datetime
+
+ROLLING_STATS_FILE = "data/rolling_stats.json"
+
+# Rebuild the running variance from the window this often to cancel drift
+RECOMPUTE_EVERY = 10_000
+
+class RollingStats:
+    """
+    Streaming version of calculate_statistics
+
+    Keeps rolling log-return volatility over the last `window` returns
+    (Welford add/remove), the high/low over the last `extreme_window` bars
+    (monotonic deques), the last change and cumulative volume. Every
+    `update()` is amortized O(1).
+
+    Feeding a bar with the same timestamp as the previous one revises that
+    bar (e.g. the still-forming daily bar) by undoing its contribution first.
+    """
+
+    def __init__(self, window=20, extreme_window=5, periods_per_year=252):
+        self.window = window
+        self.extreme_window = extreme_window
+        self.periods_per_year = periods_per_year
+
+        self.returns = deque()
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+        self.highs = deque()  # (bar index, high), highs decreasing
+        self.lows = deque()   # (bar index, low), lows increasing
+
+        self.bars = 0
+        self.last_timestamp = None
+        self.last_close = None
+        self.previous_close = None
+        self.last_volume = 0.0
+        self.cumulative_volume = 0.0
+        self._since_recompute = 0
+        self._undo = None
+
+    # Welford add/remove on the returns window
+
+    def _add_return(self, r):
+        self.count += 1
+        delta = r - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (r - self.mean)
+
+    def _remove_return(self, r):
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        old_mean = self.mean
+        self.count -= 1
+        self.mean = (old_mean * (self.count + 1) - r) / self.count
+        self.m2 = max(0.0, self.m2 - (r - old_mean) * (r - self.mean))
+
+    def _recompute(self):
+        self.count, self.mean, self.m2 = 0, 0.0, 0.0
+        for r in self.returns:
+            self._add_return(r)
+        self._since_recompute = 0
+
+    @staticmethod
+    def _push_extreme(extremes, index, value, beats, window):
+        """Push onto a monotonic deque; returns what was evicted (for undo)"""
+        popped = []
+        while extremes and not beats(extremes[-1][1], value):
+            popped.append(extremes.pop())
+        extremes.append((index, value))
+        expired = extremes.popleft() if extremes[0][0] <= index - window else None
+        return popped, expired
+
+    def update(self, bar):
+        """Feed one bar: (timestamp, open, high, low, close, volume) or a Bar"""
+        timestamp, _, high, low, close, volume = bar
+
+        if self.last_timestamp is not None and timestamp == self.last_timestamp and self._undo:
+            self._revert()
+
+        undo = {
+            'state': (self.count, self.mean, self.m2, self.bars, self.last_timestamp,
+                      self.last_close, self.previous_close, self.last_volume,
+                      self.cumulative_volume, self._since_recompute),
+            'return': None, 'expired_return': None,
+        }
+
+        if self.last_close is not None:
+            r = math.log(close / self.last_close)
+            self.returns.append(r)
+            self._add_return(r)
+            undo['return'] = r
+            if len(self.returns) > self.window:
+                old = self.returns.popleft()
+                self._remove_return(old)
+                undo['expired_return'] = old
+            self._since_recompute += 1
+            if self._since_recompute >= RECOMPUTE_EVERY:
+                self._recompute()
+
+        index = self.bars
+        undo['highs'] = self._push_extreme(self.highs, index, high, lambda kept, new: kept > new, self.extreme_window)
+        undo['lows'] = self._push_extreme(self.lows, index, low, lambda kept, new: kept < new, self.extreme_window)
+
+        self.bars += 1
+        self.previous_close = self.last_close
+        self.last_close = close
+        self.last_timestamp = timestamp
+        self.last_volume = volume
+        self.cumulative_volume += volume
+        self._undo = undo
+
+    def _revert(self):
+        """Undo the most recent update()"""
+        undo, self._undo = self._undo, None
+
+        for extremes, (popped, expired) in ((self.highs, undo['highs']), (self.lows, undo['lows'])):
+            extremes.pop()
+            extremes.extend(reversed(popped))
+            if expired is not None:
+                extremes.appendleft(expired)
+
+        if undo['return'] is not None:
+            self.returns.pop()
+            if undo['expired_return'] is not None:
+                self.returns.appendleft(undo['expired_return'])
+
+        (self.count, self.mean, self.m2, self.bars, self.last_timestamp,
+         self.last_close, self.previous_close, self.last_volume,
+         self.cumulative_volume, self._since_recompute) = undo['state']
+
+    def update_many(self, bars):
+        for bar in bars:
+            self.update(bar)
+        return self
+
+    def volatility(self):
+        """Annualized volatility of the window's log returns, in percent"""
+        if self.count == 0:
+            return 0.0
+        return math.sqrt(self.m2 / self.count) * math.sqrt(self.periods_per_year) * 100
+
+    def stats(self):
+        """Current values with the same keys as calculate_statistics"""
+        if self.last_close is None:
+            return {}
+        previous = self.previous_close if self.previous_close is not None else self.last_close
+        change = self.last_close - previous
+        return {
+            'current_price': round(self.last_close, 2),
+            'previous_price': round(previous, 2),
+            'price_change': round(change, 2),
+            'price_change_pct': round(change / previous * 100, 2),
+            'daily_high': round(self.highs[0][1], 2),
+            'daily_low': round(self.lows[0][1], 2),
+            'volume': int(self.last_volume),
+            'volatility': round(self.volatility(), 2),
+            'last_update': datetime.fromtimestamp(self.last_timestamp).strftime('%Y-%m-%d %H:%M:%S UTC')
+        }
+
+    def snapshot(self):
+        """JSON-serializable state (including the undo record for the last bar)"""
+        return {
+            'window': self.window,
+            'extreme_window': self.extreme_window,
+            'periods_per_year': self.periods_per_year,
+            'returns': list(self.returns),
+            'welford': [self.count, self.mean, self.m2],
+            'highs': list(self.highs),
+            'lows': list(self.lows),
+            'bars': self.bars,
+            'last_timestamp': self.last_timestamp,
+            'last_close': self.last_close,
+            'previous_close': self.previous_close,
+            'last_volume': self.last_volume,
+            'cumulative_volume': self.cumulative_volume,
+            'since_recompute': self._since_recompute,
+            'undo': self._undo,
+        }
+
+    @classmethod
+    def restore(cls, state):
+        engine = cls(state['window'], state['extreme_window'], state['periods_per_year'])
+        engine.returns = deque(state['returns'])
+        engine.count, engine.mean, engine.m2 = state['welford']
+        engine.highs = deque(tuple(x) for x in state['highs'])
+        engine.lows = deque(tuple(x) for x in state['lows'])
+        engine.bars = state['bars']
+        engine.last_timestamp = state['last_timestamp']
+        engine.last_close = state['last_close']
+        engine.previous_close = state['previous_close']
+        engine.last_volume = state['last_volume']
+        engine.cumulative_volume = state['cumulative_volume']
+        engine._since_recompute = state['since_recompute']
+
+        undo = state.get('undo')
+        if undo:
+            undo['state'] = tuple(undo['state'])
+            for side in ('highs', 'lows'):
+                popped, expired = undo[side]
+                undo[side] = ([tuple(x) for x in popped], tuple(expired) if expired else None)
+        engine._undo = undo
+        return engine
+
+    def save(self, path=ROLLING_STATS_FILE):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=ROLLING_STATS_FILE):
+        """Restore a saved engine, or None if there is no snapshot"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                return cls.restore(json.load(f))
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def catch_up(self, series):
+        """
+        Feed the bars of `series` not yet seen
+
+        The last seen bar is fed again (as a revision) if it is still in
+        `series`; if upstream replaced it with a differently-stamped bar, it
+        is undone and its replacement fed instead.
+        """
+        if self.last_timestamp is not None:
+            i = series.index_at(self.last_timestamp)
+            if i >= len(series) or series.timestamp[i] != self.last_timestamp:
+                if self._undo:
+                    self._revert()
+                if self.last_timestamp is not None:
+                    i = series.index_at(self.last_timestamp + 1)
+            series = series[i:]
+        return self.update_many(series)
+
+def load_current_stats(path=ROLLING_STATS_FILE):
+    """Latest dashboard statistics from the saved engine (no network, no history scan)"""
+    engine = RollingStats.load(path)
+    return engine.stats() if engine else {}
@@ -4,24 +4,35 @@ BitMine Immersion - Complete Analysis Suite
 Runs all analysis tools in sequence
 """
 
-import subprocess
+import runpy
 import sys
 from datetime import datetime
 
-def run_command(cmd, description):
-    """Run a command and display results"""
+def run_command(script, description):
+    """
+    Run an analysis script and display results
+
+    Scripts run in this interpreter rather than a subprocess so they share
+    the Yahoo chart client's connection pool and per-run fetch cache.
+    """
     print("\n" + "=" * 80)
     print(f"▶️  {description}")
     print("=" * 80)
     
+    saved_argv = sys.argv
+    sys.argv = [script]
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=False, text=True)
-        if result.returncode != 0:
+        runpy.run_path(script, run_name="__main__")
+        return True
+    except SystemExit as e:
+        if e.code not in (None, 0):
             print(f"⚠️  Warning: {description} returned non-zero exit code")
-        return result.returncode == 0
+        return e.code in (None, 0)
     except Exception as e:
         print(f"❌ Error running {description}: {e}")
         return False
+    finally:
+        sys.argv = saved_argv
 
 def main():
     print("╔" + "=" * 78 + "╗")
@@ -33,25 +44,31 @@ def main():
     
     # 1. Fetch data and generate tracker
     results['tracker'] = run_command(
-        'python3 fetch_and_generate.py',
+        'fetch_and_generate.py',
         'Stock Data Tracker'
     )
     
     # 2. ETH correlation
     results['eth'] = run_command(
-        'python3 eth_correlation.py',
+        'eth_correlation.py',
         'ETH Correlation Analysis'
     )
     
-    # 3. Fibonacci calculator
+    # 3. Cross-asset correlation matrix
+    results['correlations'] = run_command(
+        'correlation_matrix.py',
+        'Cross-Asset Correlation Matrix'
+    )
+    
+    # 4. Fibonacci calculator
     results['fibonacci'] = run_command(
-        'python3 fibonacci_calculator.py',
+        'fibonacci_calculator.py',
         'Fibonacci Retracement Calculator'
     )
     
-    # 4. Prediction tracker status
+    # 5. Prediction tracker status
     results['predictions'] = run_command(
-        'python3 prediction_tracker.py',
+        'prediction_tracker.py',
         'Prediction Tracker Status'
     )
     
@@ -73,6 +90,7 @@ def main():
     print("   • docs/index.html         - Interactive dashboard")
     print("   • data/bmnr_data.csv      - Historical price data")
     print("   • data/predictions.json   - Tracked predictions")
+    print("   • data/correlation_matrix.csv - Cross-asset correlations")
     
     print("\n💡 Next Steps:")
     print("   • Open docs/index.html in your browser")
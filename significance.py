@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Correlation Significance Testing
+Permutation tests, stationary block bootstrap and Fisher-z intervals
+
+Resamples run in vectorized batches (NumPy when installed) spread across a
+process pool. Each batch draws from its own seed derived from (seed, batch
+number), so results with a fixed seed do not depend on the worker count.
+"""
+
+import math
+import os
+import random
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+try:
+    import numpy as np
+except ImportError:  # stdlib-only fallback
+    np = None
+
+DEFAULT_RESAMPLES = 10_000
+BATCH_SIZE = 2_000
+# Below this many resample-observations a pool costs more than it saves
+POOL_THRESHOLD = 2_000_000
+
+def pearson(x, y):
+    n = len(x)
+    mean_x = sum(x) / n
+    mean_y = sum(y) / n
+    sxy = sum((a - mean_x) * (b - mean_y) for a, b in zip(x, y))
+    sxx = sum((a - mean_x) ** 2 for a in x)
+    syy = sum((b - mean_y) ** 2 for b in y)
+    if sxx == 0 or syy == 0:
+        return None
+    return sxy / math.sqrt(sxx * syy)
+
+def fisher_ci(r, n, confidence=0.95):
+    """Fisher z-transform confidence interval for a Pearson r"""
+    if n <= 3 or r is None:
+        return None
+    z = math.atanh(max(min(r, 0.999999), -0.999999))
+    half = NormalDist().inv_cdf(0.5 + confidence / 2) / math.sqrt(n - 3)
+    return math.tanh(z - half), math.tanh(z + half)
+
+def _row_correlations(xs, ys):
+    """Pearson r for each row pair of two (batch, n) arrays"""
+    xs = xs - xs.mean(axis=1, keepdims=True)
+    ys = ys - ys.mean(axis=1, keepdims=True)
+    denom = np.sqrt((xs * xs).sum(axis=1) * (ys * ys).sum(axis=1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denom > 0, (xs * ys).sum(axis=1) / denom, 0.0)
+
+def _stationary_indices(n, mean_block, rng_random, rng_start):
+    """One stationary-bootstrap index path (geometric block lengths, wrap-around)"""
+    p = 1.0 / mean_block
+    indices = []
+    i = rng_start(n)
+    for t in range(n):
+        if t and rng_random() < p:
+            i = rng_start(n)
+        indices.append(i)
+        i = (i + 1) % n
+    return indices
+
+def _run_batch(task):
+    """
+    One batch of resampled correlations
+
+    Top-level so it can be shipped to pool workers.
+    """
+    kind, x, y, size, seed, mean_block = task
+    n = len(x)
+
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        x_arr = np.asarray(x, dtype=np.float64)
+        y_arr = np.asarray(y, dtype=np.float64)
+
+        if kind == 'permutation':
+            dx = x_arr - x_arr.mean()
+            dy = y_arr - y_arr.mean()
+            norm = math.sqrt(float(dx @ dx) * float(dy @ dy))
+            shuffled = rng.permuted(np.broadcast_to(dy, (size, n)), axis=1)
+            return (shuffled @ dx / norm).tolist()
+
+        # Stationary bootstrap: a new block starts with probability 1/mean_block
+        positions = np.arange(n)
+        new_block = rng.random((size, n)) < 1.0 / mean_block
+        new_block[:, 0] = True
+        starts = rng.integers(0, n, (size, n))
+        block_begin = np.maximum.accumulate(np.where(new_block, positions, 0), axis=1)
+        rows = np.arange(size)[:, None]
+        idx = (starts[rows, block_begin] + positions - block_begin) % n
+        return _row_correlations(x_arr[idx], y_arr[idx]).tolist()
+
+    rng = random.Random(repr(seed))
+    out = []
+    if kind == 'permutation':
+        mean_x = sum(x) / n
+        mean_y = sum(y) / n
+        dx = [v - mean_x for v in x]
+        dy = [v - mean_y for v in y]
+        norm = math.sqrt(sum(v * v for v in dx) * sum(v * v for v in dy))
+        for _ in range(size):
+            rng.shuffle(dy)
+            out.append(sum(a * b for a, b in zip(dx, dy)) / norm)
+        return out
+
+    for _ in range(size):
+        idx = _stationary_indices(n, mean_block, rng.random, rng.randrange)
+        r = pearson([x[i] for i in idx], [y[i] for i in idx])
+        out.append(r if r is not None else 0.0)
+    return out
+
+def _resample(kind, x, y, resamples, seed=None, workers=None, mean_block=None):
+    """Run `resamples` draws in batches, in a process pool when worthwhile"""
+    base = seed if seed is not None else secrets.randbits(63)
+    tasks = []
+    remaining = resamples
+    batch = 0
+    while remaining > 0:
+        size = min(BATCH_SIZE, remaining)
+        tasks.append((kind, list(x), list(y), size, (base, batch), mean_block))
+        remaining -= size
+        batch += 1
+
+    if workers is None:
+        workers = (os.cpu_count() or 1) if resamples * len(x) >= POOL_THRESHOLD else 1
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            chunks = list(pool.map(_run_batch, tasks))
+    else:
+        chunks = [_run_batch(task) for task in tasks]
+
+    return [r for chunk in chunks for r in chunk]
+
+def permutation_test(x, y, resamples=DEFAULT_RESAMPLES, seed=None, workers=None):
+    """
+    Two-sided permutation p-value for the Pearson correlation of x and y
+
+    Shuffling y destroys any pairing with x; the p-value is the share of
+    shuffles with |r| at least as large as observed (with the +1
+    correction so it is never exactly zero).
+    """
+    observed = pearson(x, y)
+    if observed is None:
+        return None
+    draws = _resample('permutation', x, y, resamples, seed, workers)
+    extreme = sum(1 for r in draws if abs(r) >= abs(observed) - 1e-12)
+    return (extreme + 1) / (len(draws) + 1)
+
+def block_bootstrap_ci(x, y, resamples=DEFAULT_RESAMPLES, confidence=0.95,
+                       mean_block=None, seed=None, workers=None):
+    """
+    Stationary block bootstrap percentile interval for the correlation
+
+    Resampling blocks of consecutive (x, y) pairs keeps the short-range
+    autocorrelation of returns that an i.i.d. bootstrap would destroy.
+    Mean block length defaults to n^(1/3).
+    """
+    n = len(x)
+    if n < 4:
+        return None
+    mean_block = mean_block or max(1.0, n ** (1 / 3))
+    draws = sorted(_resample('bootstrap', x, y, resamples, seed, workers, mean_block))
+    tail = (1 - confidence) / 2
+    lo = draws[int(tail * (len(draws) - 1))]
+    hi = draws[int(math.ceil((1 - tail) * (len(draws) - 1)))]
+    return lo, hi
+
+def correlation_significance(x, y, resamples=DEFAULT_RESAMPLES, seed=None, workers=None):
+    """r, permutation p-value, block-bootstrap CI and Fisher-z CI in one dict"""
+    r = pearson(x, y)
+    n = len(x)
+    return {
+        'r': r,
+        'n': n,
+        'p_value': permutation_test(x, y, resamples, seed, workers),
+        'bootstrap_ci': block_bootstrap_ci(x, y, resamples, seed=seed, workers=workers),
+        'fisher_ci': fisher_ci(r, n),
+        'resamples': resamples,
+    }
+
+def format_p(p):
+    if p is None:
+        return "p = n/a"
+    if p < 0.001:
+        return "p < 0.001"
+    return f"p = {p:.3f}"
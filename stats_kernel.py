@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Statistics Kernel
+Single-pass summary statistics over PriceSeries columns
+
+NumPy is used when installed; otherwise a pure-Python Welford loop computes
+the same figures in one pass over the closes.
+"""
+
+import math
+
+try:
+    import numpy as np
+except ImportError:  # stdlib-only fallback
+    np = None
+
+def summarize(series, periods_per_year=252, tail=5):
+    """
+    Unrounded statistics for a PriceSeries
+
+    Returns latest/previous close, change and percent change, high/low over
+    the last `tail` bars, latest volume, annualized log-return volatility
+    (population variance, in percent) and the number of returns used.
+    """
+    n = len(series)
+    if n == 0:
+        return {}
+
+    if np is not None:
+        volatility, count = _volatility_numpy(series.close)
+        recent_high = float(np.max(np.asarray(series.high[-tail:])))
+        recent_low = float(np.min(np.asarray(series.low[-tail:])))
+    else:
+        volatility, count = _volatility_welford(series.close)
+        recent_high = max(series.high[-tail:])
+        recent_low = min(series.low[-tail:])
+
+    latest = series.close[-1]
+    previous = series.close[-2] if n > 1 else latest
+    change = latest - previous
+
+    return {
+        'latest_close': latest,
+        'previous_close': previous,
+        'change': change,
+        'change_pct': change / previous * 100,
+        'recent_high': recent_high,
+        'recent_low': recent_low,
+        'volume': series.volume[-1],
+        'volatility': volatility * math.sqrt(periods_per_year) * 100,
+        'returns': count,
+    }
+
+def _volatility_numpy(closes):
+    """Population std of log returns, vectorized (no copy of the closes)"""
+    c = np.asarray(closes, dtype=np.float64)
+    if len(c) < 2:
+        return 0.0, 0
+    returns = np.log(c[1:] / c[:-1])
+    return float(np.sqrt(returns.var())), len(returns)
+
+def _volatility_welford(closes):
+    """Population std of log returns in one pass (Welford's algorithm)"""
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    log = math.log
+
+    it = iter(closes)
+    prev = next(it, None)
+    for close in it:
+        r = log(close / prev)
+        prev = close
+        count += 1
+        delta = r - mean
+        mean += delta / count
+        m2 += delta * (r - mean)
+
+    if count == 0:
+        return 0.0, 0
+    return math.sqrt(m2 / count), count
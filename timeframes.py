@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Timeframe Parser
+Turn free-text prediction timeframes into absolute deadlines
+
+Handles durations ("2 weeks", "a couple of months") and ranges of them,
+which resolve to the far end ("2-4 weeks", "6 months to a year", "a month
+or two"), period ends ("end of Q1", "H1 2026", "EOY", "by end of month",
+"this week", "next quarter", "year end 2026"), months and dates ("by
+March", "March 15", "2026-03-15", "3/15") and "today"/"tomorrow".
+Returns None for anything open-ended ("long term", "eventually").
+"""
+
+import calendar
+import re
+import sys
+from datetime import datetime, timedelta
+
+NUMBER_WORDS = {
+    'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+    'couple': 2, 'few': 3, 'several': 3,
+}
+
+UNITS = {
+    'h': 'hours', 'hr': 'hours', 'hrs': 'hours', 'hour': 'hours', 'hours': 'hours',
+    'd': 'days', 'day': 'days', 'days': 'days',
+    'w': 'weeks', 'wk': 'weeks', 'wks': 'weeks', 'week': 'weeks', 'weeks': 'weeks',
+    'mo': 'months', 'mos': 'months', 'month': 'months', 'months': 'months',
+    'q': 'quarters', 'quarter': 'quarters', 'quarters': 'quarters',
+    'y': 'years', 'yr': 'years', 'yrs': 'years', 'year': 'years', 'years': 'years',
+}
+
+MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+MONTHS['sept'] = 9
+
+_NUMBER = r'(\d+(?:\.\d+)?|' + '|'.join(NUMBER_WORDS) + r')'
+_UNIT_NAMES = '|'.join(UNITS)
+_UNIT = r'\s*(?:of\s+)?(' + _UNIT_NAMES + r')\b'
+_RANGE = r'\s*(?:-|–|to|or)\s*'
+# "2-4 weeks" (one unit), "6 months to a year" (a unit on each end), "a month or two" (second unit implied)
+_DURATION = re.compile(r'\b' + _NUMBER + r'(?:' + _RANGE + _NUMBER + r')?' + _UNIT)
+_DURATION_RANGE = re.compile(r'\b' + _NUMBER + _UNIT + _RANGE + _NUMBER + _UNIT)
+_DURATION_OR = re.compile(
+    r'\b' + _NUMBER + _UNIT + r'\s+or\s+' + _NUMBER + r'\b(?!\s*(?:of\s+)?(?:' + _UNIT_NAMES + r')\b)'
+)
+MAX_IMPLIED_UNIT = 12  # "a month or two" yes, "2 weeks or 50" (a price) no
+_QUARTER = re.compile(r'\bq([1-4])(?:\s*[\'’]?(\d{2}|\d{4}))?\b')
+_HALF = re.compile(r'\b(?:h([12])|(first|1st|second|2nd)\s+half)(?:\s+of)?(?:\s*[\'’]?(\d{2}|\d{4}))?\b')
+_ISO_DATE = re.compile(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b')
+_US_DATE = re.compile(r'\b(\d{1,2})/(\d{1,2})(?:/(\d{2}|\d{4}))?\b')
+_MONTH_DATE = re.compile(
+    r'\b(' + '|'.join(sorted(MONTHS, key=len, reverse=True)) + r')\.?(?:\s+(\d{1,2})(?:st|nd|rd|th)?)?(?:,?\s+(\d{4}))?\b'
+)
+_YEAR = re.compile(r'\b(20\d{2})\b')
+
+def _number(text):
+    return NUMBER_WORDS[text] if text in NUMBER_WORDS else float(text)
+
+def _year(text):
+    year = int(text)
+    return year + 2000 if year < 100 else year
+
+def _end_of_day(day):
+    return datetime(day.year, day.month, day.day, 23, 59, 59)
+
+def _end_of_month(year, month):
+    return _end_of_day(datetime(year, month, calendar.monthrange(year, month)[1]))
+
+def add_months(start, months):
+    """`start` shifted by whole months, clamping the day (Jan 31 + 1 month → Feb 28/29)"""
+    index = start.month - 1 + months
+    year, month = start.year + index // 12, index % 12 + 1
+    return start.replace(year=year, month=month, day=min(start.day, calendar.monthrange(year, month)[1]))
+
+def _add(start, amount, unit):
+    if unit in ('hours', 'days', 'weeks'):
+        return start + timedelta(**{unit: amount})
+    months = amount * {'months': 1, 'quarters': 3, 'years': 12}[unit]
+    whole = int(months)
+    shifted = add_months(start, whole)
+    return shifted + timedelta(days=(months - whole) * 30.44)
+
+def _period_end(start, period, offset=0):
+    """End of the day/week (Friday)/month/quarter/year containing `start`, `offset` periods later"""
+    if period == 'day':
+        return _end_of_day(start + timedelta(days=offset))
+    if period == 'week':
+        return _end_of_day(start + timedelta(days=(4 - start.weekday()) % 7 + 7 * offset))
+    if period == 'year':
+        return _end_of_month(start.year + offset, 12)
+    months = 3 if period == 'quarter' else 1
+    last = add_months(start.replace(day=1), (start.month - 1) // months * months + months - start.month
+                      + months * offset)
+    return _end_of_month(last.year, last.month)
+
+def _next_occurrence(start, build):
+    """build(year) for this year, or next year if that is already past"""
+    deadline = build(start.year)
+    return deadline if deadline >= start else build(start.year + 1)
+
+def parse_timeframe(text, start=None):
+    """
+    Absolute deadline (datetime) for a free-text timeframe, or None
+
+    `start` is when the prediction was made (default: now). Ranges resolve
+    to their far end; calendar deadlines resolve to the end of that day.
+    """
+    if not text:
+        return None
+    try:
+        return _parse(text.lower().strip(), start or datetime.now())
+    except ValueError:  # e.g. "13/45"
+        return None
+
+def _parse(t, start):
+    if 'tomorrow' in t:
+        return _end_of_day(start + timedelta(days=1))
+    if 'today' in t or 'eod' in t or 'end of day' in t:
+        return _end_of_day(start)
+
+    match = _ISO_DATE.search(t)
+    if match:
+        return _end_of_day(datetime(*(int(g) for g in match.groups())))
+
+    match = _US_DATE.search(t)
+    if match:
+        month, day, year = match.groups()
+        if year:
+            return _end_of_day(datetime(_year(year), int(month), int(day)))
+        return _next_occurrence(start, lambda y: _end_of_day(datetime(y, int(month), int(day))))
+
+    match = _QUARTER.search(t)
+    if match:
+        quarter, year = int(match.group(1)), match.group(2)
+        last_month = quarter * 3
+        if year:
+            return _end_of_month(_year(year), last_month)
+        return _next_occurrence(start, lambda y: _end_of_month(y, last_month))
+
+    match = _HALF.search(t)
+    if match:
+        first = match.group(1) == '1' or match.group(2) in ('first', '1st')
+        last_month, year = 6 if first else 12, match.group(3)
+        if year:
+            return _end_of_month(_year(year), last_month)
+        return _next_occurrence(start, lambda y: _end_of_month(y, last_month))
+
+    explicit_year = _YEAR.search(t)
+    for period, patterns in (
+        ('week', ('end of week', 'end of the week', 'eow', 'week end', 'week-end')),
+        ('month', ('end of month', 'end of the month', 'eom', 'month end', 'month-end')),
+        ('quarter', ('end of quarter', 'end of the quarter', 'eoq', 'quarter end', 'quarter-end')),
+        ('year', ('end of year', 'end of the year', 'eoy', 'year end', 'year-end')),
+    ):
+        if any(p in t for p in patterns):
+            if period == 'year' and explicit_year:
+                return _end_of_month(int(explicit_year.group(1)), 12)
+            return _period_end(start, period)
+
+    match = re.search(r'\b(this|next)\s+(day|week|month|quarter|year)\b', t)
+    if match:
+        return _period_end(start, match.group(2), 1 if match.group(1) == 'next' else 0)
+
+    match = _MONTH_DATE.search(t)
+    # "may" is also a verb: only trust it next to a day, a year or "by/in/end of"
+    if match and (match.group(1) != 'may' or match.group(2) or match.group(3)
+                  or re.search(r'\b(by|in|end of|before|until)\s+may\b', t)):
+        month = MONTHS[match.group(1)]
+        day, year = match.group(2), match.group(3)
+        def build(y):
+            if day:
+                return _end_of_day(datetime(y, month, min(int(day), calendar.monthrange(y, month)[1])))
+            return _end_of_month(y, month)
+        return build(int(year)) if year else _next_occurrence(start, build)
+
+    match = _DURATION_RANGE.search(t)
+    if match:
+        low, low_unit, high, high_unit = match.groups()
+        return max(_add(start, _number(low), UNITS[low_unit]), _add(start, _number(high), UNITS[high_unit]))
+
+    match = _DURATION_OR.search(t)
+    if match and _number(match.group(1)) < _number(match.group(3)) <= MAX_IMPLIED_UNIT:
+        low, unit, high = match.groups()
+        return _add(start, _number(high), UNITS[unit])
+
+    match = _DURATION.search(t)
+    if match:
+        low, high, unit = match.groups()
+        return _add(start, max(_number(low), _number(high)) if high else _number(low), UNITS[unit])
+
+    if explicit_year:
+        return _end_of_month(int(explicit_year.group(1)), 12)
+    return None
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 timeframes.py '<timeframe>' [start YYYY-MM-DD]")
+        return
+    start = datetime.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else datetime.now()
+    deadline = parse_timeframe(sys.argv[1], start)
+    if deadline is None:
+        print(f"✗ No deadline in '{sys.argv[1]}'")
+    else:
+        print(f"✓ '{sys.argv[1]}' → {deadline:%Y-%m-%d %H:%M} ({(deadline - start).days} days)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Trade Journal
+Append-only, event-sourced record of every position the game opens
+
+Events are JSON Lines in data/trade_journal.jsonl, one per line with a
+sequence number, an ISO time, a type and a trade id (the sequence number
+of the trade's open event):
+
+    open         trade created: symbol, side, initial capital, borrow rate
+    fill         shares executed at a price, less commission
+    fee_accrual  borrow fees accrued since the previous accrual
+    close        closed at a price, less commission
+    liquidate    force-closed by The House
+
+The current state (open positions plus a summary and the byte offsets of
+every trade's events, which is the query index) is a fold over the events.
+Every SNAPSHOT_EVERY events the state is written to a snapshot together
+with the journal offset it covers, so opening the journal only replays
+the events after it.
+"""
+
+import glob
+import json
+import os
+import sys
+from datetime import datetime
+
+JOURNAL_FILE = "data/trade_journal.jsonl"
+SNAPSHOT_FILE = "data/trade_journal_snapshot.json"
+SNAPSHOT_EVERY = 100
+SNAPSHOT_VERSION = 1
+
+# Before the journal: the open position, rewritten in full, and one archive per closed trade
+LEGACY_POSITION_FILE = "data/trading_position.json"
+LEGACY_ARCHIVES = ("data/closed_position_*.json", "data/liquidated_position_*.json")
+
+EVENT_TYPES = ('open', 'fill', 'fee_accrual', 'close', 'liquidate')
+
+class JournalError(Exception):
+    """Raised for events that do not fit the journal's state"""
+
+def _empty_state():
+    return {'seq': 0, 'open': {}, 'trades': {}, 'offsets': {}}
+
+def apply(state, event, offset=None):
+    """Fold one event into `state` (in place); `offset` is its byte offset in the journal"""
+    trade = str(event['trade'])
+    kind = event['type']
+
+    if kind == 'open':
+        state['open'][trade] = {
+            "trade": event['trade'],
+            "symbol": event['symbol'],
+            "side": event['side'],
+            "shares": 0,
+            "entry_price": None,
+            "entry_date": event['time'],
+            "initial_capital": event['capital'],
+            "cash": event['capital'],
+            "open_commission": 0.0,
+            "borrow_rate": event['borrow_rate'],
+            "borrow_fees_accrued": 0.0,
+            "status": "OPEN",
+        }
+        state['trades'][trade] = {
+            "trade": event['trade'], "symbol": event['symbol'], "side": event['side'],
+            "status": "OPEN", "opened": event['time'], "closed": None,
+            "initial_capital": event['capital'], "shares": 0, "entry_price": None,
+            "close_price": None, "final_equity": None, "total_return": None,
+        }
+        state['offsets'][trade] = []
+    elif trade not in state['open']:
+        raise JournalError(f"{kind} event for trade {trade}, which is not open")
+    else:
+        position = state['open'][trade]
+        if kind == 'fill':
+            shares = position['shares'] + event['shares']
+            position['entry_price'] = ((position['entry_price'] or 0.0) * position['shares']
+                                       + event['price'] * event['shares']) / shares
+            position['shares'] = shares
+            position['cash'] -= event['commission']
+            position['open_commission'] += event['commission']
+            state['trades'][trade].update(shares=shares, entry_price=position['entry_price'])
+        elif kind == 'fee_accrual':
+            position['borrow_fees_accrued'] += event['amount']
+            position['fees_through'] = event['time']
+        elif kind in ('close', 'liquidate'):
+            del state['open'][trade]
+            state['trades'][trade].update(
+                status=event.get('status', 'CLOSED' if kind == 'close' else 'LIQUIDATED'),
+                closed=event['time'], close_price=event['price'], close_commission=event['commission'],
+                final_equity=event.get('final_equity'), total_return=event.get('total_return'),
+                borrow_fees=event.get('borrow_fees', position['borrow_fees_accrued']),
+            )
+        else:
+            raise JournalError(f"Unknown event type: {kind}")
+
+    if offset is not None:
+        state['offsets'][trade].append(offset)
+    state['seq'] = event['seq']
+
+class TradeJournal:
+    """
+    The journal file plus its folded state
+
+    Opening loads the latest snapshot and replays the events after it;
+    append() writes one line, folds it in and snapshots when due.
+    """
+
+    def __init__(self, path=JOURNAL_FILE, snapshot_path=SNAPSHOT_FILE, snapshot_every=SNAPSHOT_EVERY):
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+        self.state, self.offset = self._load_snapshot()
+        self.replayed = self._replay()
+
+    def _load_snapshot(self):
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return _empty_state(), 0
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        # A snapshot from another schema or beyond the journal's end (journal replaced) is ignored
+        if snapshot.get('version') != SNAPSHOT_VERSION or snapshot['offset'] > size:
+            return _empty_state(), 0
+        return snapshot['state'], snapshot['offset']
+
+    def _replay(self):
+        """Fold the events after the snapshot; returns how many there were"""
+        if not os.path.exists(self.path):
+            return 0
+        count = 0
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            for line in f:
+                # A torn final line (crash mid-append) is cut off by the next append
+                if not line.endswith(b'\n'):
+                    break
+                apply(self.state, json.loads(line), self.offset)
+                self.offset += len(line)
+                count += 1
+        return count
+
+    def append(self, kind, trade, time=None, **fields):
+        """Write one event and fold it into the state; returns the event"""
+        if kind not in EVENT_TYPES:
+            raise JournalError(f"Unknown event type: {kind}")
+        event = {'seq': self.state['seq'] + 1, 'time': time or datetime.now().isoformat(),
+                 'type': kind, 'trade': trade, **fields}
+        # Validate before anything is written
+        if kind == 'open' and str(trade) in self.state['trades']:
+            raise JournalError(f"Trade {trade} already exists")
+        if kind != 'open' and str(trade) not in self.state['open']:
+            raise JournalError(f"{kind} event for trade {trade}, which is not open")
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        line = (json.dumps(event) + '\n').encode()
+        with open(self.path, 'ab') as f:
+            f.truncate(self.offset)
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        apply(self.state, event, self.offset)
+        self.offset += len(line)
+
+        self.replayed += 1
+        if self.replayed >= self.snapshot_every:
+            self.snapshot()
+        return event
+
+    def snapshot(self):
+        """Write the state and the journal offset it covers (atomic replace)"""
+        os.makedirs(os.path.dirname(self.snapshot_path) or '.', exist_ok=True)
+        tmp = self.snapshot_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'version': SNAPSHOT_VERSION, 'offset': self.offset, 'state': self.state}, f)
+        os.replace(tmp, self.snapshot_path)
+        self.replayed = 0
+
+    def open_trade(self, symbol, shares, price, capital, commission, borrow_rate, side="short", time=None):
+        """Record a new position (open + fill); returns its trade id"""
+        time = time or datetime.now().isoformat()
+        trade = self.state['seq'] + 1
+        self.append('open', trade, time, symbol=symbol, side=side, capital=capital, borrow_rate=borrow_rate)
+        self.append('fill', trade, time, shares=shares, price=price, commission=commission)
+        return trade
+
+    def accrue_fees(self, trade, total, time=None):
+        """Record borrow fees up to `total` for the trade (no event if nothing new accrued)"""
+        accrued = self.state['open'][str(trade)]['borrow_fees_accrued']
+        if total > accrued:
+            return self.append('fee_accrual', trade, time, amount=total - accrued)
+        return None
+
+    def close_trade(self, trade, price, commission, final_equity=None, total_return=None,
+                    borrow_fees=None, liquidated=False, status=None, time=None):
+        """Record the exit (a 'liquidate' event when `liquidated`)"""
+        fields = dict(price=price, commission=commission, final_equity=final_equity, total_return=total_return)
+        if borrow_fees is not None:
+            fields['borrow_fees'] = borrow_fees
+        if status is not None:
+            fields['status'] = status
+        return self.append('liquidate' if liquidated else 'close', trade, time, **fields)
+
+    def open_positions(self, symbol=None):
+        """Open positions (oldest first), in the layout the game and dashboard use"""
+        return [dict(p) for p in self.state['open'].values() if symbol is None or p['symbol'] == symbol]
+
+    def current_position(self, symbol="BMNR"):
+        """Most recent open position in `symbol`, or None"""
+        positions = self.open_positions(symbol)
+        return positions[-1] if positions else None
+
+    def trades(self, status=None, symbol=None):
+        """Summaries of every trade from the index, oldest first"""
+        return [dict(t) for t in self.state['trades'].values()
+                if (status is None or t['status'] == status) and (symbol is None or t['symbol'] == symbol)]
+
+    def events(self, trade):
+        """Every event of one trade, read directly at its indexed offsets"""
+        offsets = self.state['offsets'].get(str(trade), [])
+        out = []
+        with open(self.path, 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                out.append(json.loads(f.readline()))
+        return out
+
+def _import_legacy(journal):
+    """Replay the pre-journal archives and open position file as events (oldest first)"""
+    records = []
+    for pattern in LEGACY_ARCHIVES:
+        for path in glob.glob(pattern):
+            with open(path, 'r') as f:
+                records.append(json.load(f))
+    if os.path.exists(LEGACY_POSITION_FILE):
+        with open(LEGACY_POSITION_FILE, 'r') as f:
+            position = json.load(f)
+        if position.get('status') == 'OPEN':
+            records.append(position)
+    records.sort(key=lambda p: p['entry_date'])
+
+    for position in records:
+        trade = journal.open_trade(position.get('symbol', "BMNR"), position['shares'], position['entry_price'],
+                                   position['initial_capital'], position['open_commission'],
+                                   position.get('borrow_rate', 0.0), position.get('side', "short"),
+                                   position['entry_date'])
+        if position['status'] != 'OPEN':
+            journal.close_trade(trade, position['close_price'], position['close_commission'],
+                                position.get('final_equity'), position.get('total_return'),
+                                liquidated=position['status'] != 'CLOSED', status=position['status'],
+                                time=position['close_date'])
+    return len(records)
+
+def open_journal(path=JOURNAL_FILE, snapshot_path=SNAPSHOT_FILE):
+    """
+    Open the journal, importing the legacy position files the first time
+
+    The archives are left in place; the open position file is removed once
+    its position is in the journal, as nothing reads it any more.
+    """
+    first = not os.path.exists(path)
+    journal = TradeJournal(path, snapshot_path)
+    if first:
+        if _import_legacy(journal):
+            journal.snapshot()
+        if os.path.exists(LEGACY_POSITION_FILE):
+            os.remove(LEGACY_POSITION_FILE)
+    return journal
+
+def current_position(symbol="BMNR"):
+    """The open game position in `symbol` (see open_positions()), or None"""
+    if not os.path.exists(JOURNAL_FILE) and not os.path.exists(LEGACY_POSITION_FILE):
+        return None
+    return open_journal().current_position(symbol)
+
+def print_trades(trades):
+    """Table of trade summaries"""
+    print(f"\n{'Trade':>6}  {'Symbol':<6} {'Status':<11} {'Opened':<16} {'Closed':<16} "
+          f"{'Shares':>7} {'Entry':>8} {'Exit':>8} {'Return':>8}")
+    print("-" * 96)
+    for t in trades:
+        closed = t['closed'][:16].replace('T', ' ') if t['closed'] else '—'
+        exit_price = f"฿{t['close_price']:.2f}" if t['close_price'] is not None else '—'
+        total_return = f"{t['total_return']:+.1f}%" if t['total_return'] is not None else '—'
+        print(f"{t['trade']:>6}  {t['symbol']:<6} {t['status']:<11} {t['opened'][:16].replace('T', ' '):<16} "
+              f"{closed:<16} {t['shares']:>7,} {'฿' + format(t['entry_price'], '.2f'):>8} {exit_price:>8} "
+              f"{total_return:>8}")
+
+def main():
+    args = sys.argv[1:]
+    journal = open_journal()
+
+    if args and args[0] == 'events':
+        for event in journal.events(args[1]):
+            print(json.dumps(event))
+        return
+    if '--snapshot' in args:
+        journal.snapshot()
+        print(f"✓ Snapshot at event {journal.state['seq']} saved: {SNAPSHOT_FILE}")
+        return
+
+    print("=" * 96)
+    print("📒 TRADE JOURNAL")
+    print("=" * 96)
+    trades = journal.trades()
+    if not trades:
+        print("\n📝 No trades yet.")
+    else:
+        print_trades(trades)
+        print(f"\n✓ {len(trades)} trades, {len(journal.open_positions())} open, "
+              f"{journal.state['seq']} events ({journal.replayed} replayed since the last snapshot)")
+    print("\n" + "=" * 96)
+
+if __name__ == "__main__":
+    main()
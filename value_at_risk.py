@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Value at Risk / Expected Shortfall
+Historical and filtered historical simulation for the position and portfolio
+
+Scenarios are the last WINDOW daily returns (1-day) and the overlapping
+10-day returns inside that window, aligned across symbols by date.
+Filtered historical simulation divides each return by the EWMA volatility
+known the day before and rescales by today's volatility, so calm and
+turbulent stretches of history count at today's risk level. The EWMA is
+seeded with the sample variance of the first BURN_IN returns, which are
+left out of the filtered scenarios; until then there is no report.
+
+Windows, rolling 10-day sums and the EWMA update in O(1) per new day; VaR
+is the k-th largest loss found by quickselect (np.partition with NumPy),
+and ES the mean of the partition's tail, so a full recompute is O(WINDOW)
+per figure instead of a sort.
+"""
+
+import math
+import os
+import random
+import statistics
+import sys
+from collections import deque
+
+from bar_store import open_store, store_path
+from portfolio import Portfolio
+from trade_journal import current_position
+from watchlist import DEFAULT_WATCHLIST, align_closes
+
+try:
+    import numpy as np
+except ImportError:  # stdlib-only fallback
+    np = None
+
+WINDOW = 250  # trading days of scenarios
+EWMA_LAMBDA = 0.94  # RiskMetrics daily decay
+BURN_IN = 25  # returns used to seed the EWMA variance
+CONFIDENCE_LEVELS = (0.95, 0.99)
+HORIZONS = (1, 10)
+METHODS = ('historical', 'filtered')
+
+def quickselect(values, k):
+    """
+    Partially sort `values` in place so values[k] is the k-th smallest
+
+    Everything before k is <= values[k] and everything after is >=, in
+    expected O(n) (random pivots, three-way partition for ties).
+    """
+    lo, hi = 0, len(values) - 1
+    while lo < hi:
+        pivot = values[random.randint(lo, hi)]
+        lt, i, gt = lo, lo, hi
+        while i <= gt:
+            if values[i] < pivot:
+                values[lt], values[i] = values[i], values[lt]
+                lt += 1
+                i += 1
+            elif values[i] > pivot:
+                values[gt], values[i] = values[i], values[gt]
+                gt -= 1
+            else:
+                i += 1
+        if k < lt:
+            hi = lt - 1
+        elif k > gt:
+            lo = gt + 1
+        else:
+            break
+    return values[k]
+
+def var_es(losses, confidence):
+    """(VaR, ES) of a loss sample: the `confidence` quantile and the mean loss at or beyond it"""
+    n = len(losses)
+    if not n:
+        return None, None
+    k = min(n - 1, max(0, math.ceil(confidence * n) - 1))
+    if np is not None:
+        part = np.partition(np.asarray(losses, dtype=np.float64), k)
+        return float(part[k]), float(part[k:].mean())
+    values = list(losses)
+    var = quickselect(values, k)
+    tail = values[k:]
+    return var, sum(tail) / len(tail)
+
+class ReturnWindow:
+    """
+    Rolling scenario window over one daily return stream
+
+    push() is O(1): the window, the rolling `horizon`-day sums (add the
+    new return, subtract the one leaving) and the EWMA variance all update
+    in place. The first `burn_in` returns only seed the variance; filtered
+    scenarios start after them.
+    """
+
+    def __init__(self, window=WINDOW, horizon=max(HORIZONS), decay=EWMA_LAMBDA, burn_in=BURN_IN):
+        self.horizon = horizon
+        self.decay = decay
+        self.burn_in = burn_in
+        self.returns = deque(maxlen=window)
+        self.filtered = deque(maxlen=window)  # r / σ known before r
+        self.sums = deque(maxlen=window)      # horizon-day sums of returns
+        self.filtered_sums = deque(maxlen=window)
+        self._seed = []
+        self._recent = deque()
+        self._recent_sum = 0.0
+        self._recent_filtered = deque()
+        self._recent_filtered_sum = 0.0
+        self.variance = None
+
+    @property
+    def ready(self):
+        """Burn-in done and at least one scenario per horizon"""
+        return bool(self.filtered_sums)
+
+    @property
+    def sigma(self):
+        """EWMA volatility forecast for the next day"""
+        return math.sqrt(self.variance) if self.variance else 0.0
+
+    def push(self, r):
+        self.returns.append(r)
+        self._recent_sum = self._roll(self._recent, self._recent_sum, r, self.sums)
+
+        if self.variance is None:
+            self._seed.append(r)
+            if len(self._seed) >= max(self.burn_in, 2):
+                self.variance = statistics.variance(self._seed)
+                self._seed = []
+            return
+        z = r / self.sigma if self.variance > 0 else 0.0
+        self.variance = self.decay * self.variance + (1 - self.decay) * r * r
+        self.filtered.append(z)
+        self._recent_filtered_sum = self._roll(self._recent_filtered, self._recent_filtered_sum, z,
+                                               self.filtered_sums)
+
+    def _roll(self, recent, total, value, sums):
+        """Add `value` to a rolling `horizon`-day sum; record the sum once full; returns the new total"""
+        recent.append(value)
+        total += value
+        if len(recent) > self.horizon:
+            total -= recent.popleft()
+        if len(recent) == self.horizon:
+            sums.append(total)
+        return total
+
+    def scenarios(self, horizon, method):
+        """Scenario log returns for a 1-day or `self.horizon`-day horizon"""
+        if horizon == 1:
+            raw, filtered = self.returns, self.filtered
+        elif horizon == self.horizon:
+            raw, filtered = self.sums, self.filtered_sums
+        else:
+            raise ValueError(f"Horizon must be 1 or {self.horizon} days")
+        if method == 'historical':
+            return list(raw)
+        sigma = self.sigma
+        return [z * sigma for z in filtered]
+
+class RiskModel:
+    """Aligned ReturnWindows for several symbols; scenario i is the same date for all"""
+
+    def __init__(self, symbols, window=WINDOW, horizon=max(HORIZONS), decay=EWMA_LAMBDA, burn_in=BURN_IN):
+        self.symbols = list(symbols)
+        self.windows = {s: ReturnWindow(window, horizon, decay, burn_in) for s in self.symbols}
+        self.last_date = None
+
+    @property
+    def ready(self):
+        return bool(self.symbols) and all(w.ready for w in self.windows.values())
+
+    @classmethod
+    def from_series(cls, series_by_symbol, window=WINDOW, horizon=max(HORIZONS), decay=EWMA_LAMBDA,
+                    burn_in=BURN_IN):
+        """Model fed with close-to-close returns on the dates every symbol has a bar"""
+        dates, closes = align_closes(series_by_symbol)
+        model = cls(closes, window, horizon, decay, burn_in)
+        for i in range(1, len(dates)):
+            model.update({s: math.log(c[i] / c[i - 1]) for s, c in closes.items()}, dates[i])
+        return model
+
+    def update(self, returns, date=None):
+        """Add one day of returns ({symbol: log return}); O(1) per symbol"""
+        for symbol in self.symbols:
+            self.windows[symbol].push(returns[symbol])
+        self.last_date = date
+
+    def losses(self, exposures, horizon, method):
+        """Scenario losses of signed `exposures` ({symbol: market value})"""
+        held = [s for s in self.symbols if exposures.get(s)]
+        if not held:
+            return []
+        columns = [self.windows[s].scenarios(horizon, method) for s in held]
+        weights = [exposures[s] for s in held]
+        if np is not None:
+            moves = np.expm1(np.asarray(columns, dtype=np.float64))
+            return (-(np.asarray(weights) @ moves)).tolist()
+        return [-sum(w * math.expm1(r) for w, r in zip(weights, row)) for row in zip(*columns)]
+
+    def report(self, exposures, confidences=CONFIDENCE_LEVELS, horizons=HORIZONS, methods=METHODS):
+        """
+        VaR and ES for every method × horizon × confidence
+
+        Returns {'methods': {method: {horizon: {confidence: {'var', 'es'}}}},
+        'scenarios': {horizon: count}, 'exposure': net exposure}, with
+        horizons and confidences as strings so the dict is JSON-ready.
+        None until the burn-in is complete.
+        """
+        if not self.ready:
+            return None
+        out = {'methods': {}, 'scenarios': {}, 'exposure': sum(exposures.values())}
+        for method in methods:
+            table = out['methods'][method] = {}
+            for horizon in horizons:
+                losses = self.losses(exposures, horizon, method)
+                out['scenarios'][str(horizon)] = len(losses)
+                table[str(horizon)] = {}
+                for confidence in confidences:
+                    var, es = var_es(losses, confidence)
+                    table[str(horizon)][str(confidence)] = {'var': var, 'es': es}
+        return out
+
+def position_var(position, series, price=None, symbol="BMNR"):
+    """VaR/ES report for the game position over one symbol's stored daily bars (None for short history)"""
+    book = Portfolio.from_position(position, symbol)
+    price = price if price is not None else series.close[-1]
+    model = RiskModel.from_series({symbol: series})
+    return model.report(book.net_exposure({symbol: price}))
+
+def portfolio_var(book, prices, series_by_symbol, account=None):
+    """VaR/ES report for a Portfolio (one account or all) over aligned stored histories"""
+    model = RiskModel.from_series(series_by_symbol)
+    return model.report(book.net_exposure(prices, account))
+
+def stored_series(symbols, interval="1d"):
+    """{symbol: series} for the symbols that have stored bars (without creating empty stores)"""
+    out = {}
+    for symbol in symbols:
+        if not os.path.exists(store_path(symbol, interval)):
+            continue
+        series = open_store(symbol, interval).read()
+        if len(series) > max(HORIZONS) + 1:
+            out[symbol] = series
+    return out
+
+def print_report(report, scale=1.0, unit="฿"):
+    """VaR/ES table (`scale` converts to display units, e.g. 100 for % of a ฿1 exposure)"""
+    for method in report['methods']:
+        for horizon, by_confidence in report['methods'][method].items():
+            cells = []
+            for confidence, figures in by_confidence.items():
+                label = f"{float(confidence) * 100:.0f}%"
+                if figures['var'] is None:
+                    cells.append(f"VaR{label} n/a")
+                    continue
+                var, es = figures['var'] * scale, figures['es'] * scale
+                if unit == "%":
+                    cells.append(f"VaR{label} {var:6.2f}%  ES{label} {es:6.2f}%")
+                else:
+                    cells.append(f"VaR{label} {unit + format(var, ',.0f'):>9}  ES{label} {unit + format(es, ',.0f'):>9}")
+            print(f"   {method:<11}{horizon:>3}d  " + "   ".join(cells))
+
+def main():
+    symbols = [a for a in sys.argv[1:] if not a.startswith('--')] or DEFAULT_WATCHLIST
+
+    print("=" * 90)
+    print("📉 VALUE AT RISK / EXPECTED SHORTFALL (historical and filtered historical simulation)")
+    print("=" * 90)
+
+    histories = stored_series(symbols)
+    if not histories:
+        print("✗ No stored daily bars (run fetch_and_generate.py first)")
+        return
+
+    print(f"\n📊 Per ฿1 long exposure, last {WINDOW} aligned days:")
+    for symbol, series in histories.items():
+        model = RiskModel.from_series({symbol: series})
+        if not model.ready:
+            print(f"\n{symbol}: fewer than {BURN_IN + max(HORIZONS)} returns, no report yet")
+            continue
+        print(f"\n{symbol} (EWMA σ {model.windows[symbol].sigma * 100:.2f}%/day)")
+        print_report(model.report({symbol: 1.0}), scale=100, unit="%")
+
+    position = current_position("BMNR")
+    report = position_var(position, histories["BMNR"]) if position and "BMNR" in histories else None
+    if report:
+        print(f"\n🎯 Game position (net exposure ฿{report['exposure']:,.0f}):")
+        print_report(report)
+
+    print("\n" + "=" * 90)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Watchlist Fetcher
+Fetches many symbols concurrently and aligns them on common dates
+"""
+
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from price_series import PriceSeries
+from yahoo_client import CHART_HOST, fetch_bars
+
+DEFAULT_WATCHLIST = [
+    "BMNR", "ETH-USD", "BTC-USD", "MSTR", "COIN",
+    # Miners
+    "MARA", "RIOT", "CLSK", "HUT", "CIFR",
+]
+MAX_CONCURRENCY = 8       # simultaneous requests in flight
+RATE_LIMIT_PER_HOST = 10  # requests per second per host
+
+class RateLimiter:
+    """
+    Async token bucket: at most `rate` acquisitions per second
+
+    Bursts of up to `rate` requests go through immediately, after which
+    callers are spaced out evenly.
+    """
+
+    def __init__(self, rate):
+        self.rate = float(rate)
+        self.tokens = self.rate
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+async def fetch_watchlist_async(symbols, days=30, interval="1d",
+                                max_concurrency=MAX_CONCURRENCY,
+                                rate_limit=RATE_LIMIT_PER_HOST):
+    """
+    Fetch bars for every symbol concurrently
+
+    Returns {symbol: PriceSeries}; symbols that fail map to an empty series.
+    Blocking requests run on a thread pool sized to `max_concurrency` so they
+    share the chart client's keep-alive connections.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    limiters = {CHART_HOST: RateLimiter(rate_limit)}
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        async def fetch_one(symbol):
+            async with semaphore:
+                await limiters[CHART_HOST].acquire()
+                try:
+                    return await loop.run_in_executor(executor, fetch_bars, symbol, days, interval)
+                except Exception as e:
+                    print(f"Error fetching {symbol}: {e}")
+                    return PriceSeries.empty(symbol)
+
+        unique = list(dict.fromkeys(symbols))
+        results = await asyncio.gather(*(fetch_one(s) for s in unique))
+
+    return dict(zip(unique, results))
+
+def fetch_watchlist(symbols, days=30, interval="1d",
+                    max_concurrency=MAX_CONCURRENCY, rate_limit=RATE_LIMIT_PER_HOST):
+    """Synchronous wrapper around fetch_watchlist_async"""
+    return asyncio.run(fetch_watchlist_async(
+        symbols, days=days, interval=interval,
+        max_concurrency=max_concurrency, rate_limit=rate_limit
+    ))
+
+def align_closes(results, field='close', by='date'):
+    """
+    Align fetched series on the dates every symbol traded
+
+    Returns (dates, {symbol: [values]}) with one value per common date.
+    With by='timestamp' (intraday bars) series are matched on exact bar
+    timestamps instead. Symbols with no data are left out.
+    """
+    if by == 'date':
+        key = lambda ts: datetime.fromtimestamp(ts).date()
+    else:
+        key = lambda ts: ts
+
+    by_date = {
+        symbol: {
+            key(ts): value
+            for ts, value in zip(series.timestamp, getattr(series, field))
+        }
+        for symbol, series in results.items() if series
+    }
+    if not by_date:
+        return [], {}
+
+    common = set.intersection(*(set(m) for m in by_date.values()))
+    dates = sorted(common)
+    return dates, {symbol: [m[date] for date in dates] for symbol, m in by_date.items()}
+
+def main():
+    symbols = sys.argv[1:] or DEFAULT_WATCHLIST
+
+    print("=" * 70)
+    print(f"Watchlist Fetch ({len(symbols)} symbols)")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    results = fetch_watchlist(symbols)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'Symbol':10s} {'Bars':>6s} {'Last Close':>12s}")
+    print("-" * 30)
+    for symbol, bars in results.items():
+        last = f"${bars.close[-1]:.2f}" if bars else "—"
+        print(f"{symbol:10s} {len(bars):6d} {last:>12s}")
+
+    dates, _ = align_closes(results)
+    print(f"\n✓ {len(dates)} common dates across {sum(1 for b in results.values() if b)} symbols")
+    print(f"⏱  Fetched in {elapsed:.2f}s")
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
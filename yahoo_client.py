@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Yahoo Finance Chart Client
+Shared, pooled access to the v8 chart API for every analysis script
+"""
+
+import gzip
+import http.client
+import json
+import threading
+import zlib
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from urllib.parse import quote, urlencode
+
+from price_series import PriceSeries
+
+CHART_HOST = "query1.finance.yahoo.com"
+CHART_PATH = "/v8/finance/chart/"
+USER_AGENT = "Mozilla/5.0 (compatible; BitMineTracker/1.0)"
+DEFAULT_TIMEOUT = 10  # seconds, per request
+MAX_IDLE_CONNECTIONS = 8
+
+class ChartError(Exception):
+    """Raised when the chart API returns no usable result"""
+
+class ConnectionPool:
+    """
+    Keep-alive HTTPS connections to a single host
+
+    Connections are handed out one caller at a time and returned after the
+    response body has been fully read, so the TLS session is reused across
+    requests instead of re-negotiated for every call.
+    """
+
+    def __init__(self, host, max_idle=MAX_IDLE_CONNECTIONS):
+        self.host = host
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _acquire(self, timeout):
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = http.client.HTTPSConnection(self.host, timeout=timeout)
+        else:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+        return conn
+
+    def _release(self, conn):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, path, headers=None, timeout=DEFAULT_TIMEOUT):
+        """GET `path`, returning (status, decoded body bytes)"""
+        headers = dict(headers or {})
+        headers.setdefault('User-Agent', USER_AGENT)
+        headers.setdefault('Accept-Encoding', 'gzip, deflate')
+        headers.setdefault('Connection', 'keep-alive')
+
+        # A pooled connection may have been closed by the server while idle;
+        # retry once on a fresh connection before giving up.
+        for attempt in range(2):
+            conn = self._acquire(timeout)
+            try:
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                    ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                conn.close()
+                raise
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return response.status, _decode_body(body, response.getheader('Content-Encoding'))
+
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+def _decode_body(body, encoding):
+    """Undo gzip/deflate transfer compression"""
+    encoding = (encoding or '').lower()
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    if encoding == 'deflate':
+        return zlib.decompress(body)
+    return body
+
+_pool = ConnectionPool(CHART_HOST)
+_results = {}
+_results_lock = threading.Lock()
+
+def _coalesced(key, fn):
+    """
+    Run `fn` once per key for the lifetime of the process
+
+    Concurrent callers asking for the same key wait on the first caller's
+    request instead of issuing their own. Failures are not cached.
+    """
+    with _results_lock:
+        future = _results.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _results[key] = future
+
+    if owner:
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            with _results_lock:
+                _results.pop(key, None)
+            future.set_exception(e)
+
+    return future.result()
+
+def clear_cache():
+    """Forget all fetched results (the connection pool is kept)"""
+    with _results_lock:
+        _results.clear()
+
+def _chart_request(symbol, params, timeout):
+    path = CHART_PATH + quote(symbol) + "?" + urlencode(params)
+    status, body = _pool.request(path, timeout=timeout)
+    try:
+        payload = json.loads(body.decode())
+    except ValueError:  # plain-text 429s, HTML error pages
+        raise ChartError(f"{symbol}: HTTP {status} (response is not JSON)") from None
+
+    chart = payload.get('chart') or {}
+    if status != 200 or not chart.get('result'):
+        error = chart.get('error') or {}
+        raise ChartError(f"{symbol}: HTTP {status} {error.get('description', '')}".strip())
+    return chart['result'][0]
+
+def fetch_chart(symbol, interval="1d", days=None, range_=None, period1=None,
+                period2=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Fetch the raw chart result for a symbol
+
+    Pass either `days` (window ending now), `range_` (Yahoo range string such
+    as "1d" or "5d") or explicit `period1`/`period2` epoch seconds. Identical
+    requests within a run are served from a single HTTP call.
+    """
+    if days is not None:
+        key = ('days', symbol, interval, days)
+    elif range_ is not None:
+        key = ('range', symbol, interval, range_)
+    else:
+        key = ('period', symbol, interval, period1, period2)
+
+    def request():
+        params = {'interval': interval}
+        if days is not None:
+            now = datetime.now()
+            params['period1'] = int((now - timedelta(days=days)).timestamp())
+            params['period2'] = int(now.timestamp())
+        elif range_ is not None:
+            params['range'] = range_
+        else:
+            params['period1'] = int(period1)
+            params['period2'] = int(period2 if period2 is not None else datetime.now().timestamp())
+        return _chart_request(symbol, params, timeout)
+
+    return _coalesced(key, request)
+
+def chart_to_series(result, symbol=None):
+    """Convert a chart result into a PriceSeries, skipping bars with no close"""
+    timestamps = result.get('timestamp') or []
+    quotes = result['indicators']['quote'][0]
+    closes = quotes['close']
+
+    keep = [i for i in range(len(timestamps)) if closes[i] is not None]
+
+    def column(name, fallback):
+        values = quotes.get(name) or [None] * len(timestamps)
+        return [values[i] if values[i] is not None else fallback(i) for i in keep]
+
+    return PriceSeries(
+        [timestamps[i] for i in keep],
+        column('open', lambda i: closes[i]),
+        column('high', lambda i: closes[i]),
+        column('low', lambda i: closes[i]),
+        [closes[i] for i in keep],
+        column('volume', lambda i: 0),
+        symbol=symbol or result.get('meta', {}).get('symbol')
+    )
+
+def fetch_bars(symbol, days=30, interval="1d", timeout=DEFAULT_TIMEOUT):
+    """
+    Fetch OHLCV bars for the last `days` days as a PriceSeries
+
+    If a longer window for the same symbol/interval was already fetched in
+    this run, the shorter window is cut from it instead of hitting the API.
+    """
+    with _results_lock:
+        wider = [
+            key[3] for key, future in _results.items()
+            if key[:3] == ('days', symbol, interval) and key[3] > days
+            and future.done() and future.exception() is None
+        ]
+
+    if wider:
+        series = chart_to_series(fetch_chart(symbol, interval, days=min(wider), timeout=timeout), symbol)
+        return series.since(int((datetime.now() - timedelta(days=days)).timestamp()))
+
+    return chart_to_series(fetch_chart(symbol, interval, days=days, timeout=timeout), symbol)
+
+def fetch_bars_since(symbol, start, interval="1d", period2=None, timeout=DEFAULT_TIMEOUT):
+    """Fetch OHLCV bars from `start` up to `period2` (datetimes; default now) as a PriceSeries"""
+    end = int(period2.timestamp()) if period2 is not None else None
+    result = fetch_chart(symbol, interval, period1=int(start.timestamp()), period2=end, timeout=timeout)
+    return chart_to_series(result, symbol)
+
+def get_market_price(symbol, timeout=DEFAULT_TIMEOUT):
+    """Fetch the latest regular-market price for a symbol"""
+    result = fetch_chart(symbol, interval="1d", range_="1d", timeout=timeout)
+    return float(result['meta']['regularMarketPrice'])